@@ -0,0 +1,298 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+# Файл конфигурации: параметры подключения - раздел "config_bd"
+CONFIG_PATH = "config.json"
+# Параметры подключения по умолчанию (пароль задается только в файле конфигурации)
+DB_CONFIG = {
+    "dbname": "postgres",
+    "user": "postgres",
+    "host": "localhost",
+    "port": "5432"
+}
+# Размер пула: соединения открываются по мере необходимости, но не больше MAX_CONNECTIONS.
+# Свободные соединения сверх minconn закрываются при возврате в пул (вместе с подготовленными операторами),
+# поэтому процесс задает minconn по числу своих одновременных пользователей пула (configure).
+# По умолчанию - одно соединение, как у процесса записи
+MIN_CONNECTIONS = 1
+MAX_CONNECTIONS = 8
+# Максимальное время ожидания свободного соединения, с
+POOL_TIMEOUT = 10
+# Количество строк, получаемых за один запрос из курсора на стороне сервера
+ITERSIZE = 100
+# Допустимые имена таблиц и операторов (без кавычек); длина ограничена NAMEDATALEN - 1 = 63
+IDENTIFIER = re.compile(r"[a-z_][a-z0-9_]{0,62}")
+
+# Реестр подготавливаемых запросов: имя -> шаблон запроса с {table} и параметрами $1, $2, ...
+STATEMENTS = {}
+
+
+def check_identifier(name):
+    """
+    Проверка имени, подставляемого в текст запроса (имя таблицы или оператора).
+    :raise ValueError: Имя не является простым идентификатором PostgreSQL.
+    """
+    if not isinstance(name, str) or not IDENTIFIER.fullmatch(name):
+        raise ValueError(f"Недопустимое имя в запросе: {name!r}")
+    return name
+
+
+def statement_name(statement, table_name):
+    """
+    Имя подготовленного оператора для таблицы: имя запроса и короткий хэш имени таблицы,
+    поэтому длина имени не превышает 63 символа при любой допустимой длине имени таблицы.
+    """
+    digest = hashlib.sha1(check_identifier(table_name).encode()).hexdigest()[:12]
+    return f"{statement[:50]}_{digest}"
+
+
+def load_db_config(path=CONFIG_PATH):
+    """
+    Параметры подключения: DB_CONFIG, дополненные разделом "config_bd" файла конфигурации.
+    :param path: Путь к файлу конфигурации.
+    """
+    db_config = dict(DB_CONFIG)
+    try:
+        with open(path, "r") as f:
+            db_config.update(json.load(f).get("config_bd", {}))
+    except (OSError, ValueError) as error:
+        print(f"Ошибка при чтении параметров подключения к базе данных: {error}")
+    return db_config
+
+
+def register_statement(name, template):
+    """
+    Регистрация подготавливаемого запроса.
+    :param name: Имя запроса.
+    :param template: Текст запроса: {table} - имя таблицы, $1, $2, ... - параметры.
+    """
+    STATEMENTS[check_identifier(name)] = template
+
+
+class SessionPool:
+    def __init__(self, minconn=MIN_CONNECTIONS, maxconn=MAX_CONNECTIONS, **db_config):
+        """
+        Пул соединений с базой данных, общий для всех объектов DataRead процесса.
+
+        В отличие от ThreadedConnectionPool, который сразу выдает ошибку при занятости всех соединений,
+        ожидает освобождения соединения (не дольше POOL_TIMEOUT) и ведет статистику использования.
+        Для частых запросов поддерживаются подготовленные операторы (PREPARE/EXECUTE),
+        подготовка выполняется один раз на каждом соединении.
+        """
+        self.pool = ThreadedConnectionPool(minconn, maxconn, **(db_config or load_db_config()))
+        self.maxconn = maxconn
+        self.available = threading.Semaphore(maxconn)
+        self.lock = threading.Lock()
+        # Подготовленные операторы каждого соединения. Ключ - сам объект соединения (слабая ссылка):
+        # id закрытого соединения может достаться новому, на котором операторы еще не подготовлены
+        self.prepared = weakref.WeakKeyDictionary()
+
+        # Статистика использования
+        self.in_use = 0
+        self.peak = 0
+        self.acquisitions = 0
+        self.wait_time_sum = 0
+        self.wait_time_max = 0
+        self.timeouts = 0
+
+    def getconn(self):
+        """
+        Получение соединения из пула (с ожиданием, если все соединения заняты).
+        :raise PoolError: Свободное соединение не появилось за POOL_TIMEOUT секунд.
+        """
+        start_time = time.perf_counter()
+        if not self.available.acquire(timeout=POOL_TIMEOUT):
+            with self.lock:
+                self.timeouts += 1
+            raise PoolError("Нет свободных соединений с базой данных")
+        try:
+            connection = self.pool.getconn()
+        except Exception:
+            self.available.release()
+            raise
+        wait_time = time.perf_counter() - start_time
+        with self.lock:
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+            self.acquisitions += 1
+            self.wait_time_sum += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        return connection
+
+    def putconn(self, connection, close=False):
+        """
+        Возврат соединения в пул.
+        :param close: Закрыть соединение (например, после LISTEN или при разрыве связи).
+        """
+        close = close or bool(connection.closed)
+        try:
+            self.pool.putconn(connection, close=close)
+        finally:
+            # Пул закрывает и соединения сверх minconn: их подготовленные операторы больше не существуют
+            if connection.closed:
+                self.prepared.pop(connection, None)
+            with self.lock:
+                self.in_use -= 1
+            self.available.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Соединение на время блока with; транзакция фиксируется при выходе, при ошибке - откатывается
+        (с удалением подготовленных операторов, см. reset).
+        Соединение возвращается в пул при любом выходе, в том числе при закрытии генератора,
+        использующего блок (GeneratorExit): незавершенную транзакцию такого соединения откатывает пул.
+        """
+        connection = self.getconn()
+        try:
+            yield connection
+            if not connection.autocommit:
+                connection.commit()
+        except Exception:
+            self.reset(connection)
+            raise
+        finally:
+            self.putconn(connection)
+
+    @contextmanager
+    def cursor(self, name=None, itersize=ITERSIZE):
+        """
+        Курсор на время блока with.
+        :param name: Имя курсора на стороне сервера: строки передаются порциями по itersize
+                     при итерации или fetchmany, а не все сразу (для больших выборок).
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor(name=name) if name else connection.cursor()
+            if name:
+                cursor.itersize = itersize
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def reset(self, connection):
+        """
+        Откат транзакции после ошибки. Подготовленные операторы соединения удаляются,
+        так как структура таблицы могла измениться (например, таблица пересоздана с другим способом хранения).
+        """
+        if connection.closed:
+            return
+        try:
+            connection.rollback()
+            if self.prepared.pop(connection, None):
+                cursor = connection.cursor()
+                cursor.execute("DEALLOCATE ALL;")
+                cursor.close()
+                connection.commit()
+        except psycopg2.Error:
+            # Соединение неработоспособно: оно будет закрыто при возврате в пул
+            if connection.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                connection.close()
+
+    def execute_prepared(self, cursor, name, query, params):
+        """
+        Выполнение подготовленного оператора; при первом вызове на соединении оператор подготавливается.
+        :param name: Имя оператора (уникальное для текста запроса).
+        :param query: Текст запроса с параметрами $1, $2, ...
+        :param params: Значения параметров.
+        """
+        prepared = self.prepared.setdefault(cursor.connection, set())
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} AS {query}")
+            prepared.add(name)
+        if params:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))});", params)
+        else:
+            cursor.execute(f"EXECUTE {name};")
+
+    def execute_statement(self, cursor, statement, table_name, params):
+        """
+        Выполнение зарегистрированного запроса (register_statement) для таблицы.
+        Имя таблицы проверяется перед подстановкой в текст запроса, значения передаются параметрами,
+        поэтому запрос разбирается и планируется один раз на соединении, а не при каждом вызове.
+        :param statement: Имя запроса в реестре STATEMENTS.
+        :param table_name: Имя таблицы.
+        :param params: Значения параметров.
+        """
+        self.execute_prepared(cursor, statement_name(statement, table_name),
+                              STATEMENTS[statement].format(table=table_name), params)
+
+    def is_prepared(self, connection, statement, table_name):
+        """Подготовлен ли запрос для таблицы на соединении."""
+        return statement_name(statement, table_name) in self.prepared.get(connection, ())
+
+    def stats(self):
+        """
+        Статистика использования пула.
+        :return: Словарь: размер пула, занято соединений, максимум занятых, загрузка,
+                 количество выдач соединений, среднее и максимальное время ожидания (мс), отказы по таймауту.
+        """
+        with self.lock:
+            return {
+                "size": self.maxconn,
+                "in_use": self.in_use,
+                "peak": self.peak,
+                "utilization": self.in_use / self.maxconn,
+                "acquisitions": self.acquisitions,
+                "wait_avg_ms": self.wait_time_sum / self.acquisitions * 1000 if self.acquisitions else 0,
+                "wait_max_ms": self.wait_time_max * 1000,
+                "timeouts": self.timeouts,
+            }
+
+    def closeall(self):
+        self.pool.closeall()
+        self.prepared.clear()
+
+
+# Пул процесса создается при первом обращении к базе данных
+_pool = None
+_pool_lock = threading.Lock()
+# Параметры пула процесса (configure)
+_minconn = MIN_CONNECTIONS
+_db_config = None
+
+
+def configure(minconn=None, db_config=None):
+    """
+    Параметры пула процесса; вызывается до первого обращения к базе данных.
+    :param minconn: Количество постоянно открытых соединений (одновременных пользователей пула в процессе).
+    :param db_config: Параметры подключения (раздел "config_bd"), по умолчанию - load_db_config().
+    """
+    global _minconn, _db_config
+    with _pool_lock:
+        if _pool is not None:
+            print("Ошибка: пул соединений уже создан, параметры будут применены после close_pool.")
+        if minconn is not None:
+            _minconn = minconn
+        if db_config is not None:
+            _db_config = dict(db_config)
+
+
+def get_pool():
+    """Общий пул соединений процесса (создается при первом вызове)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            print("Попытка подключения к базе данных...")
+            _pool = SessionPool(_minconn, MAX_CONNECTIONS, **(_db_config or load_db_config()))
+            print("Подключение успешно!")
+        return _pool
+
+
+def close_pool():
+    """Закрытие всех соединений пула процесса."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            print(f"Пул соединений: {_pool.stats()}")
+            _pool.closeall()
+            _pool = None
+            print("\nСоединения с базой данных закрыты.")
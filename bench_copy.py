@@ -0,0 +1,65 @@
+import time
+import numpy as np
+import data_record
+
+# Параметры бенчмарка
+FRAMES = 2000  # Количество кадров
+SAMPLES = 2048  # Количество отсчетов в канале
+BATCH = 200  # Размер пакета
+TABLE_NAME = "bench_data_records"
+
+
+def generate_rows(count):
+    """Генерация кадров со случайными отсчетами 12-разрядного АЦП."""
+    rng = np.random.default_rng(42)
+    rows = []
+    for i in range(count):
+        arrays = rng.integers(-2048, 2048, size=(4, SAMPLES), dtype=np.int32)
+        rows.append(("2025-02-07", i + 1, "12:00:00.5", *arrays))
+    return rows
+
+
+def bench(name, connection, write):
+    data_record.bd_clear(connection, TABLE_NAME)
+    start_time = time.perf_counter()
+    write()
+    execution_time = time.perf_counter() - start_time
+    print(f"{name}: {execution_time:.3f} с, {FRAMES / execution_time:.1f} кадров/с, "
+          f"{execution_time / FRAMES * 1000:.3f} мс/кадр")
+
+
+def write_rows(connection, rows):
+    """Запись по одному кадру: INSERT и COMMIT на каждый кадр, как в исходном способе записи."""
+    cursor = connection.cursor()
+    for row in rows:
+        cursor.execute(f"""
+            INSERT INTO {TABLE_NAME} (record_date, record_number, record_time, array_1, array_2, array_3, array_4)
+            VALUES (%s, %s, %s, %s, %s, %s, %s);
+        """, row)
+        connection.commit()
+    cursor.close()
+
+
+def main():
+    connection, cursor = data_record.bd_init()
+    data_record.bd_create_data_table(connection, TABLE_NAME)
+
+    rows = generate_rows(FRAMES)
+    # Для записи по одному кадру массивы передаются списками, как в исходном коде
+    rows_list = [row[:3] + tuple(array.tolist() for array in row[3:]) for row in rows]
+    batches = [rows[i:i + BATCH] for i in range(0, FRAMES, BATCH)]
+    batches_list = [rows_list[i:i + BATCH] for i in range(0, FRAMES, BATCH)]
+
+    bench("INSERT + COMMIT на кадр", connection, lambda: write_rows(connection, rows_list))
+    bench(f"bd_write_batch (многострочный INSERT, пакет {BATCH})", connection,
+          lambda: [data_record.bd_write_batch(connection, TABLE_NAME, batch) for batch in batches_list])
+    bench(f"bd_copy_batch (COPY binary, пакет {BATCH})", connection,
+          lambda: [data_record.bd_copy_batch(connection, TABLE_NAME, batch) for batch in batches])
+
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+    connection.commit()
+    data_record.bd_close(connection, cursor)
+
+
+if __name__ == "__main__":
+    main()
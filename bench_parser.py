@@ -0,0 +1,58 @@
+import time
+import numpy as np
+import frame_parser
+
+# Параметры бенчмарка
+LINES = 500  # Количество строк кадров
+SAMPLES = 2048  # Количество отсчетов в канале
+
+
+def legacy_parse(data):
+    """Разбор строки кадра так, как это делалось в data_record.save_to_file до векторизации."""
+    data_list = data.split(" ")
+    counter = int(data_list[2])
+    data_iter = data_list[8].split(";")
+    new_data1 = [int(x) for x in data_iter[0:-2:4]]
+    new_data2 = [int(x) for x in data_iter[1:-2:4]]
+    new_data3 = [int(x) for x in data_iter[2:-2:4]]
+    new_data4 = [int(x) for x in data_iter[3::4]]
+    time_str = f"{data_list[4]}:{data_list[5]}:{data_list[6]}.{data_list[7]}"
+    return counter, time_str, [new_data1, new_data2, new_data3, new_data4]
+
+
+def generate_lines(count):
+    """Генерация строк кадров в формате программы сбора данных."""
+    rng = np.random.default_rng(42)
+    lines = []
+    for i in range(count):
+        channels = rng.integers(-2048, 4096, size=(4, SAMPLES))
+        lines.append(frame_parser.format_frame_line(i + 1, 12, 0, i // 100, (i % 100) * 10, channels))
+    return lines
+
+
+def bench(name, parse, lines):
+    start_time = time.perf_counter()
+    for line in lines:
+        parse(line)
+    execution_time = time.perf_counter() - start_time
+    print(f"{name}: {execution_time / len(lines) * 1e6:.1f} мкс/кадр")
+    return execution_time
+
+
+def main():
+    lines = generate_lines(LINES)
+
+    # Проверка совпадения результатов
+    for line in lines:
+        counter, time_str, channels = frame_parser.parse_frame_line(line)
+        legacy_counter, legacy_time, legacy_channels = legacy_parse(line)
+        assert counter == legacy_counter and time_str == legacy_time
+        assert np.array_equal(channels, np.array(legacy_channels))
+
+    legacy_time = bench("split + int() (исходный код)", legacy_parse, lines)
+    new_time = bench("frame_parser.parse_frame_line", frame_parser.parse_frame_line, lines)
+    print(f"Ускорение: {legacy_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+import numpy as np
+import bd_pool
+import data_read
+import data_record
+
+# Параметры бенчмарка
+CALLS = 1000  # Количество вызовов каждого запроса
+READ_COUNT = 10  # Количество записей в bd_read_last
+SAMPLES = 2048  # Количество отсчетов в канале
+TABLE_NAME = "bench_prepared_records"
+
+
+def bench(name, call):
+    """
+    Среднее и медианное время одного вызова.
+    :return: Медианное время, с.
+    """
+    times = np.empty(CALLS)
+    for i in range(CALLS):
+        start_time = time.perf_counter()
+        call(i)
+        times[i] = time.perf_counter() - start_time
+    print(f"{name}: среднее {times.mean() * 1000:.3f} мс, медиана {np.median(times) * 1000:.3f} мс на вызов")
+    return np.median(times)
+
+
+def main():
+    """
+    Время одного вызова bd_read_last: запрос, собираемый и планируемый при каждом вызове
+    (как было раньше), и подготовленный оператор из реестра bd_pool.STATEMENTS.
+    Кадры записываются пакетами (bd_write_batch, bd_copy_batch), поэтому запись по одному кадру не измеряется.
+    """
+    connection, cursor = data_record.bd_init()
+    pool = bd_pool.get_pool()
+    data_record.bd_drop(connection, TABLE_NAME)
+    data_record.bd_create_data_table(connection, TABLE_NAME)
+
+    rng = np.random.default_rng(42)
+    rows = [("2025-02-07", i + 1, "12:00:00.5", *rng.integers(-2048, 2048, size=(4, SAMPLES), dtype=np.int32))
+            for i in range(READ_COUNT)]
+    data_record.bd_write_batch(connection, TABLE_NAME, rows)
+
+    def read_plain(i):
+        # Запрос в исходном виде bd_read_last: текст с подставленными именем таблицы и LIMIT
+        # собирается при каждом вызове и каждый раз разбирается и планируется сервером
+        query = f"""
+            SELECT * 
+            FROM {TABLE_NAME}
+            ORDER BY id DESC
+            LIMIT {READ_COUNT};
+        """
+        cursor.execute(query)
+        cursor.fetchall()
+
+    def read_prepared(i):
+        pool.execute_statement(cursor, "last_rows", TABLE_NAME, (READ_COUNT,))
+        cursor.fetchall()
+
+    before = bench(f"bd_read_last (LIMIT {READ_COUNT}), запрос при каждом вызове", read_plain)
+    after = bench(f"bd_read_last (LIMIT {READ_COUNT}), подготовленный оператор", read_prepared)
+    print(f"Ускорение (по медиане): {before / after:.2f}x")
+
+    connection.commit()
+    data_record.bd_drop(connection, TABLE_NAME)
+    data_record.bd_close(connection, cursor)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import time
+import numpy as np
+import filter_data
+from ring_buffer import RingBuffer
+
+# Параметры бенчмарка (как у ProcessingThread для 50 кадров)
+SAMPLES = 2048  # Количество отсчетов в канале кадра
+WINDOW = 50  # Кадров в окне обработки
+FS = 1024 * WINDOW  # Частота дискретизации
+FREQUENCY = 5 * WINDOW  # Частота основного сигнала
+UPDATES = 20  # Количество обновлений для усреднения
+
+
+def generate_frames(count):
+    """Кадры (k, 4, N): синусоида усилия и перемещения с шумом, температура и импульсы оборотов."""
+    rng = np.random.default_rng(0)
+    t = np.arange(count * SAMPLES) / FS
+    signal = 4000 * np.sin(2 * np.pi * FREQUENCY * t)
+    channels = np.empty((4, count * SAMPLES), dtype=np.int32)
+    channels[0] = signal + rng.normal(0, 200, len(t))
+    channels[1] = 0.5 * signal + rng.normal(0, 100, len(t))
+    channels[2] = 300
+    channels[3] = np.where((t * FREQUENCY) % 1 < 0.1, 8000, 0)
+    return channels.reshape(4, count, SAMPLES).transpose(1, 0, 2)
+
+
+def per_channel(frames):
+    """Обработка окна раздельными вызовами filter_data для каждого канала (как до process_frames)."""
+    count_impulse, index_null, pulse_durations, rpm = filter_data.count_turn(frames, channel=4, min_count=6)
+    for channel, negative_data in ((1, True), (2, False)):
+        filter_data.filter_data(frames, channel=channel, freq=FREQUENCY, fs=FS, only_filter=False,
+                                negative_data=negative_data, index_null=index_null, sos=True)
+    np.mean(filter_data.data_export(frames, 3))
+
+
+def main():
+    """
+    Время одного обновления графиков 4 датчиков: раздельная обработка каналов
+    и process_frames с окном в кольцевом буфере (копируются только новые кадры).
+    В обоих вариантах каналы фильтруются по всему окну без фазового сдвига (sosfiltfilt),
+    поэтому результаты совпадают; большую часть времени занимают два прохода фильтра по окну каждого канала.
+    """
+    for step in (25, 10, 5):
+        frames = generate_frames(WINDOW + step * UPDATES)
+        window = RingBuffer(4, WINDOW * SAMPLES, dtype=np.int32)
+        window.write(frames[:WINDOW].transpose(1, 0, 2).reshape(4, -1))
+
+        time_before = time_after = 0
+        for update in range(UPDATES):
+            end = WINDOW + step * (update + 1)
+            start_time = time.perf_counter()
+            per_channel(frames[end - WINDOW:end])
+            time_before += time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            window.write(frames[end - step:end].transpose(1, 0, 2).reshape(4, -1))
+            filter_data.process_frames(window.latest(), freq=FREQUENCY, fs=FS, min_count=6)
+            time_after += time.perf_counter() - start_time
+
+        print(f"{step} новых кадров на обновление: раздельная обработка {time_before / UPDATES * 1000:.2f} мс, "
+              f"process_frames {time_after / UPDATES * 1000:.2f} мс, "
+              f"ускорение {time_before / time_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import time
+import numpy as np
+import data_record
+import data_read
+import frame_codec
+import pg_binary
+import stub_generator
+
+# Параметры бенчмарка
+FRAMES = 2000  # Количество кадров
+SAMPLES = 2048  # Количество отсчетов в канале
+RATE = 5  # Частота кадров тестовых данных, кадров/с
+BATCH = 200  # Размер пакета
+TABLE_NAME = "bench_storage"
+
+
+def generate_rows(count):
+    """Генерация кадров тестовым генератором (усилие, ход штока, температура, обороты)."""
+    rows = []
+    for i in range(count):
+        channels = stub_generator.generate_channels(i + 1, SAMPLES, SAMPLES * RATE)
+        rows.append(("2025-02-07", i + 1, "12:00:00.5", *channels))
+    return rows
+
+
+def storage_variants():
+    """Сравниваемые способы хранения: (название, storage, compression)."""
+    variants = [("INTEGER[2048] x 4", "array", "none"), ("blob int16", "blob", "none"), ("blob int16 + zlib", "blob", "zlib")]
+    if frame_codec.lz4 is not None:
+        variants.append(("blob int16 + lz4", "blob", "lz4"))
+    return variants
+
+
+def bench_codec(rows):
+    """Размер и скорость кодирования/декодирования кадра без базы данных."""
+    out = np.empty((4, SAMPLES), dtype=np.int32)
+    print("Кодирование (без базы данных):")
+    for name, storage, compression in storage_variants():
+        start_time = time.perf_counter()
+        if storage == "blob":
+            encoded = [frame_codec.encode_frame(row[3:], compression) for row in rows]
+        else:
+            # Размер массивов в двоичном формате PostgreSQL (как в COPY и array_send), без префикса длины поля
+            encoded = [[pg_binary.encode_int4_array(array)[4:] for array in row[3:]] for row in rows]
+        encode_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for frame in encoded:
+            if storage == "blob":
+                frame_codec.decode_frame(frame, out)
+            else:
+                for channel, array in enumerate(frame):
+                    pg_binary.decode_int4_array(array, out[channel])
+        decode_time = time.perf_counter() - start_time
+
+        size = sum(len(frame) if storage == "blob" else sum(map(len, frame)) for frame in encoded)
+        print(f"  {name}: {size / len(rows) / 1024:.1f} КБ/кадр, "
+              f"кодирование {encode_time / len(rows) * 1e6:.0f} мкс/кадр, "
+              f"декодирование {decode_time / len(rows) * 1e6:.0f} мкс/кадр")
+
+
+def bench_database(connection, rows):
+    """Скорость записи (COPY) и чтения (DataRead.bd_read_last_frames) и размер таблицы."""
+    reader = data_read.DataRead()
+    batches = [rows[i:i + BATCH] for i in range(0, len(rows), BATCH)]
+    print("База данных:")
+    for name, storage, compression in storage_variants():
+        data_record.bd_drop(connection, TABLE_NAME)
+        data_record.bd_create_data_table(connection, TABLE_NAME, storage)
+        reader.storages.pop(TABLE_NAME, None)
+
+        start_time = time.perf_counter()
+        for batch in batches:
+            data_record.bd_copy_batch(connection, TABLE_NAME, batch, storage, compression)
+        write_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        frames = reader.bd_read_last_frames(TABLE_NAME, len(rows), SAMPLES)
+        read_time = time.perf_counter() - start_time
+        assert np.array_equal(frames[-1], np.array(rows[-1][3:]))
+
+        cursor = connection.cursor()
+        cursor.execute("SELECT pg_total_relation_size(%s);", (TABLE_NAME,))
+        size = cursor.fetchone()[0]
+        cursor.close()
+        print(f"  {name}: таблица {size / 2 ** 20:.1f} МБ ({size / len(rows) / 1024:.1f} КБ/кадр), "
+              f"запись {len(rows) / write_time:.0f} кадров/с, чтение {len(rows) / read_time:.0f} кадров/с")
+
+    data_record.bd_drop(connection, TABLE_NAME)
+    reader.bd_close()
+
+
+def main():
+    rows = generate_rows(FRAMES)
+    bench_codec(rows)
+
+    connection, cursor = data_record.bd_init()
+    if connection is None:
+        print("База данных недоступна, сравнение записи и чтения пропущено.")
+        return
+    bench_database(connection, rows)
+    data_record.bd_close(connection, cursor)
+
+
+if __name__ == "__main__":
+    main()
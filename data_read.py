@@ -1,49 +1,129 @@
-import psycopg2
+import select
+import numpy as np
+import bd_pool
+import pg_binary
+import frame_codec
+import rollups
+
+# Количество отсчетов в канале кадра (размер массивов array_1..array_4)
+SAMPLES = 2048
+# Столбцы кадра в двоичном представлении для каждого способа хранения (см. data_record.STORAGE):
+# массивы и blob декодируются без создания int для каждого отсчета
+FRAME_COLUMNS = {
+    "array": "id, array_send(array_1), array_send(array_2), array_send(array_3), array_send(array_4)",
+    "blob": "id, frame",
+}
+# Столбцы каналов кадра при хранении "array"
+ARRAY_COLUMNS = ("array_1", "array_2", "array_3", "array_4")
+# Выборки больше этого количества кадров читаются курсором на стороне сервера
+LARGE_READ = 500
+
+# Частые запросы выполняются подготовленными операторами (см. bd_pool.register_statement)
+bd_pool.register_statement("last_rows", "SELECT * FROM {table} ORDER BY id DESC LIMIT $1")
+bd_pool.register_statement("new_rows", "SELECT * FROM {table} WHERE id > $1 ORDER BY id LIMIT $2")
+# OID таблицы: меняется, если таблица удалена и создана заново (счетчик id начинается снова с 1)
+bd_pool.register_statement("table_oid", "SELECT to_regclass('{table}')::oid")
+for _storage, _columns in FRAME_COLUMNS.items():
+    bd_pool.register_statement(f"last_frames_{_storage}",
+                               f"SELECT {_columns} FROM {{table}} ORDER BY id DESC LIMIT $1")
+    bd_pool.register_statement(f"new_frames_{_storage}",
+                               f"SELECT {_columns} FROM {{table}} WHERE id > $1 ORDER BY id LIMIT $2")
+
+
+def decode_frames_into(rows, channels, offset=0, storage="array"):
+    """
+    Декодирование строк (id, array_send(array_1), ..., array_send(array_4)) или (id, frame)
+    в предварительно выделенный массив channels формы (4, k, N), начиная с кадра offset.
+    Для хранения "array" строки могут содержать меньше каналов (выборка отдельных столбцов),
+    тогда первая размерность channels равна количеству каналов в строке.
+    """
+    for index, row in enumerate(rows, offset):
+        if storage == "blob":
+            frame_codec.decode_frame(row[1], channels[:, index])
+            continue
+        for channel in range(channels.shape[0]):
+            pg_binary.decode_int4_array(row[1 + channel], channels[channel, index])
+
+
+def decode_frames(rows, samples=SAMPLES, storage="array"):
+    """
+    Декодирование строк (id, array_send(array_1), ..., array_send(array_4)) или (id, frame) в массив кадров.
+    Память выделяется один раз и хранится по каналам (4, k, N), поэтому
+    filter_data.data_export и data_export_all возвращают представления без копирования.
+    :param rows: Строки в хронологическом порядке.
+    :param samples: Количество отсчетов в канале.
+    :param storage: Способ хранения кадров ("array" или "blob").
+    :return: Представление int32 формы (k, 4, N).
+    """
+    channels = np.empty((4, len(rows), samples), dtype=np.int32)
+    decode_frames_into(rows, channels, 0, storage)
+    return channels.transpose(1, 0, 2)
+
+
+def expand_blob_rows(rows):
+    """
+    Преобразование строк таблицы с хранением "blob" (id, record_date, record_number, record_time, frame)
+    к строкам таблицы с хранением "array" (id, record_date, record_number, record_time, array_1, ..., array_4),
+    чтобы построчное чтение (bd_read, bd_read_last, bd_read_new) не зависело от способа хранения.
+    Отсчеты каналов возвращаются массивами NumPy int32 исходной длины.
+    """
+    expanded = []
+    for row in rows:
+        channels = np.empty((4, frame_codec.frame_samples(row[4])), dtype=np.int32)
+        frame_codec.decode_frame(row[4], channels)
+        expanded.append(tuple(row[:4]) + tuple(channels))
+    return expanded
+
 
 class DataRead():
-    def __init__(self):
-        # Объекты базы данных
+    def __init__(self, pool=None):
+        """
+        Чтение данных из базы. Соединения берутся из общего пула процесса (bd_pool) на время запроса,
+        поэтому объекты DataRead можно создавать без затрат на подключение: пул создается при первом запросе.
+        Собственное соединение (bd_connect) объект держит только для подписки на уведомления (bd_listen).
+        :param pool: Пул соединений (по умолчанию общий пул процесса).
+        """
+        self._pool = pool
+        # Соединение для уведомлений LISTEN/NOTIFY
         self.bd_connect = None
-        self.bd_cursor = None
         # Проверка сколько добавилось новых данных в таблицу
         self.old_count = 0
         self.new_count = 0
+        # Последний считанный id для инкрементального чтения (по ключу читателя)
+        self.last_ids = {}
+        # OID таблицы, из которой читатель читал в последний раз (по ключу читателя)
+        self.table_oids = {}
+        # Способ хранения кадров в таблицах ("array" или "blob"), определяется при первом чтении
+        self.storages = {}
 
-        # Параметры подключения к базе данных
-        db_config = {
-            "dbname": "postgres",
-            "user": "postgres",
-            "password": "rekb,zrf",
-            "host": "localhost",
-            "port": "5432"
-        }
-
-        try:
-            # Подключение к базе данных
-            print("Попытка подключения к базе данных...")
-            self.bd_connect = psycopg2.connect(**db_config)
-            print("Подключение успешно!")
-
-        except Exception as error:
-            print(f"Ошибка: {error}")
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = bd_pool.get_pool()
+        return self._pool
 
+    def bd_pool_stats(self):
+        """Статистика пула соединений (см. bd_pool.SessionPool.stats)."""
+        return self.pool.stats()
 
     def bd_read(self, table_name, conditions):
         try:
-            cursor = self.bd_connect.cursor()
+            # Выборка может быть большой: строки передаются порциями курсором на стороне сервера
+            with self.pool.cursor(name=f"read_{table_name}") as cursor:
+                # Базовый запрос для выборки данных
+                query = f"SELECT * FROM {table_name}"
+                params = []
 
-            # Базовый запрос для выборки данных
-            query = f"SELECT * FROM {table_name}"
-            params = []
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
 
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
+                # Выполняем запрос
+                cursor.execute(query, params)
 
-            # Выполняем запрос
-            cursor.execute(query, params)
-
-            # Получаем результаты
-            records = cursor.fetchall()
+                # Получаем результаты (все строки в памяти; кадры всего испытания читаются bd_stream_frames)
+                records = list(cursor)
+            if self.bd_table_storage(table_name) == "blob":
+                records = expand_blob_rows(records)
             print("Данные успешно считаны.")
             return records
 
@@ -51,9 +131,6 @@ class DataRead():
             print(f"Ошибка при чтении данных из таблицы: {error}")
             return []
 
-        finally:
-            cursor.close()
-
 
     def bd_read_last(self, table_name, count, new=False):
         """
@@ -63,19 +140,13 @@ class DataRead():
         :return: Список кортежей с данными последних записей или пустой список, если записей нет.
         """
         try:
-            cursor = self.bd_connect.cursor()
-            # Параметризованный запрос для выборки последних записей
-            query = f"""
-                SELECT * 
-                FROM {table_name}
-                ORDER BY id DESC
-                LIMIT {count};
-            """
-            # Выполняем запрос с параметрами
-            cursor.execute(query)
-            # Получаем результат
-            records = cursor.fetchall()  # Берем все записи
-            self.bd_connect.commit()  # Фиксируем изменения
+            with self.pool.cursor() as cursor:
+                # Подготовленный запрос для выборки последних записей (количество передается параметром)
+                self.pool.execute_statement(cursor, "last_rows", table_name, (count,))
+                # Получаем результат
+                records = cursor.fetchall()  # Берем все записи
+            if self.bd_table_storage(table_name) == "blob":
+                records = expand_blob_rows(records)
             if records:
                 print(f"Успешно считано {len(records)} записей.")
             else:
@@ -95,34 +166,335 @@ class DataRead():
         except Exception as error:
             print(f"Ошибка при чтении записей из таблицы: {error}")
             return []
-        finally:
+
+
+    def bd_read_new(self, table_name, count, key=None, chunk_size=100):
+        """
+        Инкрементальное чтение новых записей: только строки с id больше последнего считанного.
+        При первом вызове для ключа (и после bd_reset_reader) считываются последние count записей,
+        затем - все новые записи без пропусков и повторов порциями по chunk_size (см. bd_read_since).
+        Предполагается, что запись в таблицу ведет один поток (id растут в порядке фиксации).
+        :param table_name: Имя таблицы.
+        :param count: Количество записей при первом чтении.
+        :param key: Ключ читателя, чтобы несколько потребителей читали таблицу независимо.
+        :param chunk_size: Максимальное количество строк в одном запросе.
+        :return: Список кортежей новых записей, от новых к старым (как в bd_read_last).
+        """
+        key = key or table_name
+        records = []
+        try:
+            with self.pool.cursor() as cursor:
+                records = self.bd_read_since(cursor, "rows", table_name, key, count, chunk_size)
+            if self.bd_table_storage(table_name) == "blob":
+                records = expand_blob_rows(records)
+        except Exception as error:
+            print(f"Ошибка при чтении новых записей из таблицы: {error}")
+
+        return records[::-1]
+
+    def bd_read_since(self, cursor, kind, table_name, key, count, chunk_size):
+        """
+        Инкрементальное чтение для читателя key.
+        Первое чтение (и чтение после bd_reset_reader) - последние count строк (ORDER BY id DESC LIMIT),
+        затем - строки с id больше последнего считанного (WHERE id > last_id ORDER BY id) порциями по chunk_size,
+        пока не будут прочитаны все новые строки, поэтому строки не пропускаются, даже если читатель отстал.
+        Если таблица пересоздана (изменился ее OID, счетчик id начался заново), читатель сбрасывается.
+        :param cursor: Курсор соединения пула.
+        :param kind: Вид строк: зарегистрированы запросы last_<kind> (параметр - количество строк)
+                     и new_<kind> (параметры - last_id и количество строк).
+        :param key: Ключ читателя в last_ids.
+        :return: Список строк в порядке возрастания id.
+        """
+        self.pool.execute_statement(cursor, "table_oid", table_name, ())
+        table_oid = cursor.fetchone()[0]
+        if key in self.last_ids and self.table_oids.get(key) != table_oid:
+            print(f"Таблица {table_name} пересоздана: читатель '{key}' начинает чтение заново.")
+            self.bd_reset_reader(key)
+            # Способ хранения новой таблицы мог измениться
+            self.storages.pop(table_name, None)
+        self.table_oids[key] = table_oid
+
+        if key not in self.last_ids:
+            self.pool.execute_statement(cursor, f"last_{kind}", table_name, (count,))
+            rows = cursor.fetchall()[::-1]
+            self.last_ids[key] = rows[-1][0] if rows else 0
+            return rows
+
+        rows = []
+        while True:
+            self.pool.execute_statement(cursor, f"new_{kind}", table_name, (self.last_ids[key], chunk_size))
+            chunk = cursor.fetchall()
+            rows.extend(chunk)
+            if chunk:
+                self.last_ids[key] = chunk[-1][0]
+            if len(chunk) < chunk_size:
+                return rows
+
+    def bd_reset_reader(self, key):
+        """
+        Сброс инкрементального читателя: следующее чтение вернет последние count записей
+        (ORDER BY id DESC LIMIT), а не все записи после последней считанной.
+        Используется, если отображению нужны только последние данные, а не все пропущенные.
+        :param key: Ключ читателя.
+        """
+        self.last_ids.pop(key, None)
+        self.table_oids.pop(key, None)
+
+    def bd_table_storage(self, table_name):
+        """
+        Определение способа хранения кадров в таблице по наличию столбца frame.
+        :return: "blob" или "array" (также если таблицы пока нет).
+        """
+        if table_name in self.storages:
+            return self.storages[table_name]
+        try:
+            with self.pool.cursor() as cursor:
+                cursor.execute("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = %s;
+                """, (table_name,))
+                columns = {row[0] for row in cursor.fetchall()}
+        except Exception as error:
+            print(f"Ошибка при проверке структуры таблицы: {error}")
+            return "array"
+        if not columns:
+            # Таблица еще не создана, ее структура станет известна при следующем чтении
+            return "array"
+        self.storages[table_name] = "blob" if "frame" in columns else "array"
+        return self.storages[table_name]
+
+    def bd_read_last_frames(self, table_name, count, samples=SAMPLES):
+        """
+        Чтение последних кадров сразу в массив NumPy (массивы передаются в двоичном виде).
+        Поддерживаются оба способа хранения кадров: INTEGER[] и blob.
+        Небольшие выборки выполняются подготовленным оператором, большие (больше LARGE_READ кадров) -
+        курсором на стороне сервера: строки поступают порциями и сразу декодируются в массив.
+        :param table_name: Имя таблицы.
+        :param count: Количество последних кадров.
+        :param samples: Количество отсчетов в канале.
+        :return: Массив int32 формы (k, 4, samples) в хронологическом порядке.
+        """
+        storage = self.bd_table_storage(table_name)
+        channels = np.empty((4, count, samples), dtype=np.int32)
+        loaded = 0
+        try:
+            if count > LARGE_READ:
+                with self.pool.cursor(name=f"frames_{table_name}") as cursor:
+                    cursor.execute(f"""
+                        SELECT {FRAME_COLUMNS[storage]}
+                        FROM {table_name}
+                        ORDER BY id DESC
+                        LIMIT %s;
+                    """, (count,))
+                    while True:
+                        chunk = cursor.fetchmany(bd_pool.ITERSIZE)
+                        if not chunk:
+                            break
+                        # Строки идут от новых к старым: массив заполняется с конца
+                        loaded += len(chunk)
+                        decode_frames_into(chunk[::-1], channels, count - loaded, storage)
+            else:
+                with self.pool.cursor() as cursor:
+                    self.pool.execute_statement(cursor, f"last_frames_{storage}", table_name, (count,))
+                    rows = cursor.fetchall()
+                loaded = len(rows)
+                decode_frames_into(rows[::-1], channels, count - loaded, storage)
+        except Exception as error:
+            # Таблица могла быть пересоздана с другим способом хранения
+            self.storages.pop(table_name, None)
+            print(f"Ошибка при чтении кадров из таблицы: {error}")
+
+        return channels[:, count - loaded:].transpose(1, 0, 2)
+
+    def bd_read_new_frames(self, table_name, count, key=None, chunk_size=100, samples=SAMPLES):
+        """
+        Инкрементальное чтение новых кадров в виде массива (аналог bd_read_new).
+        При первом вызове для ключа считываются последние count кадров, затем - все новые кадры.
+        Массивы передаются в двоичном виде и декодируются в заранее выделенный массив.
+        Оба запроса (последние N кадров и кадры после id) выполняются подготовленными операторами.
+        :param table_name: Имя таблицы.
+        :param count: Количество кадров при первом чтении.
+        :param key: Ключ читателя.
+        :param chunk_size: Максимальное количество строк в одном запросе.
+        :param samples: Количество отсчетов в канале.
+        :return: Массив int32 формы (k, 4, samples) в хронологическом порядке.
+        """
+        key = key or table_name
+        storage = self.bd_table_storage(table_name)
+        rows = []
+        try:
+            with self.pool.cursor() as cursor:
+                rows = self.bd_read_since(cursor, f"frames_{storage}", table_name, key, count, chunk_size)
+        except Exception as error:
+            # Таблица могла быть пересоздана с другим способом хранения
+            self.storages.pop(table_name, None)
+            print(f"Ошибка при чтении новых кадров из таблицы: {error}")
+
+        return decode_frames(rows, samples, storage)
+
+    def bd_stream_frames(self, table_name, columns=ARRAY_COLUMNS, id_range=None, date_range=None,
+                         chunk_size=bd_pool.ITERSIZE, samples=SAMPLES):
+        """
+        Потоковое чтение кадров (например, всего испытания для обработки вне программы) с постоянным расходом памяти.
+        Строки читаются курсором на стороне сервера порциями по chunk_size и выдаются блоками массивов NumPy,
+        в памяти одновременно находится только текущая порция.
+        Соединение пула занято, пока генератор не будет исчерпан или закрыт.
+        :param table_name: Имя таблицы.
+        :param columns: Считываемые каналы, например ("array_1",). Для хранения blob кадр передается целиком,
+                        остальные каналы отбрасываются после декодирования.
+        :param id_range: Диапазон id (first, last) включительно, None - без ограничения с этой стороны.
+        :param date_range: Диапазон record_date (first, last) включительно, None - без ограничения.
+        :param chunk_size: Количество кадров в блоке.
+        :param samples: Количество отсчетов в канале.
+        :return: Генератор кортежей (ids, channels): массив id формы (k,) и int32 формы (len(columns), k, samples)
+                 в порядке возрастания id.
+        :raise ValueError: Неизвестный столбец в columns.
+        """
+        for column in columns:
+            if column not in ARRAY_COLUMNS:
+                raise ValueError(f"Неизвестный столбец кадра: {column}")
+        storage = self.bd_table_storage(table_name)
+        if storage == "blob":
+            select = "id, frame"
+        else:
+            select = ", ".join(["id"] + [f"array_send({column})" for column in columns])
+
+        # Условия диапазонов передаются параметрами
+        conditions = []
+        params = []
+        for field, bounds in (("id", id_range), ("record_date", date_range)):
+            first, last = bounds or (None, None)
+            if first is not None:
+                conditions.append(f"{field} >= %s")
+                params.append(first)
+            if last is not None:
+                conditions.append(f"{field} <= %s")
+                params.append(last)
+        query = f"SELECT {select} FROM {bd_pool.check_identifier(table_name)}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id;"
+
+        channel_indexes = [ARRAY_COLUMNS.index(column) for column in columns]
+        with self.pool.cursor(name=f"stream_{table_name}", itersize=chunk_size) as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                if storage == "blob":
+                    frames = np.empty((4, len(rows), samples), dtype=np.int32)
+                    decode_frames_into(rows, frames, 0, storage)
+                    channels = frames[channel_indexes]
+                else:
+                    channels = np.empty((len(columns), len(rows), samples), dtype=np.int32)
+                    decode_frames_into(rows, channels, 0, storage)
+                yield ids, channels
+
+    def bd_read_rollups(self, table_name, count, resolution="second"):
+        """
+        Чтение последних сводок (min/max/среднее/СКЗ каналов), записанных data_record при приеме кадров.
+        Для трендов достаточно сводок: строка сводки занимает десятки байт вместо десятков килобайт кадра.
+        :param table_name: Имя таблицы кадров.
+        :param count: Количество последних строк.
+        :param resolution: "second" - сводки по секундам, "frame" - по кадрам.
+        :return: Кортеж (times, statistics): список (дата, время) и словарь {"min", "max", "mean", "rms"}
+                 с массивами формы (k, 4) в хронологическом порядке.
+        """
+        if resolution == "frame":
+            query = f"""
+                SELECT record_date, record_time, {", ".join(rollups.COLUMNS)}
+                FROM {table_name}_frame_rollups
+                ORDER BY id DESC
+                LIMIT %s;
+            """
+        else:
+            query = f"""
+                SELECT record_date, record_second, {", ".join(rollups.COLUMNS)}
+                FROM {table_name}_second_rollups
+                ORDER BY record_date DESC, record_second DESC
+                LIMIT %s;
+            """
+        rows = []
+        try:
+            with self.pool.cursor() as cursor:
+                cursor.execute(query, (count,))
+                rows = cursor.fetchall()[::-1]
+        except Exception as error:
+            print(f"Ошибка при чтении сводок: {error}")
+
+        values = np.array([row[2:] for row in rows], dtype=np.float64).reshape(len(rows), len(rollups.STATISTICS), 4)
+        statistics = {statistic: values[:, index] for index, statistic in enumerate(rollups.STATISTICS)}
+        return [row[:2] for row in rows], statistics
+
+    def bd_listen(self, channel):
+        """
+        Подписка на уведомления NOTIFY.
+        Для подписки из пула берется отдельное соединение в режиме autocommit,
+        которое объект держит до вызова bd_close.
+        :param channel: Канал уведомлений (имя таблицы, в которую пишет data_record).
+        :return: True, если подписка выполнена.
+        """
+        try:
+            if self.bd_connect is None:
+                self.bd_connect = self.pool.getconn()
+            self.bd_connect.autocommit = True
+            cursor = self.bd_connect.cursor()
+            cursor.execute(f"LISTEN {channel};")
             cursor.close()
+            print(f"Подписка на уведомления '{channel}' выполнена.")
+            return True
+        except Exception as error:
+            print(f"Ошибка при подписке на уведомления: {error}")
+            if self.bd_connect is not None:
+                self.pool.putconn(self.bd_connect, close=True)
+                self.bd_connect = None
+            return False
+
+    def bd_poll_notify(self, timeout=0):
+        """
+        Проверка поступивших уведомлений.
+        :param timeout: Время ожидания уведомления, с (0 - без ожидания).
+        :return: Наибольший id кадра из уведомлений или None, если уведомлений не было.
+        """
+        if self.bd_connect is None:
+            return None
+        try:
+            if timeout and not select.select([self.bd_connect], [], [], timeout)[0]:
+                return None
+            self.bd_connect.poll()
+        except Exception as error:
+            print(f"Ошибка при получении уведомлений: {error}")
+            return None
 
+        last_id = None
+        while self.bd_connect.notifies:
+            notify = self.bd_connect.notifies.pop(0)
+            try:
+                last_id = max(int(notify.payload), last_id or 0)
+            except ValueError:
+                continue
+        return last_id
 
     def bd_close(self):
-        cursor = self.bd_connect
-        # Закрываем соединение
-        if cursor:
-           cursor.close()
-        if self.bd_connect:
-            self.bd_connect.close()
+        # Соединение подписки закрывается (состояние LISTEN не должно перейти к другим пользователям пула),
+        # соединения пула закрываются bd_pool.close_pool при завершении программы
+        if self.bd_connect is not None:
+            self.pool.putconn(self.bd_connect, close=True)
+            self.bd_connect = None
             print("\nСоединение закрыто.")
 
 
     def bd_clear(self, table_name):
         try:
-            cursor = self.bd_connect.cursor()
-            # Используем TRUNCATE для быстрой очистки таблицы
-            cursor.execute(f"TRUNCATE TABLE {table_name};")
+            with self.pool.cursor() as cursor:
+                # Используем TRUNCATE для быстрой очистки таблицы
+                cursor.execute(f"TRUNCATE TABLE {table_name};")
             print(f"Таблица '{table_name}' успешно очищена с помощью TRUNCATE.")
-            # Фиксируем изменения
-            self.bd_connect.commit()
         except Exception as error:
-            # В случае ошибки откатываем изменения
-            self.bd_connect.rollback()
             print(f"Ошибка при очистке таблицы: {error}")
-        finally:
-            cursor.close()
 
 
 def main():
@@ -132,7 +504,9 @@ def main():
     for i in range(10):
         print(BD.bd_read_last("mean_records", 10, True))
 
+    print(BD.bd_pool_stats())
     BD.bd_close()
+    bd_pool.close_pool()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
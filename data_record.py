@@ -5,52 +5,76 @@ import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib.animation import FuncAnimation
 import psycopg2
-import msvcrt
+from psycopg2.extras import execute_values
+try:
+    import msvcrt  # Клавиатура консоли Windows (обработка Esc)
+except ImportError:
+    msvcrt = None
 import time
+import datetime
+import pg_binary
+import bd_pool
+import frame_parser
+import frame_codec
+import rollups
+from decimate import DecimatedLine
+from ring_buffer import RingBuffer
+from shared_frames import SharedFrameRing
 
 # Объекты базы данных
 bd_connect = None
 bd_cursor = None
 # Параметры
 MAX_DATAPOINTS = 1024 * 30  # Максимальное количество точек для хранения
-# Создаём начальные массивы данных для четырёх линий
-dataplot = np.zeros(MAX_DATAPOINTS)
-dataplot2 = np.zeros(MAX_DATAPOINTS)
-dataplot3 = np.zeros(MAX_DATAPOINTS)
-dataplot4 = np.zeros(MAX_DATAPOINTS)
-
-# Очередь для передачи данных между потоками
-data_queue = queue.Queue()
+# Кольцевой буфер данных для четырёх линий
+plot_buffer = RingBuffer(4, MAX_DATAPOINTS)
+plot_x = np.arange(MAX_DATAPOINTS)
+# Линии графика с прореживанием до разрешения окна
+plot_lines = []
+
+# Кольцо кадров в разделяемой памяти для GUI (если GUI его создал)
+frame_ring = None
+
+# Параметры пакетной записи в базу данных
+BATCH_SIZE = 200  # Максимальное количество кадров в одном пакете
+BATCH_TIMEOUT = 0.25  # Максимальное время накопления пакета, с
+STATS_INTERVAL = 5  # Период вывода статистики записи, с
+QUEUE_BATCHES = 10  # Ограничение очередей в пакетах (BATCH_SIZE), чтобы память не росла при задержках базы данных
+SHUTDOWN_TIMEOUT = 5  # Ожидание места в очереди для сигнала завершения, с
+WRITE_MODE = "insert"  # Способ записи пакета: "insert" (многострочный INSERT) или "copy" (COPY в двоичном формате)
+PROTOCOL = "text"  # Формат вывода программы сбора данных: "text" (строки) или "binary" (кадры с префиксом длины)
+STORAGE = "array"  # Хранение кадра: "array" (INTEGER[2048] на канал) или "blob" (один bytea, см. frame_codec)
+COMPRESSION = "none"  # Сжатие кадра при хранении "blob": "none", "zlib" или "lz4"
+# Секционирование таблицы кадров: "none" (одна таблица, очищается при запуске)
+# или "day" (секция на каждые сутки по record_date, история сохраняется между запусками)
+PARTITIONING = "none"
+RETENTION_DAYS = 0  # Срок хранения секций, суток (0 - без ограничения)
+# Запись сводок (min/max/среднее/СКЗ каналов) по кадрам и по секундам в той же транзакции, что и кадры
+WRITE_ROLLUPS = True
+
+# Столбцы отсчетов кадра для каждого способа хранения
+FRAME_COLUMNS = {
+    "array": "array_1, array_2, array_3, array_4",
+    "blob": "frame",
+}
+
+# Очередь для передачи данных между потоками (пересоздаются в main по размеру пакета из настроек)
+data_queue = queue.Queue(maxsize=BATCH_SIZE * QUEUE_BATCHES)
+# Очередь разобранных кадров для потока записи в базу данных
+write_queue = queue.Queue(maxsize=BATCH_SIZE * QUEUE_BATCHES)
 # Переменная для отслеживания предыдущего значения counter
 prev_counter = int()
 
 # Флаг для завершения работы программы
 stop_flag = threading.Event()
 
-def is_convertible_to_int(s):
-    try:
-        int(s)
-        return True
-    except ValueError:
-        return False
-
 def bd_init():
-    # Параметры подключения к базе данных
-    db_config = {
-        "dbname": "postgres",
-        "user": "postgres",
-        "password": "rekb,zrf",
-        "host": "localhost",
-        "port": "5432"
-    }
     connection = None
     cursor = None
     try:
-        # Подключение к базе данных
-        print("Попытка подключения к базе данных...")
-        connection = psycopg2.connect(**db_config)
+        # Соединение берется из пула процесса (параметры подключения - раздел "config_bd" файла config.json)
+        connection = bd_pool.get_pool().getconn()
         cursor = connection.cursor()
-        print("Подключение успешно!")
     except Exception as error:
         print(f"Ошибка: {error}")
     return connection, cursor
@@ -79,8 +103,8 @@ def bd_close(connection, cursor):
     if cursor:
         cursor.close()
     if connection:
-        connection.close()
-        print("\nСоединение закрыто.")
+        bd_pool.get_pool().putconn(connection)
+        bd_pool.close_pool()
 
 
 def bd_clear(connection, table_name):
@@ -99,39 +123,384 @@ def bd_clear(connection, table_name):
         cursor.close()
 
 
-def bd_write_data(connection, table_name, record_date, record_number, record_time, array_1, array_2, array_3, array_4):
+def bd_drop(connection, table_name):
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
+        print(f"Таблица '{table_name}' удалена.")
+        connection.commit()
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при удалении таблицы: {error}")
+    finally:
+        cursor.close()
+
+
+def table_storage(connection, table_name):
+    """
+    Определение способа хранения кадров в существующей таблице.
+    :return: "blob", если в таблице есть столбец frame, "array" - если нет, None - если таблицы нет.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_name = %s;
+        """, (table_name,))
+        columns = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+    except Exception as error:
+        print(f"Ошибка при проверке структуры таблицы: {error}")
+        return None
+    if not columns:
+        return None
+    return "blob" if "frame" in columns else "array"
+
+
+def table_partitioned(connection, table_name):
+    """Проверка, является ли таблица секционированной."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE relname = %s;", (table_name,))
+        row = cursor.fetchone()
+        cursor.close()
+        return bool(row and row[0])
+    except Exception as error:
+        print(f"Ошибка при проверке секционирования таблицы: {error}")
+        return False
+
+
+def bd_create_data_table(connection, table_name, storage="array", partitioning="none"):
+    """
+    Создание таблицы для кадров данных (выполняется один раз при запуске записи).
+    :param connection: Соединение с базой данных.
+    :param table_name: Имя таблицы.
+    :param storage: "array" - четыре столбца INTEGER[2048], "blob" - один столбец bytea.
+    :param partitioning: "none" или "day" - секционирование по record_date (секции создает bd_create_partition).
+    """
+    if partitioning == "day":
+        # Первичный ключ секционированной таблицы должен включать ключ секционирования
+        id_column = "id SERIAL"
+        partition_clause = "PARTITION BY RANGE (record_date)"
+        table_constraints = ",\n                    PRIMARY KEY (id, record_date)"
+    else:
+        id_column = "id SERIAL PRIMARY KEY"
+        partition_clause = ""
+        table_constraints = ""
+    if storage == "blob":
+        frame_columns = "frame BYTEA NOT NULL"
+    else:
+        frame_columns = """array_1 INTEGER[2048],
+                    array_2 INTEGER[2048],
+                    array_3 INTEGER[2048],
+                    array_4 INTEGER[2048]"""
     try:
         cursor = connection.cursor()
-        #table_name = f"data_records"
-        # Создаем таблицу (если она не существует)
         create_table_query = f"""
                 CREATE TABLE IF NOT EXISTS {table_name} (
-                    id SERIAL PRIMARY KEY,
+                    {id_column},
                     record_date DATE NOT NULL,
                     record_number INTEGER NOT NULL,
                     record_time TIME(3) NOT NULL,
-                    array_1 INTEGER[2048],
-                    array_2 INTEGER[2048],
-                    array_3 INTEGER[2048],
-                    array_4 INTEGER[2048]
-                );
+                    {frame_columns}{table_constraints}
+                ) {partition_clause};
                 """
         cursor.execute(create_table_query)
-        # Вставка данных
+        connection.commit()  # Фиксируем изменения
+    except Exception as error:
+        # В случае ошибки откатываем изменения
+        connection.rollback()
+        print(f"Ошибка при создании таблицы: {error}")
+    finally:
+        cursor.close()
+
+
+def partition_name(table_name, record_date):
+    """Имя секции за сутки record_date: <таблица>_ГГГГММДД."""
+    return f"{table_name}_{record_date:%Y%m%d}"
+
+
+def bd_create_partition(connection, table_name, record_date):
+    """
+    Создание секции таблицы кадров за сутки record_date (если ее еще нет).
+    :return: True, если секция существует или создана.
+    """
+    next_date = record_date + datetime.timedelta(days=1)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {partition_name(table_name, record_date)}
+            PARTITION OF {table_name}
+            FOR VALUES FROM ('{record_date.isoformat()}') TO ('{next_date.isoformat()}');
+        """)
+        connection.commit()
+        return True
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при создании секции таблицы: {error}")
+        return False
+    finally:
+        cursor.close()
+
+
+def bd_partitions(connection, table_name):
+    """
+    Список секций таблицы кадров.
+    :return: Список кортежей (имя секции, дата) в порядке дат; секции с другими именами пропускаются.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            WHERE parent.relname = %s;
+        """, (table_name,))
+        names = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    except Exception as error:
+        print(f"Ошибка при получении списка секций: {error}")
+        return []
+
+    partitions = []
+    for name in names:
+        try:
+            partitions.append((name, datetime.datetime.strptime(name[len(table_name) + 1:], "%Y%m%d").date()))
+        except ValueError:
+            continue
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def bd_drop_old_partitions(connection, table_name, retention_days):
+    """
+    Удаление секций старше retention_days суток (сегодняшние сутки считаются первыми).
+    В отличие от DELETE, удаление секции не оставляет мертвых строк и не требует VACUUM.
+    """
+    if retention_days <= 0:
+        return
+    oldest_date = datetime.date.today() - datetime.timedelta(days=retention_days - 1)
+    for name, record_date in bd_partitions(connection, table_name):
+        if record_date < oldest_date:
+            bd_drop(connection, name)
+
+
+def bd_rename_partitioned(connection, table_name):
+    """
+    Сохранение секционированной таблицы (с историей) под новым именем вместе с секциями,
+    чтобы освободить имя для таблицы с другой структурой.
+    """
+    backup_name = f"{table_name}_{datetime.datetime.now():%Y%m%d_%H%M%S}"
+    partitions = bd_partitions(connection, table_name)
+    try:
+        cursor = connection.cursor()
+        for name, record_date in partitions:
+            cursor.execute(f"ALTER TABLE {name} RENAME TO {partition_name(backup_name, record_date)};")
+        cursor.execute(f"ALTER TABLE {table_name} RENAME TO {backup_name};")
+        connection.commit()
+        print(f"Таблица '{table_name}' сохранена как '{backup_name}'.")
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при переименовании таблицы: {error}")
+    finally:
+        cursor.close()
+
+
+def bd_notify(cursor, table_name):
+    """
+    Уведомление слушателей (NOTIFY) об id последнего записанного кадра.
+    Выполняется в транзакции пакета, поэтому доставляется только после ее фиксации.
+    Канал уведомлений совпадает с именем таблицы.
+    """
+    cursor.execute("SELECT pg_notify(%s, currval(pg_get_serial_sequence(%s, 'id'))::text);",
+                   (table_name, table_name))
+
+
+def rollup_column_definitions():
+    """Определения столбцов статистик: min/max - целые, среднее и СКЗ - вещественные."""
+    return ",\n                    ".join(
+        f"{column} {'INTEGER' if column.startswith(('min', 'max')) else 'REAL'}" for column in rollups.COLUMNS)
+
+
+def bd_create_rollup_tables(connection, table_name):
+    """
+    Создание таблиц сводок для таблицы кадров table_name:
+    <table_name>_frame_rollups - статистики каждого кадра,
+    <table_name>_second_rollups - статистики за каждую секунду (дополняются при записи следующих пакетов).
+    :return: True, если таблицы созданы (или уже существуют).
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table_name}_frame_rollups (
+                    id SERIAL PRIMARY KEY,
+                    record_date DATE NOT NULL,
+                    record_number INTEGER NOT NULL,
+                    record_time TIME(3) NOT NULL,
+                    {rollup_column_definitions()}
+                );
+                CREATE TABLE IF NOT EXISTS {table_name}_second_rollups (
+                    record_date DATE NOT NULL,
+                    record_second TIME(0) NOT NULL,
+                    samples INTEGER NOT NULL,
+                    {rollup_column_definitions()},
+                    PRIMARY KEY (record_date, record_second)
+                );
+                """)
+        connection.commit()
+        return True
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при создании таблиц сводок: {error}")
+        return False
+    finally:
+        cursor.close()
+
+
+def bd_delete_old_rollups(connection, table_name, retention_days):
+    """Удаление сводок старше retention_days суток (срок хранения тот же, что и у секций кадров)."""
+    if retention_days <= 0:
+        return
+    oldest_date = datetime.date.today() - datetime.timedelta(days=retention_days - 1)
+    try:
+        cursor = connection.cursor()
+        for suffix in ("frame_rollups", "second_rollups"):
+            cursor.execute(f"DELETE FROM {table_name}_{suffix} WHERE record_date < %s;", (oldest_date,))
+        connection.commit()
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при удалении устаревших сводок: {error}")
+    finally:
+        cursor.close()
+
+
+# Объединение статистик секунды, уже записанной предыдущим пакетом, с новыми кадрами этой секунды
+ROLLUP_MERGE = ",\n                    ".join(
+    ["samples = rollup.samples + EXCLUDED.samples"]
+    + [f"min{channel} = LEAST(rollup.min{channel}, EXCLUDED.min{channel})" for channel in range(1, 5)]
+    + [f"max{channel} = GREATEST(rollup.max{channel}, EXCLUDED.max{channel})" for channel in range(1, 5)]
+    + [f"mean{channel} = (rollup.mean{channel} * rollup.samples + EXCLUDED.mean{channel} * EXCLUDED.samples)"
+       f" / (rollup.samples + EXCLUDED.samples)" for channel in range(1, 5)]
+    + [f"rms{channel} = SQRT((rollup.rms{channel} ^ 2 * rollup.samples + EXCLUDED.rms{channel} ^ 2 * EXCLUDED.samples)"
+       f" / (rollup.samples + EXCLUDED.samples))" for channel in range(1, 5)]
+)
+
+
+def bd_write_rollups(cursor, table_name, rows):
+    """
+    Запись сводок пакета кадров в транзакции пакета.
+    Сводки записываются после точки сохранения: при ошибке откатываются только они,
+    кадры пакета фиксируются в любом случае.
+    :param rows: Список кортежей (record_date, record_number, record_time, array_1, array_2, array_3, array_4).
+    :return: True, если сводки записаны.
+    """
+    cursor.execute("SAVEPOINT rollups;")
+    try:
+        frame_rows, second_rows = rollups.rollup_rows(rows)
+        if frame_rows:
+            columns = ", ".join(rollups.COLUMNS)
+            execute_values(cursor, f"""
+                        INSERT INTO {table_name}_frame_rollups (record_date, record_number, record_time, {columns})
+                        VALUES %s;
+                        """, frame_rows, page_size=len(frame_rows))
+            execute_values(cursor, f"""
+                        INSERT INTO {table_name}_second_rollups AS rollup (record_date, record_second, samples, {columns})
+                        VALUES %s
+                        ON CONFLICT (record_date, record_second) DO UPDATE SET
+                            {ROLLUP_MERGE};
+                        """, second_rows, page_size=len(second_rows))
+    except Exception as error:
+        cursor.execute("ROLLBACK TO SAVEPOINT rollups;")
+        print(f"Ошибка при записи сводок: {error}")
+        return False
+    cursor.execute("RELEASE SAVEPOINT rollups;")
+    return True
+
+
+def encode_blob_rows(rows, compression="none"):
+    """
+    Преобразование строк кадров к формату blob: четыре массива отсчетов заменяются одним blob.
+    :return: Список кортежей (record_date, record_number, record_time, frame).
+    """
+    return [row[:3] + (frame_codec.encode_frame(row[3:], compression),) for row in rows]
+
+
+def bd_write_batch(connection, table_name, rows, storage="array", compression="none", write_rollups=False):
+    """
+    Запись пакета кадров одной транзакцией (многострочный INSERT).
+    :param connection: Соединение с базой данных.
+    :param table_name: Имя таблицы.
+    :param rows: Список кортежей (record_date, record_number, record_time, array_1, array_2, array_3, array_4).
+    :param storage: Способ хранения кадров в таблице ("array" или "blob").
+    :param compression: Сжатие кадров при хранении "blob".
+    :param write_rollups: Записать сводки пакета в той же транзакции.
+    :return: True, если пакет записан.
+    """
+    try:
+        cursor = connection.cursor()
+        # Кодирование внутри try: кадр с отсчетами вне int16 (ValueError) отклоняет пакет, а не останавливает поток
+        if storage == "blob":
+            values = [row[:3] + (psycopg2.Binary(row[3]),) for row in encode_blob_rows(rows, compression)]
+        else:
+            # psycopg2 не адаптирует массивы NumPy, поэтому передаем их списками
+            values = [row[:3] + tuple(np.asarray(array).tolist() for array in row[3:]) for row in rows]
         insert_query = f"""
-                INSERT INTO {table_name} (record_date, record_number, record_time, array_1, array_2, array_3, array_4)
-                VALUES (%s, %s, %s, %s, %s, %s, %s);
+                INSERT INTO {table_name} (record_date, record_number, record_time, {FRAME_COLUMNS[storage]})
+                VALUES %s;
                 """
-        cursor.execute(insert_query, (record_date, record_number, record_time, array_1, array_2, array_3, array_4))
+        execute_values(cursor, insert_query, values, page_size=len(values))
+        if write_rollups:
+            bd_write_rollups(cursor, table_name, rows)
+        bd_notify(cursor, table_name)
         connection.commit()  # Фиксируем изменения
-        print("Данные успешно добавлены.")
+        return True
     except Exception as error:
         # В случае ошибки откатываем изменения
         connection.rollback()
-        print(f"Ошибка при добавлении данных в таблицу: {error}")
+        print(f"Ошибка при добавлении пакета данных в таблицу: {error}")
+        return False
+    finally:
+        cursor.close()
+
+
+def bd_copy_batch(connection, table_name, rows, storage="array", compression="none", write_rollups=False):
+    """
+    Запись пакета кадров одной транзакцией через COPY ... FROM STDIN (FORMAT binary).
+    Массивы отсчетов кодируются напрямую из массивов NumPy.
+    :param connection: Соединение с базой данных.
+    :param table_name: Имя таблицы.
+    :param rows: Список кортежей (record_date, record_number, record_time, array_1, array_2, array_3, array_4).
+    :param storage: Способ хранения кадров в таблице ("array" или "blob").
+    :param compression: Сжатие кадров при хранении "blob".
+    :param write_rollups: Записать сводки пакета в той же транзакции.
+    :return: True, если пакет записан.
+    """
+    try:
+        cursor = connection.cursor()
+        copy_query = f"""
+                COPY {table_name} (record_date, record_number, record_time, {FRAME_COLUMNS[storage]})
+                FROM STDIN (FORMAT binary);
+                """
+        if storage == "blob":
+            copy_data = pg_binary.build_copy_data(encode_blob_rows(rows, compression), pg_binary.encode_blob_row)
+        else:
+            copy_data = pg_binary.build_copy_data(rows)
+        cursor.copy_expert(copy_query, copy_data)
+        if write_rollups:
+            bd_write_rollups(cursor, table_name, rows)
+        bd_notify(cursor, table_name)
+        connection.commit()  # Фиксируем изменения
+        return True
+    except Exception as error:
+        # В случае ошибки откатываем изменения
+        connection.rollback()
+        print(f"Ошибка при копировании пакета данных в таблицу: {error}")
+        return False
     finally:
         cursor.close()
 
+
 def bd_write_mean(connection, table_name, record_date, record_number, record_time, mean1, mean2, mean3, mean4):
     try:
         cursor = connection.cursor()
@@ -165,25 +534,206 @@ def bd_write_mean(connection, table_name, record_date, record_number, record_tim
     finally:
         cursor.close()
 
-def read_process_output(process):
-    """Функция для чтения вывода процесса и помещения его в очередь."""
+def queue_put(out_queue, item):
+    """
+    Помещение элемента в ограниченную очередь.
+    Ожидает освобождения места, но прерывается при установке флага завершения.
+    :return: True, если элемент помещен в очередь.
+    """
+    while not stop_flag.is_set():
+        try:
+            out_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def queue_close(out_queue, consumer=None):
+    """
+    Помещение сигнала завершения (None) в очередь независимо от флага завершения.
+    Пока поток-потребитель работает, ожидает освобождения места: кадры в очереди будут обработаны.
+    Если потребитель остановлен (или его нет), а очередь заполнена, старейшие элементы отбрасываются,
+    чтобы сигнал гарантированно попал в очередь; количество отброшенных элементов выводится.
+    :param consumer: Поток, читающий очередь (threading.Thread) или None.
+    """
+    while True:
+        try:
+            out_queue.put(None, timeout=SHUTDOWN_TIMEOUT)
+            return
+        except queue.Full:
+            if consumer is None or not consumer.is_alive():
+                break
+            print(f"Ожидание обработки очереди: осталось {out_queue.qsize()} элементов.")
+    dropped = 0
+    while True:
+        try:
+            if out_queue.get_nowait() is not None:
+                dropped += 1
+        except queue.Empty:
+            pass
+        try:
+            out_queue.put_nowait(None)
+            break
+        except queue.Full:
+            continue
+    print(f"Ошибка: поток обработки очереди остановлен, отброшено {dropped} кадров.")
+
+
+def read_process_output(process, consumer=None):
+    """
+    Функция для чтения вывода процесса и помещения его в очередь.
+    :param consumer: Поток, читающий очередь data_queue (см. queue_close).
+    """
     for line in iter(process.stdout.readline, ''):
         if stop_flag.is_set():  # Проверяем флаг завершения
             break
-        data_queue.put(line.rstrip('\n'))
-    data_queue.put(None)  # Сигнал о завершении работы потока
+        queue_put(data_queue, line.rstrip('\n'))
+    queue_close(data_queue, consumer)  # Сигнал о завершении работы потока
 
 
-def save_to_file(show_plot=False):
-    """Функция для сохранения данных в файл и обновления массивов dataplot, dataplot2, dataplot3, dataplot4."""
-    global dataplot, dataplot2, dataplot3, dataplot4, prev_counter, bd_connect, bd_cursor
-    table_name = f"data_records"
+def read_process_output_binary(process, consumer=None):
+    """
+    Функция для чтения двоичных кадров из вывода процесса и помещения их в очередь.
+    Кадры читаются через readinto в заранее выделенный буфер и передаются уже разобранными.
+    :param consumer: Поток, читающий очередь data_queue (см. queue_close).
+    """
+    buffer = bytearray(frame_parser.MAX_FRAME_SIZE)
+    while not stop_flag.is_set():  # Проверяем флаг завершения
+        try:
+            frame = frame_parser.read_frame_binary(process.stdout, buffer)
+        except ValueError as error:
+            print(f"Ошибка при чтении кадра: {error}")
+            break
+        if frame is None:
+            break
+        queue_put(data_queue, frame)
+    queue_close(data_queue, consumer)  # Сигнал о завершении работы потока
 
-    if table_exists(bd_connect, table_name):
-        # Очистка таблицы перед записью данных
-        bd_clear(bd_connect, table_name)
+
+def write_to_bd(table_name="data_records", write_mode=None, storage=None, compression=None, partitioning=None):
+    """
+    Поток записи кадров в базу данных.
+    Таблица создается один раз при запуске, кадры накапливаются в пакеты
+    (не более BATCH_SIZE кадров или BATCH_TIMEOUT секунд) и записываются одной транзакцией.
+    При секционировании по суткам таблица не очищается: секции создаются при смене даты,
+    а секции старше RETENTION_DAYS удаляются.
+    :param write_mode: "insert" или "copy", по умолчанию WRITE_MODE.
+    :param storage: "array" или "blob", по умолчанию STORAGE.
+    :param compression: Сжатие кадров при хранении "blob", по умолчанию COMPRESSION.
+    :param partitioning: "none" или "day", по умолчанию PARTITIONING.
+    """
+    global bd_connect
+    write_batch = bd_copy_batch if (write_mode or WRITE_MODE) == "copy" else bd_write_batch
+    storage = storage or STORAGE
+    compression = compression or COMPRESSION
+    partitioning = partitioning or PARTITIONING
+    if storage == "blob":
+        try:
+            frame_codec.check_compression(compression)
+        except ValueError as error:
+            print(f"Ошибка: {error}, кадры будут записаны без сжатия.")
+            compression = "none"
+
+    existing_storage = table_storage(bd_connect, table_name)
+    partitioned = table_partitioned(bd_connect, table_name)
+    if existing_storage == storage and partitioned == (partitioning == "day"):
+        if not partitioned:
+            # Очистка таблицы перед записью данных
+            bd_clear(bd_connect, table_name)
     else:
-        print(f"Таблица '{table_name}' не существует.")
+        if existing_storage is None:
+            print(f"Таблица '{table_name}' не существует.")
+        elif partitioned:
+            # История секционированной таблицы сохраняется под другим именем
+            bd_rename_partitioned(bd_connect, table_name)
+        else:
+            # Таблица была бы очищена в любом случае, поэтому ее можно пересоздать с новой структурой
+            print(f"Структура таблицы '{table_name}' изменена.")
+            bd_drop(bd_connect, table_name)
+        bd_create_data_table(bd_connect, table_name, storage, partitioning)
+
+    # Если таблицы сводок не созданы, кадры записываются без сводок
+    write_rollups = WRITE_ROLLUPS and bd_create_rollup_tables(bd_connect, table_name)
+    if write_rollups:
+        if partitioning != "day":
+            # Сводки относятся к очищенной таблице кадров
+            bd_clear(bd_connect, f"{table_name}_frame_rollups")
+            bd_clear(bd_connect, f"{table_name}_second_rollups")
+
+    # Даты, для которых секции уже созданы
+    partition_dates = set()
+    if partitioning == "day":
+        bd_drop_old_partitions(bd_connect, table_name, RETENTION_DAYS)
+        if write_rollups:
+            bd_delete_old_rollups(bd_connect, table_name, RETENTION_DAYS)
+
+    # Статистика записи
+    frames_count = 0
+    batches_count = 0
+    batch_time_sum = 0
+    batch_time_max = 0
+    stats_start = time.perf_counter()
+
+    finished = False
+    while not finished:
+        batch = []
+        deadline = None
+        # Накопление пакета
+        while len(batch) < BATCH_SIZE:
+            timeout = 1 if deadline is None else deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                row = write_queue.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is None and stop_flag.is_set():
+                    finished = True
+                    break
+                continue
+            if row is None:
+                finished = True
+                break
+            if deadline is None:
+                deadline = time.perf_counter() + BATCH_TIMEOUT
+            batch.append(row)
+
+        if batch:
+            if partitioning == "day":
+                for record_date in {row[0] for row in batch} - partition_dates:
+                    if bd_create_partition(bd_connect, table_name, record_date):
+                        partition_dates.add(record_date)
+                        # Начались новые сутки: удаляем устаревшие секции и сводки
+                        bd_drop_old_partitions(bd_connect, table_name, RETENTION_DAYS)
+                        if write_rollups:
+                            bd_delete_old_rollups(bd_connect, table_name, RETENTION_DAYS)
+            batch_start = time.perf_counter()
+            if write_batch(bd_connect, table_name, batch, storage, compression, write_rollups):
+                batch_time = time.perf_counter() - batch_start
+                frames_count += len(batch)
+                batches_count += 1
+                batch_time_sum += batch_time
+                batch_time_max = max(batch_time_max, batch_time)
+
+        # Вывод статистики записи
+        elapsed = time.perf_counter() - stats_start
+        if batches_count and (elapsed >= STATS_INTERVAL or finished):
+            print(f"Запись: {frames_count / elapsed:.1f} кадров/с, пакетов {batches_count}, "
+                  f"задержка пакета: средняя {batch_time_sum / batches_count * 1000:.1f} мс, "
+                  f"макс. {batch_time_max * 1000:.1f} мс, в очереди {write_queue.qsize()}")
+            frames_count = 0
+            batches_count = 0
+            batch_time_sum = 0
+            batch_time_max = 0
+            stats_start = time.perf_counter()
+
+
+def save_to_file(show_plot=False, consumer=None):
+    """
+    Функция для сохранения данных в файл и обновления буфера графиков plot_buffer.
+    :param consumer: Поток записи в базу данных, читающий очередь write_queue (см. queue_close).
+    """
+    global prev_counter
 
     while not stop_flag.is_set():  # Проверяем флаг завершения
         # Получение данных из очереди
@@ -193,50 +743,42 @@ def save_to_file(show_plot=False):
             continue
         if data is None:
             break
-        data_list = data.split(" ")
-        if len(data_list) > 3:
-            counter = data_list[2]
-            if is_convertible_to_int(counter):
-                if int(counter) > prev_counter:
-                    prev_counter = int(counter)
-
-                    data_iter = data_list[8].split(";")
-                    # Преобразуем данные из data_iter в числа для первой линии
-                    new_data1 = [int(x) for x in data_iter[0:-2:4]]
-                    # Данные для второй линии
-                    new_data2 = [int(x) for x in data_iter[1:-2:4]]
-                    # Данные для третьей линии
-                    new_data3 = [int(x) for x in data_iter[2:-2:4]]
-                    # Данные для четвёртой линии
-                    new_data4 = [int(x) for x in data_iter[3::4]]
-
-                    time = f"{data_list[4]}:{data_list[5]}:{data_list[6]}.{data_list[7]}"
-
-                    bd_write_data(bd_connect, "data_records" , "2025-02-07", counter, time,
-                                  new_data1, new_data2, new_data3, new_data4)
-
-                    if show_plot:
-                        dataplot = np.append(dataplot, new_data1)[-MAX_DATAPOINTS:]
-                        dataplot2 = np.append(dataplot2, new_data2)[-MAX_DATAPOINTS:]
-                        dataplot3 = np.append(dataplot3, new_data3)[-MAX_DATAPOINTS:]
-                        dataplot4 = np.append(dataplot4, new_data4)[-MAX_DATAPOINTS:]
+        # В двоичном режиме кадр приходит уже разобранным
+        frame = data if isinstance(data, tuple) else frame_parser.parse_frame_line(data)
+        if frame is not None:
+            counter, time, channels = frame
+            if counter > prev_counter:
+                prev_counter = counter
+
+                # Данные четырёх линий: строки массива channels формы (4, N)
+                new_data1, new_data2, new_data3, new_data4 = channels
+
+                # Передаем кадр в поток записи в базу данных
+                queue_put(write_queue, (datetime.date.today(), counter, time,
+                                        new_data1, new_data2, new_data3, new_data4))
 
+                # Передаем кадр в GUI через разделяемую память
+                if frame_ring is not None:
+                    frame_ring.write(counter, channels)
+
+                if show_plot:
+                    plot_buffer.write(channels)
+
+    queue_close(write_queue, consumer)  # Сигнал о завершении записи
     print("Файл сохранен.")
 
 def update(frame):
-    global dataplot, dataplot2, dataplot3, dataplot4
-    # Отображаем только последние MAX_DATAPOINTS точек для всех линий
-    line.set_data(np.arange(len(dataplot)), dataplot)
-    line2.set_data(np.arange(len(dataplot2)), dataplot2)
-    line3.set_data(np.arange(len(dataplot3)), dataplot3)
-    line4.set_data(np.arange(len(dataplot4)), dataplot4)
-    # Обновляем пределы графика по оси X
-    ax.set_xlim(0, max(len(dataplot), len(dataplot2), len(dataplot3), len(dataplot4)))
+    # Отображаем последние MAX_DATAPOINTS точек для всех линий, прореженные до ширины графика
+    for plot_line, dataplot in zip(plot_lines, plot_buffer.latest()):
+        plot_line.set_data(plot_x, dataplot)
     return line, line2, line3, line4
 
 def check_for_esc():
     """Функция для отслеживания нажатия клавиши Esc."""
     global stop_flag
+    if msvcrt is None:
+        print("Ошибка: обработка Esc доступна только в консоли Windows.")
+        return
     while not stop_flag.is_set():
         if msvcrt.kbhit():  # Проверяем, была ли нажата клавиша
             key = msvcrt.getch()
@@ -246,17 +788,42 @@ def check_for_esc():
                 break
         time.sleep(0.1)  # Небольшая пауза, чтобы не перегружать CPU
 
-def main(path_to_file, show_plot=True, handle_esc=True, in_stop_flag=None):
+def main(path_to_file, show_plot=True, handle_esc=True, in_stop_flag=None, record_config=None, shm_name=None):
     """
         Основная функция программы.
         :param show_plot: Если True, отображает графики.
         :param handle_esc: Если True, обрабатывает нажатие клавиши Esc.
+        :param record_config: Параметры записи (раздел "config_record" файла config.json).
+        :param shm_name: Имя кольца кадров в разделяемой памяти, созданного GUI.
     """
     global stop_flag   # Используем глобальный флаг
     if in_stop_flag is not None:
         stop_flag = in_stop_flag  # Присваиваем переданный флаг
 
-    global fig, ax, line, line2, line3, line4, ani, bd_connect, bd_cursor
+    global BATCH_SIZE, BATCH_TIMEOUT, WRITE_MODE, PROTOCOL, STORAGE, COMPRESSION, PARTITIONING, RETENTION_DAYS
+    global WRITE_ROLLUPS
+    if record_config:
+        BATCH_SIZE = record_config.get("batch_size", BATCH_SIZE)
+        BATCH_TIMEOUT = record_config.get("batch_timeout", BATCH_TIMEOUT)
+        WRITE_MODE = record_config.get("write_mode", WRITE_MODE)
+        PROTOCOL = record_config.get("protocol", PROTOCOL)
+        STORAGE = record_config.get("storage", STORAGE)
+        COMPRESSION = record_config.get("compression", COMPRESSION)
+        PARTITIONING = record_config.get("partitioning", PARTITIONING)
+        RETENTION_DAYS = record_config.get("retention_days", RETENTION_DAYS)
+        WRITE_ROLLUPS = record_config.get("rollups", WRITE_ROLLUPS)
+
+    # Размер очередей зависит от размера пакета из настроек
+    global data_queue, write_queue
+    data_queue = queue.Queue(maxsize=BATCH_SIZE * QUEUE_BATCHES)
+    write_queue = queue.Queue(maxsize=BATCH_SIZE * QUEUE_BATCHES)
+
+    global fig, ax, line, line2, line3, line4, ani, bd_connect, bd_cursor, frame_ring
+    if shm_name:
+        try:
+            frame_ring = SharedFrameRing(name=shm_name)
+        except Exception as error:
+            print(f"Ошибка подключения к разделяемой памяти: {error}")
     # Подключаемся к базе данных
     try:
         bd_connect, bd_cursor = bd_init()
@@ -266,32 +833,45 @@ def main(path_to_file, show_plot=True, handle_esc=True, in_stop_flag=None):
         bd_close(bd_connect, bd_cursor)
 
     # Запуск внешнего процесса
-    process = subprocess.Popen(
-        path_to_file,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True,
-    )
-
-    # Создание потоков
-    reading_thread = threading.Thread(target=read_process_output, args=(process,))
-    saving_thread = threading.Thread(target=save_to_file, args=(show_plot,))
+    if PROTOCOL == "binary":
+        # Двоичный режим: stderr не смешивается с кадрами
+        process = subprocess.Popen(
+            path_to_file,
+            stdout=subprocess.PIPE,
+        )
+        read_output = read_process_output_binary
+    else:
+        process = subprocess.Popen(
+            path_to_file,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+        )
+        read_output = read_process_output
+
+    # Создание потоков (каждый поток, передающий кадры дальше, знает своего потребителя, см. queue_close)
+    writing_thread = threading.Thread(target=write_to_bd)
+    saving_thread = threading.Thread(target=save_to_file, args=(show_plot, writing_thread))
+    reading_thread = threading.Thread(target=read_output, args=(process, saving_thread))
 
     # Запуск потоков
     reading_thread.start()
     saving_thread.start()
+    writing_thread.start()
 
     if show_plot:
         fig, ax = plt.subplots()
         # Создание четырёх линий на графике
-        line, = ax.plot(np.arange(len(dataplot)), dataplot, label="Линия 1", color="blue")
-        line2, = ax.plot(np.arange(len(dataplot2)), dataplot2, label="Линия 2", color="red")
-        line3, = ax.plot(np.arange(len(dataplot3)), dataplot3, label="Линия 3", color="green")
-        line4, = ax.plot(np.arange(len(dataplot4)), dataplot4, label="Линия 4", color="orange")
+        dataplot, dataplot2, dataplot3, dataplot4 = plot_buffer.latest()
+        line, = ax.plot(plot_x, dataplot, label="Линия 1", color="blue")
+        line2, = ax.plot(plot_x, dataplot2, label="Линия 2", color="red")
+        line3, = ax.plot(plot_x, dataplot3, label="Линия 3", color="green")
+        line4, = ax.plot(plot_x, dataplot4, label="Линия 4", color="orange")
         # Настройка осей
         ax.set_xlim(0, MAX_DATAPOINTS)
         ax.set_ylim(-100, 8000)  # Установим пределы по оси Y, например, от -1 до 8000
         ax.legend()
+        plot_lines[:] = [DecimatedLine(plot_line) for plot_line in (line, line2, line3, line4)]
 
         ani = FuncAnimation(fig, update, interval=500, blit=True, cache_frame_data=False)
         plt.show()
@@ -311,6 +891,7 @@ def main(path_to_file, show_plot=True, handle_esc=True, in_stop_flag=None):
     # Ожидание завершения потоков
     reading_thread.join()
     saving_thread.join()
+    writing_thread.join()
 
     if handle_esc:
         esc_thread.join()
@@ -318,6 +899,10 @@ def main(path_to_file, show_plot=True, handle_esc=True, in_stop_flag=None):
     # Закрываем процесс
     process.terminate()
 
+    # Отключаемся от разделяемой памяти
+    if frame_ring is not None:
+        frame_ring.close()
+
     # Закрываем базу данных
     bd_close(bd_connect, bd_cursor)
     print("Программа завершена")
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Количество точек на столбец пикселей после прореживания
+POINTS_PER_PIXEL = 2
+
+
+def minmax_envelope(x, y, bins):
+    """
+    Прореживание огибающей min/max: в каждом из bins интервалов остаются минимум и максимум
+    в порядке их следования, поэтому пики не теряются.
+    :param x: Массив координат X (возрастающий).
+    :param y: Массив значений.
+    :param bins: Количество интервалов (каждый дает 2 точки).
+    :return: Кортеж (x, y) прореженных данных.
+    """
+    count = len(y)
+    if bins <= 0 or count <= 2 * bins:
+        return x, y
+    size = -(-count // bins)  # Отсчетов в интервале (с округлением вверх)
+    bins = -(-count // size)
+    # Последний интервал дополняется последним значением, это не меняет его минимум и максимум
+    padded = np.empty(bins * size, dtype=y.dtype)
+    padded[:count] = y
+    padded[count:] = y[-1]
+    blocks = padded.reshape(bins, size)
+    offsets = np.arange(bins) * size
+    index_min = blocks.argmin(axis=1) + offsets
+    index_max = blocks.argmax(axis=1) + offsets
+    index = np.empty(2 * bins, dtype=np.intp)
+    index[0::2] = np.minimum(index_min, index_max)
+    index[1::2] = np.maximum(index_min, index_max)
+    np.minimum(index, count - 1, out=index)
+    return x[index], y[index]
+
+
+def lttb(x, y, threshold):
+    """
+    Прореживание Largest-Triangle-Three-Buckets: из каждого интервала выбирается точка,
+    образующая треугольник наибольшей площади с выбранной точкой предыдущего интервала
+    и средней точкой следующего. Лучше сохраняет форму сигнала, но медленнее огибающей min/max.
+    :param threshold: Количество точек результата.
+    :return: Кортеж (x, y) прореженных данных.
+    """
+    count = len(y)
+    if threshold < 3 or count <= threshold:
+        return x, y
+    x_values = np.asarray(x, dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    # Границы интервалов без первой и последней точек, которые сохраняются всегда
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.intp)
+    # Средние точки всех интервалов (последний интервал - последняя точка)
+    sizes = np.diff(np.append(edges, count))
+    mean_x = np.add.reduceat(x_values, edges) / sizes
+    mean_y = np.add.reduceat(y_values, edges) / sizes
+    index = np.empty(threshold, dtype=np.intp)
+    index[0] = 0
+    index[-1] = count - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        # Удвоенная площадь треугольника (выбранная точка, кандидат, средняя точка следующего интервала)
+        areas = np.abs((x_values[selected] - next_x) * (y_values[start:end] - y_values[selected])
+                       - (x_values[selected] - x_values[start:end]) * (next_y - y_values[selected]))
+        selected = start + int(areas.argmax())
+        index[bucket + 1] = selected
+    return x[index], y[index]
+
+
+METHODS = {"minmax": minmax_envelope, "lttb": lttb}
+
+
+class DecimatedLine:
+    def __init__(self, line, method="minmax", points_per_pixel=POINTS_PER_PIXEL):
+        """
+        Вывод длинного ряда в линию matplotlib с прореживанием до points_per_pixel точек
+        на столбец пикселей области графика. Исходные данные сохраняются,
+        поэтому при изменении размера окна ряд прореживается заново.
+        :param line: Объект Line2D.
+        :param method: "minmax" (огибающая min/max) или "lttb".
+        """
+        self.line = line
+        self.method = method
+        self.points_per_pixel = points_per_pixel
+        self.x = None
+        self.y = None
+        line.figure.canvas.mpl_connect("resize_event", self.on_resize)
+
+    def pixels(self):
+        """Ширина области графика в пикселях."""
+        return max(int(self.line.axes.get_window_extent().width), 1)
+
+    def set_data(self, x, y):
+        """
+        Установка данных линии.
+        :param x: Возрастающий массив координат X.
+        :param y: Массив значений той же длины (может быть представлением кольцевого буфера).
+        """
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.line.set_data(*self.decimate())
+        return self.line
+
+    def decimate(self):
+        x, y = self.x, self.y
+        # Прореживается только видимая часть ряда
+        x_min, x_max = self.line.axes.get_xlim()
+        start, end = np.searchsorted(x, [min(x_min, x_max), max(x_min, x_max)])
+        start, end = max(start - 1, 0), min(end + 1, len(x))
+        x, y = x[start:end], y[start:end]
+        points = self.pixels() * self.points_per_pixel
+        if self.method == "lttb":
+            return lttb(x, y, points)
+        return minmax_envelope(x, y, points // 2)
+
+    def on_resize(self, event):
+        if self.x is not None:
+            self.line.set_data(*self.decimate())
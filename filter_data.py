@@ -3,9 +3,11 @@ from scipy.special.cython_special import eval_sh_legendre
 
 import data_read
 import matplotlib.pyplot as plt
-from scipy.signal import butter, filtfilt
+from scipy.signal import butter, filtfilt, sosfiltfilt, sosfilt, sosfilt_zi, group_delay
+from functools import lru_cache
 import time
 
+# Подключение к базе данных выполняется при первом запросе (общий пул bd_pool)
 DB = data_read.DataRead()
 
 # Генерация тестового сигнала
@@ -26,17 +28,66 @@ noisy_signal = []
 filtered_signal = []
 noise_estimated = []
 
-# 1. Фильтрация для выделения основной гармоники
-def lowpass_filter(data, cutoff, fs, order=5):
-    # Вычисление параметров фильтра
+# Количество наборов коэффициентов фильтра, хранимых в кэше
+FILTER_CACHE_SIZE = 32
+
+# Расчет коэффициентов фильтра Баттерворта с кэшированием по параметрам (вытеснение LRU).
+# Возвращаемые массивы общие для всех вызовов и не должны изменяться.
+# output='ba' - коэффициенты b, a; output='sos' - каскад секций второго порядка
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def design_lowpass(order, cutoff, fs, output='ba'):
     nyquist = 0.5 * fs
     normal_cutoff = cutoff / nyquist
-    b, a = butter(order, normal_cutoff, btype='low', analog=False)
+    return butter(order, normal_cutoff, btype='low', analog=False, output=output)
+
+# Статистика кэша коэффициентов: hits, misses, maxsize, currsize
+def filter_cache_info():
+    return design_lowpass.cache_info()
+
+# 1. Фильтрация для выделения основной гармоники
+# sos=True - фильтрация секциями второго порядка (sosfiltfilt), устойчива при большом отношении fs/cutoff
+# axis - ось отсчетов, если фильтруется сразу несколько каналов
+def lowpass_filter(data, cutoff, fs, order=5, sos=False, axis=-1):
     # Применение фильтра
-    filtered_data = filtfilt(b, a, data)
+    if sos:
+        filtered_data = sosfiltfilt(design_lowpass(order, cutoff, fs, 'sos'), data, axis=axis)
+    else:
+        b, a = design_lowpass(order, cutoff, fs)
+        filtered_data = filtfilt(b, a, data, axis=axis)
     # Преобразование результата в целочисленный тип (int)
     return filtered_data.astype(int)
 
+# Потоковый (причинный) фильтр нижних частот для отображения в реальном времени.
+# Состояние фильтра (zi) сохраняется между вызовами, поэтому обрабатываются только новые отсчеты.
+# Результат запаздывает относительно исходного сигнала на delay отсчетов (групповая задержка на частоте freq).
+# Используется только для отображения: фазовый сдвиг причинного фильтра зависит от частоты и не компенсируется
+# сдвигом на delay, поэтому амплитуды и процент шума всегда вычисляются lowpass_filter (без фазового сдвига).
+class StreamingLowpass:
+    def __init__(self, cutoff, fs, order=5, freq=None):
+        self.sos = design_lowpass(order, cutoff, fs, 'sos')
+        self.zi = None
+        # Групповая задержка фильтра на частоте основного сигнала в отсчетах
+        b, a = design_lowpass(order, cutoff, fs)
+        _, gd = group_delay((b, a), w=[freq if freq else cutoff / 10], fs=fs)
+        self.delay = int(round(gd[0]))
+
+    # Фильтрация новых отсчетов: data формы (k,) или (каналы, k)
+    def process(self, data):
+        data = np.asarray(data, dtype=float)
+        if data.shape[-1] == 0:
+            return data
+        if self.zi is None:
+            # Начальное состояние по первому отсчету, чтобы не было переходного процесса от нуля
+            zi = sosfilt_zi(self.sos)
+            first = data[..., 0]
+            self.zi = zi.reshape((zi.shape[0],) + (1,) * first.ndim + (2,)) * first[..., np.newaxis]
+        filtered, self.zi = sosfilt(self.sos, data, axis=-1, zi=self.zi)
+        return filtered
+
+    # Сброс состояния (например, после пропуска кадров)
+    def reset(self):
+        self.zi = None
+
 # Экспорт данных из базы
 def data_export(data, channel=1):
     if channel < 1:
@@ -44,37 +95,70 @@ def data_export(data, channel=1):
     elif channel > 4:
         channel = 4
 
+    # Кадры в виде массива (кадры, 4, N) в хронологическом порядке или уже экспортированный массив (4, N).
+    # Для кадров из DataRead.bd_read_last_frames / bd_read_new_frames (хранятся по каналам) копирования нет
+    if isinstance(data, np.ndarray):
+        if data.ndim == 2:
+            return data[channel - 1]
+        return data[:, channel - 1, :].ravel()
+
     if not data:
         return np.array([])
     # Извлекаем массив данных из записи
     data_frames = np.array([row[3 + channel] for row in data[::-1]])
     return data_frames.ravel()
 
-#Нахождение индексов интервалов
-def find_intervals(above_threshold, min_count):
-    start_index = None
-    n = 0
+# Начала и концы (не включительно) всех интервалов, где above_threshold истинно
+def interval_edges(above_threshold):
+    padded = np.concatenate(([0], np.asarray(above_threshold, dtype=np.int8), [0]))
+    changes = np.diff(padded)
+    return np.flatnonzero(changes == 1), np.flatnonzero(changes == -1)
 
-    for i, value in enumerate(above_threshold):
-        if value:
-            if start_index is None:  # Начало нового интервала
-                start_index = i
-        else:
-            if start_index is not None:  # Конец интервала
-                yield [start_index, i]
-                n += 1
-                start_index = None
+# Экспорт всех четырех каналов в один массив формы (4, N) в хронологическом порядке
+def data_export_all(data):
+    if isinstance(data, np.ndarray):
+        if data.ndim == 2:
+            return data
+        return data.transpose(1, 0, 2).reshape(4, -1)
 
-        if n >= min_count:  # Досрочное завершение, если найдено достаточно интервалов
-            break
+    if not data:
+        return np.empty((4, 0), dtype=int)
+    # Записи базы данных идут от новых к старым
+    data_frames = np.array([row[4:8] for row in data[::-1]])
+    return data_frames.transpose(1, 0, 2).reshape(4, -1)
 
-    # Если последний интервал доходит до конца массива
-    if start_index is not None and n < min_count:
-        yield [start_index, len(above_threshold)]
+#Нахождение индексов интервалов
+def find_intervals(above_threshold, min_count):
+    starts, ends = interval_edges(above_threshold)
+    # Берем только первые min_count интервалов
+    min_count = max(min_count, 0)
+    for start, end in zip(starts[:min_count].tolist(), ends[:min_count].tolist()):
+        yield [start, end]
+
+# Поиск импульсов: интервал начинается при data > threshold.
+# low_threshold - нижний порог гистерезиса: интервал заканчивается только при data <= low_threshold.
+# min_width - минимальная длительность импульса в отсчетах (более короткие считаются помехой).
+# Возвращает массивы начал и концов (не включительно) импульсов
+def detect_pulses(data, threshold, low_threshold=None, min_width=0):
+    data = np.asarray(data)
+    if low_threshold is None or low_threshold >= threshold:
+        state = data > threshold
+    else:
+        # Триггер Шмитта: состояние определяется последним пересечением одного из порогов
+        high = data > threshold
+        events = high | (data <= low_threshold)
+        last_event = np.maximum.accumulate(np.where(events, np.arange(len(data)), -1))
+        state = (last_event >= 0) & high[np.maximum(last_event, 0)]
+    starts, ends = interval_edges(state)
+    if min_width > 0:
+        keep = ends - starts >= min_width
+        starts, ends = starts[keep], ends[keep]
+    return starts, ends
 
 
 # Подсчет оборотов
-def count_turn(data, channel = 4, threshold = 5000, sampling_rate=10_000, min_count = 5):
+def count_turn(data, channel = 4, threshold = 5000, sampling_rate=10_000, min_count = 5,
+               low_threshold=None, min_width=0):
     try:
         noisy_data = data_export(data, channel=channel)
     except Exception as e:
@@ -85,13 +169,11 @@ def count_turn(data, channel = 4, threshold = 5000, sampling_rate=10_000, min_co
     if min_count < 2:
         min_count = 2
 
-    # Шаг 1: Находим индексы, где значение выше порогового
-    above_threshold = noisy_data > threshold
-
-    # Шаг 2: Вычисляем длительность импульса в точках
+    # Шаг 1: Находим импульсы, где значение выше порогового (с гистерезисом и отбраковкой коротких помех)
+    starts, ends = detect_pulses(noisy_data, threshold, low_threshold, min_width)
 
     #Находим индексы импульсов
-    index_threshold = list(find_intervals(above_threshold, min_count))
+    index_threshold = np.column_stack((starts[:min_count], ends[:min_count])).tolist()
 
     # Шаг 1: Вычисление длительности между импульсами
     if len(index_threshold) < 2:
@@ -124,15 +206,105 @@ def count_turn(data, channel = 4, threshold = 5000, sampling_rate=10_000, min_co
 
     return len(index_threshold), index_null, pulse_durations, rpm_values
 
+# Результат обработки кадров функцией process_frames.
+# Значения по каналам (amplitude, noise_amplitude, noise_percentage, cycles, filtered)
+# идут в порядке параметра channels
+class ProcessResult:
+    def __init__(self, channels):
+        self.channels = list(channels)
+        self.amplitude = np.full(len(self.channels), np.nan)  # Средний размах сигнала (nan, если нет оборотов)
+        self.noise_amplitude = np.full(len(self.channels), np.nan)  # Средний размах шума
+        self.noise_percentage = np.zeros(len(self.channels))  # Процент шума
+        self.cycles = []  # Размахи сигнала по оборотам
+        self.noise_cycles = []  # Размахи шума по оборотам
+        self.filtered = None  # Отфильтрованные данные, массив (каналы, N)
+        self.count_impulse = 0
+        self.index_null = []
+        self.pulse_durations = 0
+        self.rpm = 0
+        self.temperature = 0
+
+# Обработка кадров одним вызовом: экспорт всех каналов один раз, совместная фильтрация выбранных каналов,
+# обороты, размахи и процент шума, средняя температура.
+# negative_data - способ расчета размаха для каждого из channels (см. cycle_amplitudes).
+def process_frames(data, channels=(1, 2), negative_data=(True, False), freq=10, fs=2045,
+                   rpm_channel=4, temperature_channel=3, threshold=5000, sampling_rate=10_000, min_count=5,
+                   sos=True):
+    result = ProcessResult(channels)
+    all_data = data_export_all(data)
+    if all_data.shape[1] == 0:
+        return result
+
+    # Обороты
+    (result.count_impulse, result.index_null,
+     result.pulse_durations, result.rpm) = count_turn(all_data, channel=rpm_channel, threshold=threshold,
+                                                      sampling_rate=sampling_rate, min_count=min_count)
+    # Температура
+    result.temperature = np.mean(all_data[temperature_channel - 1])
+
+    # Совместная фильтрация выбранных каналов
+    rows = [channel - 1 for channel in channels]
+    filtered_data = lowpass_filter(all_data[rows], cutoff=freq * 2, fs=fs, sos=sos, axis=-1)
+    result.filtered = filtered_data
+
+    # Размахи по оборотам и процент шума
+    for i, row in enumerate(rows):
+        noise = all_data[row] - filtered_data[i]
+        main_cycles, noise_cycles = cycle_amplitudes(filtered_data[i], noise, result.index_null, negative_data[i])
+        result.cycles.append(main_cycles)
+        result.noise_cycles.append(noise_cycles)
+        if len(main_cycles):
+            result.amplitude[i] = np.mean(main_cycles)
+            result.noise_amplitude[i] = np.mean(noise_cycles)
+        if result.amplitude[i] > 0:
+            result.noise_percentage[i] = (result.noise_amplitude[i] / (result.amplitude[i] * 2)) * 100
+
+    return result
+
+# Размах сигнала и шума для каждого оборота (между соседними индексами index_null, индексы не убывают).
+# Максимумы и минимумы всех оборотов вычисляются за один проход (np.maximum.reduceat / np.minimum.reduceat).
+# negative_data=True - размах сигнала считается как max(положительных) - |min(отрицательных)|
+# Пустой оборот (совпадающие соседние индексы) дает размахи 1, как начальные значения max/min исходного цикла:
+# reduceat для него вернул бы отсчет в начале оборота
+def cycle_amplitudes(filtered_data, noise, index_null, negative_data=True):
+    bounds = np.asarray(index_null, dtype=np.intp)
+    bounds = bounds[bounds <= len(filtered_data)]
+    if len(bounds) < 2:
+        return np.array([]), np.array([])
+    main_cycles = np.ones(len(bounds) - 1, dtype=np.result_type(filtered_data, int))
+    noise_cycles = np.ones(len(bounds) - 1, dtype=np.result_type(noise, int))
+    valid = np.diff(bounds) > 0
+    if not valid.any():
+        return main_cycles, noise_cycles
+    # Без пустых оборотов начала оставшихся оборотов идут подряд, каждый продолжается до начала следующего
+    starts = bounds[:-1][valid]
+    end = bounds[-1]
+
+    signal_max = np.maximum.reduceat(filtered_data[:end], starts)
+    signal_min = np.minimum.reduceat(filtered_data[:end], starts)
+    if negative_data:
+        main_cycles[valid] = np.maximum(signal_max, 1) - np.abs(np.minimum(signal_min, 0))
+    else:
+        main_cycles[valid] = np.maximum(signal_max, 1) - signal_min
+
+    noise_max = np.maximum.reduceat(noise[:end], starts)
+    noise_min = np.minimum.reduceat(noise[:end], starts)
+    noise_cycles[valid] = np.maximum(noise_max, 1) + np.abs(np.minimum(noise_min, 0))
+
+    return main_cycles, noise_cycles
+
+# per_cycle=True - дополнительно возвращаются массивы размахов сигнала и шума по оборотам
 def filter_data(data, channel = 1, freq = 10, fs = 2045, only_filter=True,
-                negative_data=True, index_null = -1):
+                negative_data=True, index_null = -1, sos=False, per_cycle=False):
     main_amplitude = []
     noise_amplitude = []
+    main_cycles = np.array([])
+    noise_cycles = np.array([])
     noise_percentage = 0
 
     noisy_data = data_export(data, channel=channel)
 
-    filtered_data = lowpass_filter(noisy_data, cutoff=freq * 2, fs=fs)  # Фильтруем выше удвоенной частоты
+    filtered_data = lowpass_filter(noisy_data, cutoff=freq * 2, fs=fs, sos=sos)  # Фильтруем выше удвоенной частоты
 
     if only_filter:
         return filtered_data
@@ -145,31 +317,18 @@ def filter_data(data, channel = 1, freq = 10, fs = 2045, only_filter=True,
         main_amplitude = np.max(np.abs(filtered_data)) * 2  # Двойная амплитуда основного сигнала
 
     else:
-        for i in range(len(index_null) - 1):
-            wave = filtered_data[index_null[i]:index_null[i+1]]
-            if negative_data:
-                max_amp = np.max(wave[wave > 0], initial=1)
-                min_amp = np.min(wave[wave < 0], initial=0)
-                main_amplitude.append(max_amp - abs(min_amp))
-            else:
-                max_amp = np.max(wave, initial=1)
-                min_amp = np.min(wave)
-                main_amplitude.append(max_amp - min_amp)
-
-        main_amplitude = np.mean(main_amplitude)
-
-        for i in range(len(index_null) - 1):
-            wave = noise[index_null[i]:index_null[i + 1]]
-            max_amp = np.max(wave[wave > 0], initial=1)
-            min_amp = np.min(wave, initial=0)
-            noise_amplitude.append(max_amp + abs(min_amp))
-
-        noise_amplitude = np.mean(noise_amplitude)
+        main_cycles, noise_cycles = cycle_amplitudes(filtered_data, noise, index_null, negative_data)
+        main_amplitude = np.mean(main_cycles)
+        noise_amplitude = np.mean(noise_cycles)
 
     # 4. Вычисление процента шума
     if main_amplitude > 0:
         noise_percentage = (noise_amplitude / (main_amplitude*2)) * 100
 
+    if per_cycle:
+        return (noisy_data, filtered_data, noise, main_amplitude, noise_amplitude, noise_percentage,
+                main_cycles, noise_cycles)
+
     return  noisy_data, filtered_data, noise, main_amplitude, noise_amplitude, noise_percentage
 
 def update():
@@ -0,0 +1,85 @@
+import struct
+import zlib
+import numpy as np
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Количество каналов АЦП в кадре
+CHANNELS = 4
+
+# Компактное хранение кадра в одном столбце bytea:
+# заголовок (способ сжатия, количество каналов, количество отсчетов в канале)
+# и отсчеты int16 little-endian с чередованием каналов (a1 b1 c1 d1 a2 ...)
+BLOB_HEADER = struct.Struct("<BBH")
+SAMPLE_TYPE = np.dtype("<i2")
+COMPRESSIONS = {"none": 0, "zlib": 1, "lz4": 2}
+COMPRESSION_NAMES = {code: name for name, code in COMPRESSIONS.items()}
+ZLIB_LEVEL = 1  # Уровень сжатия zlib: запись идет в реальном времени, поэтому выбран самый быстрый
+
+
+def check_compression(compression):
+    """
+    Проверка доступности способа сжатия.
+    :raise ValueError: Неизвестный способ сжатия или не установлен модуль lz4.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестный способ сжатия: {compression}")
+    if compression == "lz4" and lz4 is None:
+        raise ValueError("Для сжатия lz4 необходимо установить пакет lz4")
+
+
+def encode_frame(channels, compression="none"):
+    """
+    Кодирование кадра в blob.
+    :param channels: Массив формы (4, N) или последовательность из 4 массивов отсчетов.
+    :param compression: "none", "zlib" или "lz4".
+    :return: Байты blob.
+    """
+    check_compression(compression)
+    channels = np.asarray(channels)
+    if channels.size and (channels.min() < -32768 or channels.max() > 32767):
+        raise ValueError("Отсчеты кадра не помещаются в int16")
+    payload = channels.T.astype(SAMPLE_TYPE).tobytes()
+    if compression == "zlib":
+        payload = zlib.compress(payload, ZLIB_LEVEL)
+    elif compression == "lz4":
+        payload = lz4.frame.compress(payload)
+    return BLOB_HEADER.pack(COMPRESSIONS[compression], channels.shape[0], channels.shape[1]) + payload
+
+
+def frame_samples(blob):
+    """Количество отсчетов в канале по заголовку blob (0 для NULL)."""
+    if blob is None:
+        return 0
+    return BLOB_HEADER.unpack_from(blob)[2]
+
+
+def decode_frame(blob, out):
+    """
+    Декодирование blob в предварительно выделенный массив.
+    Способ сжатия определяется по заголовку, поэтому в одной таблице могут храниться кадры с разным сжатием.
+    Лишние отсчеты отбрасываются, недостающие заполняются нулями.
+    :param blob: Байты blob (memoryview, bytes) или None для NULL.
+    :param out: Массив формы (4, samples), в который записываются отсчеты.
+    :return: Количество декодированных отсчетов в канале.
+    """
+    if blob is None:
+        out[:] = 0
+        return 0
+    code, channels, count = BLOB_HEADER.unpack_from(blob)
+    if code not in COMPRESSION_NAMES or channels != CHANNELS:
+        raise ValueError(f"Некорректный заголовок кадра: сжатие {code}, каналов {channels}")
+    payload = memoryview(blob)[BLOB_HEADER.size:]
+    if code == COMPRESSIONS["zlib"]:
+        payload = zlib.decompress(payload)
+    elif code == COMPRESSIONS["lz4"]:
+        check_compression("lz4")
+        payload = lz4.frame.decompress(payload)
+    samples = np.frombuffer(payload, dtype=SAMPLE_TYPE, count=CHANNELS * count).reshape(-1, CHANNELS)
+    count = min(count, out.shape[1])
+    out[:, :count] = samples[:count].T
+    out[:, count:] = 0
+    return count
@@ -0,0 +1,125 @@
+import struct
+import numpy as np
+
+# Количество каналов АЦП в кадре
+CHANNELS = 4
+
+# Двоичный формат кадра (порядок байт little-endian):
+# длина кадра uint32 (количество байт после этого поля), заголовок и 4×N отсчетов с чередованием каналов
+FRAME_LENGTH = struct.Struct("<I")
+# Заголовок: счетчик, часы, минуты, секунды, миллисекунды, размер отсчета в байтах (2 или 4), N
+FRAME_HEADER = struct.Struct("<IBBBHBI")
+SAMPLE_TYPES = {2: np.dtype("<i2"), 4: np.dtype("<i4")}
+# Максимальный размер кадра, под который выделяется буфер чтения
+MAX_SAMPLES = 8192
+MAX_FRAME_SIZE = FRAME_HEADER.size + CHANNELS * MAX_SAMPLES * 4
+
+
+def parse_payload(payload):
+    """
+    Разбор строки отсчетов 'a1;b1;c1;d1;a2;b2;...;' одним вызовом NumPy.
+    :param payload: Строка (или байты) отсчетов, разделенных ';'.
+    :return: Массив int32 формы (4, N), по строке на канал,
+             или None, если строка повреждена (не число, выход за int32) или короче одной четверки отсчетов.
+    """
+    try:
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            payload = bytes(payload).decode("ascii")
+        # Часть после последнего ';' (пустая строка или остаток перевода строки) отбрасывается
+        end = payload.rfind(";")
+        if end <= 0:
+            return None
+        values = np.loadtxt([payload[:end]], delimiter=";", dtype=np.int32, comments=None, ndmin=1)
+    except ValueError:
+        return None
+    if values.size < CHANNELS:
+        return None
+    # Отбрасываем неполную четверку отсчетов в конце кадра
+    values = values[:len(values) - len(values) % CHANNELS]
+    # Отсчеты каналов чередуются: разделяем их перестановкой осей
+    return np.ascontiguousarray(values.reshape(-1, CHANNELS).T)
+
+
+def parse_frame_line(line):
+    """
+    Разбор строки кадра, выводимой программой сбора данных.
+    Формат: '<..> <..> <счетчик> <..> <ч> <мин> <с> <мс> <отсчеты через ;>'.
+    :param line: Строка кадра.
+    :return: Кортеж (counter, time, channels) или None, если строка не является кадром или повреждена.
+             channels - массив int32 формы (4, N).
+    """
+    data_list = line.split(" ")
+    if len(data_list) < 9:
+        return None
+    try:
+        counter = int(data_list[2])
+    except ValueError:
+        return None
+    channels = parse_payload(data_list[8])
+    if channels is None:
+        return None
+    time = f"{data_list[4]}:{data_list[5]}:{data_list[6]}.{data_list[7]}"
+    return counter, time, channels
+
+
+def format_frame_line(counter, hours, minutes, seconds, milliseconds, channels):
+    """
+    Формирование строки кадра в текстовом формате программы сбора данных.
+    Используется для генерации тестовых данных.
+    :param channels: Массив формы (4, N).
+    """
+    payload = ";".join(map(str, np.asarray(channels).T.ravel().tolist())) + ";"
+    return f"DATA 0 {counter} 0 {hours} {minutes} {seconds} {milliseconds} {payload}"
+
+
+def read_exact(stream, view):
+    """
+    Чтение ровно len(view) байт из потока в предварительно выделенный буфер.
+    :return: False, если поток закончился раньше.
+    """
+    position = 0
+    while position < len(view):
+        count = stream.readinto(view[position:])
+        if not count:
+            return False
+        position += count
+    return True
+
+
+def read_frame_binary(stream, buffer):
+    """
+    Чтение одного кадра двоичного формата.
+    :param stream: Поток в двоичном режиме (например, process.stdout).
+    :param buffer: Предварительно выделенный bytearray размером не менее MAX_FRAME_SIZE.
+    :return: Кортеж (counter, time, channels) или None при окончании потока.
+             channels - массив int32 формы (4, N).
+    """
+    view = memoryview(buffer)
+    if not read_exact(stream, view[:FRAME_LENGTH.size]):
+        return None
+    length, = FRAME_LENGTH.unpack_from(view)
+    if length < FRAME_HEADER.size or length > len(view):
+        raise ValueError(f"Некорректная длина кадра: {length}")
+    if not read_exact(stream, view[:length]):
+        return None
+
+    counter, hours, minutes, seconds, milliseconds, width, count = FRAME_HEADER.unpack_from(view)
+    if width not in SAMPLE_TYPES or FRAME_HEADER.size + CHANNELS * count * width != length:
+        raise ValueError(f"Некорректный заголовок кадра: размер отсчета {width}, отсчетов {count}")
+    samples = np.frombuffer(view, dtype=SAMPLE_TYPES[width], count=CHANNELS * count, offset=FRAME_HEADER.size)
+    # Копия нужна, так как буфер будет перезаписан следующим кадром
+    channels = samples.reshape(-1, CHANNELS).T.astype(np.int32)
+    time = f"{hours}:{minutes}:{seconds}.{milliseconds:03d}"
+    return counter, time, channels
+
+
+def pack_frame_binary(counter, hours, minutes, seconds, milliseconds, channels, width=2):
+    """
+    Формирование кадра в двоичном формате. Используется для генерации тестовых данных.
+    :param channels: Массив формы (4, N).
+    :param width: Размер отсчета в байтах (2 или 4).
+    """
+    channels = np.asarray(channels)
+    samples = channels.T.astype(SAMPLE_TYPES[width]).tobytes()
+    header = FRAME_HEADER.pack(counter, hours, minutes, seconds, milliseconds, width, channels.shape[1])
+    return FRAME_LENGTH.pack(len(header) + len(samples)) + header + samples
@@ -1,24 +1,32 @@
 import sys
 import os
 import json
+import threading
 from PySide2.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QGridLayout, QLabel, QLineEdit, QPushButton, QTableWidget,
                                QTableWidgetItem, QComboBox, QRadioButton, QCheckBox, QFileDialog,
                                QProgressBar, QTextEdit, QFrame)
-from PySide2.QtCore import Qt, QTimer, QThread, Signal
+from PySide2.QtCore import Qt, QTimer, QThread, Signal, QSocketNotifier
 from PySide2.QtGui import QFont, QPixmap
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from matplotlib.animation import FuncAnimation
 import numpy as np
 import data_record
 import data_read
+import bd_pool
 import filter_data
+from ring_buffer import RingBuffer
+from decimate import DecimatedLine
+from render import RenderScheduler
+import plot_backend
+from shared_frames import SharedFrameRing
 from multiprocessing import Process, Event, freeze_support
 
 # Создаем разделяемый флаг завершения
 stop_flag = Event()
 config_path = "config.json"
+# Одновременные пользователи пула соединений в процессе окна: окно, поток обработки, LISTEN и выгрузка данных
+GUI_CONNECTIONS = 4
 exe_path = ""
 
 class Sensor:
@@ -27,8 +35,8 @@ class Sensor:
         Инициализация класса для управления одним графиком.
 
         :param x_data: Массив данных для оси X.
-        :param line: Линия графика (например, lines4_1).
-        :param ax: Ось графика (например, axs[0]).
+        :param line: Линия графика (объект с методом set_data, см. plot_backend).
+        :param ax: Ось графика (объект с методом set_ylim, см. plot_backend).
         :param param_value: Объект для обновления текстового значения.
         :param label: Название параметра для метки.
         """
@@ -37,7 +45,8 @@ class Sensor:
         self.ax = ax
         self.param_value = param_value
         self.label = label
-        self.y = np.zeros_like(self.x)  # Начальные данные для оси Y
+        # Кольцевой буфер истории значений (начальные данные для оси Y - нули)
+        self.history = RingBuffer(1, len(self.x))
         self.pv = 0
 
         self.y_max = y_max
@@ -61,19 +70,28 @@ class Sensor:
 
         :param new_values: Список новых значений для добавления в массив y.
         """
-        for value in new_values[::-1]:  # Добавляем новые значения в обратном порядке
-            self.y = np.roll(self.y, -1)  # Сдвигаем массив влево
-            if transform:
-                self.phys_value(value, self.k, self.b, self.t, self.digits)
-                self.y[-1] = self.pv  # Добавляем новое значение в конец
-            else:
-                self.y[-1] = round(value, self.digits)
+        values = np.asarray(new_values, dtype=np.float64)[::-1]  # Добавляем новые значения в обратном порядке
+        if len(values) == 0:
+            return
+        if transform:
+            values = self.phys_values(values, self.k, self.b, self.t, self.digits)
+        else:
+            values = np.round(values, self.digits)
+        self.history.write(values)
+        self.pv = values[-1]
+
+    @property
+    def y(self):
+        """
+        История значений в хронологическом порядке (представление кольцевого буфера).
+        """
+        return self.history.latest()[0]
 
     def update_graph(self):
         """
         Обновление графика на основе текущих данных.
         """
-        self.line.set_ydata(self.y)  # Обновляем данные графика
+        self.line.set_data(self.x, self.y)  # Обновляем данные графика
 
     def update_ylim(self, min=None, max=None):
         """
@@ -89,8 +107,11 @@ class Sensor:
                 padding = 0.1 * range_val if range_val > 0 else 1  # Добавляем отступ
                 self.ax.set_ylim(min_val - padding, max_val + padding)
 
-    def phys_value(self, val, k, b, t, iDigits=2):
-        self.pv = round((val * self.kadc * k + b) * t, iDigits)
+    def phys_values(self, values, k, b, t, iDigits=2):
+        """
+        Пересчет массива значений АЦП в физические величины одним векторным выражением.
+        """
+        return np.round((values * self.kadc * k + b) * t, iDigits)
 
     def update_label(self):
         """
@@ -122,9 +143,126 @@ class AnimationThread(QThread):
         self.running = False  # Остановка потока
 
 
+class ProcessingThread(QThread):
+    result_ready = Signal()  # Сигнал о готовности нового результата обработки
+
+    def __init__(self, frame_ring=None, interval=1000, frame=50):
+        """
+        Фоновый поток чтения и обработки кадров для графиков 4 датчиков.
+
+        Поток хранит только последний результат: если GUI не успел его забрать,
+        результат заменяется новым, а не ставится в очередь.
+
+        :param frame_ring: Кольцо кадров в разделяемой памяти (если None, кадры читаются из базы данных).
+        :param interval: Интервал обработки в миллисекундах.
+        :param frame: Количество кадров в окне обработки.
+        """
+        super().__init__()
+        self.running = True  # Флаг для управления выполнением потока
+        self.frame_ring = frame_ring
+        self.interval = interval
+        self.frame = frame
+        # Окно последних кадров по каналам (4, frame * N): копируются только новые кадры
+        self.window = None
+        self.window_frames = 0  # Количество кадров в окне
+        self.stop_event = threading.Event()
+        # Если wait_notify, кадры читаются только после уведомления о новых данных (wake)
+        self.wait_notify = False
+        self.wake_event = threading.Event()
+        self.lock = threading.Lock()
+        self.result = None
+        self.dropped = 0  # Количество результатов, которые GUI не успел отрисовать
+
+        self.fs = 1024 * frame  # Частота дискретизации
+        self.frequency = 5 * frame  # Частота основного сигнала
+
+    def run(self):
+        DB = data_read.DataRead() if self.frame_ring is None else None
+        while self.running and not self.stop_event.wait(self.interval / 1000):
+            if self.wait_notify and not self.wake_event.is_set():
+                continue
+            self.wake_event.clear()
+
+            # Чтение только новых кадров и обновление окна последних кадров
+            if self.frame_ring is not None:
+                new_data = self.frame_ring.read_new(self.frame, key="graph4")
+            else:
+                new_data = DB.bd_read_new_frames("data_records", self.frame, key="graph4")
+            if len(new_data) == 0:
+                continue
+            self.window_update(new_data)
+
+            result = self.process(self.window.latest(self.window_frames * new_data.shape[2]))
+            with self.lock:
+                if self.result is not None:
+                    self.dropped += 1  # Предыдущий результат устарел
+                self.result = result
+            self.result_ready.emit()
+
+        if DB is not None:
+            DB.bd_close()
+
+    def window_update(self, new_data):
+        """
+        Добавление новых кадров в окно обработки.
+        :param new_data: Массив новых кадров формы (k, 4, N).
+        """
+        samples = new_data.shape[2]
+        if self.window is None or self.window.capacity != self.frame * samples:
+            self.window = RingBuffer(4, self.frame * samples, dtype=np.int32)
+            self.window_frames = 0
+        self.window.write(new_data.transpose(1, 0, 2).reshape(4, -1))
+        self.window_frames = min(self.window_frames + len(new_data), self.frame)
+
+    def process(self, data):
+        """
+        Обработка окна кадров: обороты, амплитуды и шум усилия и перемещения, температура.
+        :param data: Отсчеты окна по каналам, массив формы (4, M).
+        :return: Словарь с результатами для отрисовки.
+        """
+        # Обороты, размахи и шум усилия и перемещения (фильтрация всего окна без фазового сдвига), температура -
+        # одним вызовом
+        result = filter_data.process_frames(
+            data,
+            channels=(1, 2),
+            negative_data=(True, False),
+            freq=self.frequency,
+            fs=self.fs,
+            min_count=6,
+            sos=True
+        )
+        print(f"Кол-во: {result.count_impulse}, Индексы: {result.index_null}, "
+              f"Размер: {result.pulse_durations}, Обороты: {result.rpm}")
+
+        # Подготовка значений для графиков
+        mean_values = [
+            [result.amplitude[0]],  # Усилие
+            [result.amplitude[1]],  # Перемещение
+            [result.temperature],  # Температура
+            [result.rpm]  # Обороты
+        ]
+        return {"mean_values": mean_values, "noise_strength_perc": result.noise_percentage[0],
+                # Размахи по оборотам для оценки разброса от оборота к обороту
+                "strength_cycles": result.cycles[0], "move_cycles": result.cycles[1]}
+
+    def take_result(self):
+        """Получение последнего результата (None, если нового результата нет)."""
+        with self.lock:
+            result, self.result = self.result, None
+        return result
+
+    def wake(self):
+        """Уведомление о поступлении новых кадров."""
+        self.wake_event.set()
+
+    def stop(self):
+        self.running = False  # Остановка потока
+        self.stop_event.set()
+
+
 
 class MainWindow(QMainWindow):
-    def __init__(self, data_record_process=None):
+    def __init__(self, data_record_process=None, frame_ring=None):
         super().__init__()
 
         # Считываем данные из кофигурационого файла
@@ -134,8 +272,18 @@ class MainWindow(QMainWindow):
         # Подключение к базе данных для считывания
         self.DB_real = data_read.DataRead()
         self.DB_mean = data_read.DataRead()
+        # Отдельное соединение для уведомлений о новых кадрах (LISTEN/NOTIFY)
+        self.DB_notify = data_read.DataRead()
+        self.notifier = None
 
         self.data_record_process = data_record_process  # Сохраняем ссылку на процесс
+        # Кольцо кадров в разделяемой памяти (если None, кадры читаются из базы данных)
+        self.frame_ring = frame_ring
+        # Единый планировщик отрисовки графиков (blitting, 10 Гц)
+        self.renderer = RenderScheduler(parent=self)
+        # Вариант построения графиков реального времени: "matplotlib" или "pyqtgraph"
+        self.plot_config = self.config.get("config_plot", {})
+        plot_backend.configure(self.plot_config)
 
         self.setWindowTitle("Регулировка гидродемпферов")
         self.setGeometry(100, 100, 1200, 800)
@@ -154,6 +302,8 @@ class MainWindow(QMainWindow):
         # Нижняя секция с тремя горизонтальными областями
         self.bottom_layout_init(main_layout)
 
+        self.renderer.start()
+
     def top_left_init(self, top_layout):
         input_data_area = QFrame()
         input_data_area.setFrameShape(QFrame.StyledPanel)
@@ -327,6 +477,9 @@ class MainWindow(QMainWindow):
         self.x1 = np.linspace(0, 20, 10000)
         self.y1 = np.sin(self.x1)
         self.line1, = self.ax1.plot(self.x1, self.y1)
+        # Ссылка на объект обязательна: mpl_connect хранит обработчик resize_event по слабой ссылке
+        self.line1_decimated = DecimatedLine(self.line1)
+        self.line1_decimated.set_data(self.x1, self.y1)
         # Убираем подписи осей
         self.ax1.set_xlabel("")
         self.ax1.set_ylabel("")
@@ -338,15 +491,8 @@ class MainWindow(QMainWindow):
         self.graph_layout.setContentsMargins(0, 0, 0, 0)  # Убираем отступы
         self.ax1.grid(True)
         self.graph_layout.addWidget(self.graph_canvas1)
-
-        # Анимация с использованием FuncAnimation
+        # Данные графика 1 не меняются, он перерисовывается только Qt при изменении размера окна
         self.t1 = 0
-        self.anim1 = FuncAnimation(
-            self.graph_canvas1.figure,
-            self.update_graph1,
-            interval=1000,  # Интервал обновления в миллисекундах
-            cache_frame_data=False
-        )
 
     def top_layout_init(self, main_layout):
         # Верхняя секция с тремя горизонтальными областями
@@ -377,34 +523,35 @@ class MainWindow(QMainWindow):
         graph_layout1.setContentsMargins(0, 0, 0, 0)  # Убираем отступы
         middle_layout.addWidget(graph_area1, 1)
 
-        self.graph_canvas2 = FigureCanvas(Figure(figsize=(5, 3)))
-        self.ax2 = self.graph_canvas2.figure.subplots()
+        backend = self.plot_config.get("backend", "matplotlib")
+        self.plot2 = plot_backend.create_plot(backend, self.renderer, figsize=(5, 3))
+        self.ax2 = self.plot2.axes[0]
         # Инициализация данных графика
         self.x2 = np.arange(10000)  # Ось X (например, индексы массива)
-        self.y2 = np.zeros(10000)  # Ось Y (начальные данные)
-        self.line2, = self.ax2.plot(self.x2, self.y2)
+        # Ось Y (кольцевой буфер последних отсчетов): исходный сигнал и результат потокового фильтра
+        self.y2 = RingBuffer(2, len(self.x2))
+        # Линии получают только прореженные данные (около 2 точек на столбец пикселей)
+        self.line2 = self.plot2.plot(0, self.x2, self.y2.latest()[0], decimate=True)
+        self.line2_filtered = self.plot2.plot(0, self.x2, self.y2.latest()[1], decimate=True)
         self.ax2.set_ylim(-8200, 8200)
 
         # Убираем подписи осей
         self.ax2.set_xlabel("")
         self.ax2.set_ylabel("")
+        self.ax2.grid(True)
         # Убираем лишние поля вокруг графика
-        self.graph_canvas2.figure.tight_layout()
-        self.graph_canvas2.figure.subplots_adjust(left=0.1, right=1, top=1, bottom=0.1)
+        self.plot2.finish(left=0.1, right=1, top=1, bottom=0.1)
         # Растягиваем график на всю доступную область
-        graph_layout1.addWidget(self.graph_canvas2, stretch=1)
+        graph_layout1.addWidget(self.plot2.widget, stretch=1)
         graph_layout1.setContentsMargins(0, 0, 0, 0)  # Убираем отступы
-        self.ax2.grid(True)
-        graph_layout1.addWidget(self.graph_canvas2)
 
-        # Анимация с использованием FuncAnimation
+        # Обновление графика по уведомлениям о новых кадрах, при их недоступности - на каждом такте отрисовки
         self.t2 = 0
-        self.anim2 = FuncAnimation(
-            self.graph_canvas2.figure,
-            self.update_graph2,
-            interval=100,
-            cache_frame_data=False
-        )
+        if self.frame_ring is None and self.DB_notify.bd_listen("data_records"):
+            self.notifier = QSocketNotifier(self.DB_notify.bd_connect.fileno(), QSocketNotifier.Read, self)
+            self.notifier.activated.connect(self.on_bd_notify)
+        else:
+            self.renderer.add_callback(self.update_graph2)
 
         # 2) Область графика 2 (4 горизонтальных графика)
         graph_area2 = QFrame()
@@ -422,9 +569,9 @@ class MainWindow(QMainWindow):
         graph_title_label.setFont(graph_title_font)
         graph_layout2.addWidget(graph_title_label)  # Добавляем подпись в макет
 
-        # Создаем FigureCanvas с 4 подграфиками
-        self.graph_canvas4 = FigureCanvas(Figure(figsize=(5, 6)))  # Увеличиваем высоту для 4 графиков
-        self.axs = self.graph_canvas4.figure.subplots(4, 1, sharex=True)  # 4 горизонтальных графика
+        # Создаем график с 4 горизонтальными осями (увеличенная высота для 4 графиков)
+        self.plot4 = plot_backend.create_plot(backend, self.renderer, rows=4, figsize=(5, 6), sharex=True)
+        self.axs = self.plot4.axes
 
         # Генерация данных для графиков
         self.x4 = np.linspace(0, 20, 100)
@@ -434,10 +581,10 @@ class MainWindow(QMainWindow):
         self.y4_4 = np.empty(len(self.x4))
 
         # Отрисовка графиков
-        self.lines4_1, = self.axs[0].plot(self.x4, self.y4_1, label="Усилие, кгс")
-        self.lines4_2, = self.axs[1].plot(self.x4, self.y4_2, label="Ход штока, мм")
-        self.lines4_3, = self.axs[2].plot(self.x4, self.y4_3, label="Температура, град")
-        self.lines4_4, = self.axs[3].plot(self.x4, self.y4_4, label="Обороты, об/мин")
+        self.lines4_1 = self.plot4.plot(0, self.x4, self.y4_1, label="Усилие, кгс")
+        self.lines4_2 = self.plot4.plot(1, self.x4, self.y4_2, label="Ход штока, мм")
+        self.lines4_3 = self.plot4.plot(2, self.x4, self.y4_3, label="Температура, град")
+        self.lines4_4 = self.plot4.plot(3, self.x4, self.y4_4, label="Обороты, об/мин")
 
         lines4 = [self.lines4_1, self.lines4_2, self.lines4_3, self.lines4_4]  # Линии графиков
         axs = [self.axs[0], self.axs[1], self.axs[2], self.axs[3]]  # Оси графиков
@@ -450,21 +597,23 @@ class MainWindow(QMainWindow):
         # Добавляем подпись оси X для нижнего графика
         self.axs[3].set_xlabel("Время (с)")
 
-        # Убираем лишние поля вокруг графиков
-        self.graph_canvas4.figure.tight_layout()
-        self.graph_canvas4.figure.subplots_adjust(left=0.05, right=1, top=1, bottom=0.1)
+        # Убираем лишние поля вокруг графиков.
+        # Для matplotlib при обновлении перерисовываются только линии, оси и легенды берутся из сохраненного фона
+        self.plot4.finish(left=0.05, right=1, top=1, bottom=0.1)
 
         # Растягиваем график на всю доступную область
-        graph_layout2.addWidget(self.graph_canvas4, stretch=1)
+        graph_layout2.addWidget(self.plot4.widget, stretch=1)
 
         # Анимация для 4 графиков
         self.t4 = 0
-        self.anim4 = FuncAnimation(
-            self.graph_canvas4.figure,
-            self.update_graph4,
-            interval=1000,  # Интервал обновления в миллисекундах
-            cache_frame_data=False
-        )
+        # Чтение и обработка кадров выполняются в фоновом потоке, результат передается сигналом
+        self.worker4 = ProcessingThread(self.frame_ring, interval=1000, frame=50)
+        self.worker4.wait_notify = self.notifier is not None
+        self.worker4.result_ready.connect(self.update_graph4)
+        # Потоковый фильтр графика 1 обрабатывает только новые отсчеты; он служит только для отображения,
+        # амплитуды и процент шума вычисляются в ProcessingThread без фазового сдвига
+        self.filter2 = filter_data.StreamingLowpass(self.worker4.frequency * 2, self.worker4.fs,
+                                                    freq=self.worker4.frequency)
 
         # 3) Область параметров
         parameters_area = QFrame()
@@ -572,6 +721,9 @@ class MainWindow(QMainWindow):
         self.Sensors[3].t = self.config["sensor_coefficients"]["rpm"]["t"]
         self.Sensors[3].digits = self.config["sensor_coefficients"]["rpm"]["iDigits"]
 
+        # Запуск фоновой обработки после создания датчиков
+        self.worker4.start()
+
     def bottom_layout_init(self, main_layout):
         bottom_section = QFrame()
         bottom_section.setFrameShape(QFrame.StyledPanel)
@@ -616,84 +768,69 @@ class MainWindow(QMainWindow):
         report_text = QTextEdit()
         report_output_layout.addWidget(report_text)
 
-    def update_graph1(self, frame):
-        """Обновление данных первого графика."""
-
-        return self.line1,
-
-    def update_graph2(self, frame):
-        """Обновление данных второго графика."""
-        # Получаем последние 2 записи из базы данных
-        data = self.DB_real.bd_read_last("data_records", 4, True)
-        if data:
-            # Извлекаем массив array_1 из записи
+    def fetch_new_frames(self, key, count):
+        """
+        Получение новых кадров для графика: из разделяемой памяти, если она доступна, иначе из базы данных.
+        :param key: Ключ читателя (у каждого графика свой).
+        :param count: Количество кадров при первом чтении.
+        :return: Массив формы (k, 4, N) в хронологическом порядке.
+        """
+        if self.frame_ring is not None:
+            return self.frame_ring.read_new(count, key=key)
+        return self.DB_real.bd_read_new_frames("data_records", count, key=key)
+
+    def update_graph2(self):
+        """Обновление данных второго графика (перерисовка - на ближайшем такте планировщика)."""
+        # Получаем только новые кадры
+        data = self.fetch_new_frames("graph2", 4)
+        if len(data):
+            # Извлекаем массив array_1 из кадров
             array_1 = filter_data.data_export(data, 1)
-            # Определяем количество новых значений
-            new_values_count = len(array_1)
-            # Обновляем данные графика: сдвигаем старые значения влево и добавляем новые
-            self.y2 = np.concatenate((self.y2[new_values_count:], array_1))
-            # Обновляем данные графика
-            self.line2.set_ydata(self.y2)
-        return self.line2,
-
-    def update_graph4(self, frame):
-        frame = 50
-        fs = 1024 * frame  # Частота дискретизации
-        frequency = 5 * frame  # Частота основного сигнала
-
-        # Чтение данных из базы данных
-        data = self.DB_real.bd_read_last("data_records", frame, False)
-        if not data:
-            return tuple(graph.line for graph in self.Sensors)
-
-        # Обработка данных для подсчета оборотов
-        count_impulse, index_null, pulse_durations, rpm_values = filter_data.count_turn(data, channel=4, min_count=6)
-        print(f"Кол-во: {count_impulse}, Индексы: {index_null}, Размер: {pulse_durations}, Обороты: {rpm_values}")
-
-        # Фильтрация данных для усилия и перемещения
-        def process_channel(channel, negative_data):
-            return filter_data.filter_data(
-                data=data,
-                channel=channel,
-                freq=frequency,
-                fs=fs,
-                only_filter=False,
-                negative_data=negative_data,
-                index_null=index_null
-            )
-
-        (noisy_strength, filtered_strength, _, strength_ampl, _, noise_strength_perc) = process_channel(1, True)
-        (noisy_move, filtered_move, _, move_ampl, _, noise_move_perc) = process_channel(2, False)
+            # Добавляем новые значения и результат потокового фильтра в кольцевой буфер
+            self.y2.write(np.vstack([array_1, self.filter2.process(array_1)]))
+            # Обновляем данные графика; отфильтрованный сигнал сдвигается на задержку фильтра
+            latest = self.y2.latest()
+            self.line2.set_data(self.x2, latest[0])
+            self.line2_filtered.set_data(self.x2 - self.filter2.delay, latest[1])
+            self.plot2.refresh()
+
+    def on_bd_notify(self):
+        """Обработка уведомления о новых кадрах: график 2 обновляется сразу, графики 4 - фоновым потоком."""
+        if self.DB_notify.bd_poll_notify() is None:
+            return
+        self.worker4.wake()
+        self.update_graph2()
+
+    def update_graph4(self):
+        """Отрисовка результата фоновой обработки на графиках 4 датчиков."""
+        result = self.worker4.take_result()
+        if result is None:
+            return
 
         # Обновление значения "Процент шума" для усилия
-        self.noise_values["Усилие на штоке,\n кгс:"].setText(f"{noise_strength_perc:.2f}%")
-
-        # Подготовка значений для графиков
-        mean_values = [
-            [strength_ampl],  # Усилие
-            [move_ampl],  # Перемещение
-            [np.mean(filter_data.data_export(data, 3))],  # Температура
-            [rpm_values]  # Обороты
-        ]
+        self.noise_values["Усилие на штоке,\n кгс:"].setText(f"{result['noise_strength_perc']:.2f}%")
 
         # Обновление графиков
-        for i, mean_value in enumerate(mean_values):
+        for i, mean_value in enumerate(result["mean_values"]):
             transform = i != 3  # Для оборотов (индекс 3) transform=False
             self.Sensors[i].update_data(mean_value, transform=transform)
             self.Sensors[i].update_graph()
             # self.Sensors[i].update_ylim()  # Раскомментировать, если нужно обновлять границы оси Y
             self.Sensors[i].update_label()
 
-        return tuple(graph.line for graph in self.Sensors)
+        self.plot4.refresh()
 
     def closeEvent(self, event):
         self.DB_mean.bd_close()
         self.DB_real.bd_close()
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+        self.DB_notify.bd_close()
 
-        """Остановка анимации при закрытии окна."""
-        self.anim1._stop()
-        self.anim2._stop()
-        self.anim4._stop()
+        """Остановка отрисовки при закрытии окна."""
+        self.renderer.stop()
+        self.worker4.stop()
+        self.worker4.wait()
 
         if self.data_record_process and self.data_record_process.is_alive():
             print("Завершение процесса data_record...")
@@ -711,17 +848,30 @@ if __name__ == "__main__":
         config = json.load(f)
         exe_path = config["config_exe"]["path"]
         print(exe_path)
+    bd_pool.configure(minconn=GUI_CONNECTIONS, db_config=config.get("config_bd"))
+
+    # Кольцо кадров в разделяемой памяти для отображения без чтения из базы данных
+    frame_ring = None
+    if config.get("config_record", {}).get("shared_memory"):
+        frame_ring = SharedFrameRing(create=True)
 
     # Создаем процесс для выполнения функции main из data_record
-    data_record_process = Process(target=data_record.main, args=(exe_path, False, False, stop_flag))
+    data_record_process = Process(target=data_record.main, args=(exe_path, False, False, stop_flag,
+                                                                 config.get("config_record"),
+                                                                 frame_ring.name if frame_ring else None))
 
     # Запускаем процесс
     data_record_process.start()
 
     # Создаем и запускаем GUI
     app = QApplication(sys.argv)
-    window = MainWindow(data_record_process)  # Передаем процесс в конструктор
+    window = MainWindow(data_record_process, frame_ring)  # Передаем процесс в конструктор
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    # Закрываем соединения с базой данных (объекты DataRead используют общий пул)
+    bd_pool.close_pool()
+    if frame_ring is not None:
+        frame_ring.close()
+    sys.exit(exit_code)
 
 
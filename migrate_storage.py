@@ -0,0 +1,112 @@
+import argparse
+import time
+import data_record
+from data_read import FRAME_COLUMNS, SAMPLES, decode_frames
+
+# Количество кадров, переносимых одной транзакцией
+CHUNK_SIZE = 500
+
+
+def table_size(connection, table_name):
+    """Размер таблицы вместе с TOAST и индексами, байт."""
+    cursor = connection.cursor()
+    cursor.execute("SELECT pg_total_relation_size(%s);", (table_name,))
+    size = cursor.fetchone()[0]
+    cursor.close()
+    return size
+
+
+def migrate(connection, source, target, storage, compression="none", chunk_size=CHUNK_SIZE, samples=SAMPLES):
+    """
+    Перенос кадров из таблицы source в новую таблицу target с другим способом хранения.
+    Кадры читаются порциями по id и записываются через COPY в двоичном формате.
+    :return: Количество перенесенных кадров или None при ошибке.
+    """
+    source_storage = data_record.table_storage(connection, source)
+    if source_storage is None:
+        print(f"Таблица '{source}' не существует.")
+        return None
+    if data_record.table_exists(connection, target):
+        print(f"Таблица '{target}' уже существует, перенос отменен.")
+        return None
+    data_record.bd_create_data_table(connection, target, storage)
+
+    query = f"""
+        SELECT {FRAME_COLUMNS[source_storage]}, record_date, record_number, record_time
+        FROM {source}
+        WHERE id > %s
+        ORDER BY id
+        LIMIT %s;
+    """
+    cursor = connection.cursor()
+    last_id = 0
+    frames_count = 0
+    start_time = time.perf_counter()
+    try:
+        while True:
+            cursor.execute(query, (last_id, chunk_size))
+            chunk = cursor.fetchall()
+            if not chunk:
+                break
+            frames = decode_frames(chunk, samples, source_storage)
+            rows = [row[-3:] + tuple(frame) for row, frame in zip(chunk, frames)]
+            if not data_record.bd_copy_batch(connection, target, rows, storage, compression):
+                return None
+            last_id = chunk[-1][0]
+            frames_count += len(chunk)
+            print(f"Перенесено {frames_count} кадров ({frames_count / (time.perf_counter() - start_time):.1f} кадров/с)")
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при переносе кадров: {error}")
+        return None
+    finally:
+        cursor.close()
+    return frames_count
+
+
+def swap_tables(connection, source, target):
+    """Замена исходной таблицы новой: source переименовывается в source_old, target - в source."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"ALTER TABLE {source} RENAME TO {source}_old;")
+        cursor.execute(f"ALTER TABLE {target} RENAME TO {source};")
+        connection.commit()
+        print(f"Таблица '{target}' переименована в '{source}', исходная сохранена как '{source}_old'.")
+    except Exception as error:
+        connection.rollback()
+        print(f"Ошибка при переименовании таблиц: {error}")
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос кадров между способами хранения (INTEGER[] и blob)")
+    parser.add_argument("--source", default="data_records", help="Исходная таблица")
+    parser.add_argument("--target", default="data_records_blob", help="Новая таблица (не должна существовать)")
+    parser.add_argument("--storage", choices=["array", "blob"], default="blob", help="Способ хранения в новой таблице")
+    parser.add_argument("--compression", choices=["none", "zlib", "lz4"], default="none", help="Сжатие blob")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Кадров в одной транзакции")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="Количество отсчетов в канале")
+    parser.add_argument("--swap", action="store_true", help="После переноса заменить исходную таблицу новой")
+    args = parser.parse_args()
+
+    connection, cursor = data_record.bd_init()
+    if connection is None:
+        return
+
+    start_time = time.perf_counter()
+    frames_count = migrate(connection, args.source, args.target, args.storage, args.compression,
+                           args.chunk, args.samples)
+    if frames_count is not None:
+        execution_time = time.perf_counter() - start_time
+        print(f"Перенос завершен: {frames_count} кадров за {execution_time:.1f} с")
+        print(f"Размер '{args.source}': {table_size(connection, args.source) / 2 ** 20:.1f} МБ, "
+              f"'{args.target}': {table_size(connection, args.target) / 2 ** 20:.1f} МБ")
+        if args.swap:
+            swap_tables(connection, args.source, args.target)
+
+    data_record.bd_close(connection, cursor)
+
+
+if __name__ == "__main__":
+    main()
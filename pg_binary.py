@@ -0,0 +1,142 @@
+import io
+import struct
+import datetime
+import numpy as np
+
+# Заголовок и завершение потока COPY в двоичном формате PostgreSQL
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+
+# OID типа INTEGER (int4) в PostgreSQL
+INT4_OID = 23
+# Начало отсчета дат и времени в двоичном формате PostgreSQL
+PG_EPOCH = datetime.date(2000, 1, 1)
+
+# Заголовок одномерного массива: размерность, флаг NULL, тип элементов, длина, нижняя граница
+ARRAY_HEADER = struct.Struct(">iiiii")
+FIELD_INT4 = struct.Struct(">ii")
+FIELD_INT8 = struct.Struct(">iq")
+FIELD_LENGTH = struct.Struct(">i")
+TUPLE_FIELDS = struct.Struct(">h")
+
+
+def encode_date(value):
+    """
+    Кодирование даты: количество дней от 2000-01-01.
+    :param value: Дата (datetime.date или строка 'ГГГГ-ММ-ДД').
+    """
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return FIELD_INT4.pack(4, (value - PG_EPOCH).days)
+
+
+def encode_time(value):
+    """
+    Кодирование времени: количество микросекунд от полуночи.
+    :param value: Время (datetime.time или строка 'ЧЧ:ММ:СС.ддд').
+    """
+    if isinstance(value, datetime.time):
+        microseconds = ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+    else:
+        # Дробная часть секунд интерпретируется так же, как в PostgreSQL ('12:00:01.5' -> 500 мс)
+        hours, minutes, seconds = str(value).split(":")
+        microseconds = round(((int(hours) * 60 + int(minutes)) * 60 + float(seconds)) * 1_000_000)
+    return FIELD_INT8.pack(8, microseconds)
+
+
+def encode_int4(value):
+    return FIELD_INT4.pack(4, int(value))
+
+
+def encode_int4_array(values):
+    """
+    Кодирование одномерного массива INTEGER[] без промежуточных объектов Python для каждого отсчета.
+    :param values: Массив NumPy (или список) целых чисел.
+    :return: Байты поля вместе с префиксом длины.
+    """
+    values = np.asarray(values)
+    count = len(values)
+    # Каждый элемент: длина (4) и значение в сетевом порядке байт
+    elements = np.empty((count, 2), dtype=">i4")
+    elements[:, 0] = 4
+    elements[:, 1] = values
+    length = ARRAY_HEADER.size + elements.nbytes
+    return (FIELD_LENGTH.pack(length) + ARRAY_HEADER.pack(1, 0, INT4_OID, count, 1)
+            + elements.tobytes())
+
+
+def encode_frame_row(record_date, record_number, record_time, array_1, array_2, array_3, array_4):
+    """
+    Кодирование одной строки data_records (без столбца id) для COPY в двоичном формате.
+    """
+    return b"".join((
+        TUPLE_FIELDS.pack(7),
+        encode_date(record_date),
+        encode_int4(record_number),
+        encode_time(record_time),
+        encode_int4_array(array_1),
+        encode_int4_array(array_2),
+        encode_int4_array(array_3),
+        encode_int4_array(array_4),
+    ))
+
+
+def encode_bytea(value):
+    return FIELD_LENGTH.pack(len(value)) + bytes(value)
+
+
+def encode_blob_row(record_date, record_number, record_time, frame):
+    """
+    Кодирование одной строки таблицы кадров в формате blob (без столбца id) для COPY в двоичном формате.
+    :param frame: Кадр, закодированный frame_codec.encode_frame.
+    """
+    return b"".join((
+        TUPLE_FIELDS.pack(4),
+        encode_date(record_date),
+        encode_int4(record_number),
+        encode_time(record_time),
+        encode_bytea(frame),
+    ))
+
+
+def build_copy_data(rows, encode_row=encode_frame_row):
+    """
+    Формирование потока COPY в двоичном формате для пакета кадров.
+    :param rows: Список кортежей (record_date, record_number, record_time, array_1, array_2, array_3, array_4)
+                 или (record_date, record_number, record_time, frame) для encode_blob_row.
+    :param encode_row: Функция кодирования строки.
+    :return: Объект io.BytesIO, готовый для cursor.copy_expert.
+    """
+    buffer = io.BytesIO()
+    buffer.write(PGCOPY_HEADER)
+    for row in rows:
+        buffer.write(encode_row(*row))
+    buffer.write(PGCOPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+def decode_int4_array(data, out):
+    """
+    Декодирование одномерного массива INTEGER[] из двоичного представления (результат array_send)
+    сразу в предварительно выделенный массив, без объектов Python для каждого отсчета.
+    Лишние элементы отбрасываются, недостающие заполняются нулями.
+    :param data: Байты массива (memoryview, bytes) или None для NULL.
+    :param out: Одномерный массив NumPy, в который записываются значения.
+    :return: Количество декодированных элементов.
+    """
+    if data is None or len(data) < ARRAY_HEADER.size:
+        # NULL или пустой массив (размерность 0)
+        out[:] = 0
+        return 0
+    ndim, has_null, element_type, count, lower_bound = ARRAY_HEADER.unpack_from(data)
+    if ndim != 1 or element_type != INT4_OID:
+        raise ValueError(f"Ожидался одномерный массив int4, получено: размерность {ndim}, тип {element_type}")
+    if has_null:
+        raise ValueError("Массив отсчетов содержит NULL")
+    count = min(count, len(out))
+    # Каждый элемент: длина (4) и значение в сетевом порядке байт
+    elements = np.frombuffer(data, dtype=">i4", count=2 * count, offset=ARRAY_HEADER.size)
+    out[:count] = elements[1::2]
+    out[count:] = 0
+    return count
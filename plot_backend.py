@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from decimate import DecimatedLine
+
+try:
+    import pyqtgraph as pg
+except ImportError:
+    pg = None
+
+# Цвета линий осей по порядку (палитра matplotlib, чтобы графики обоих вариантов выглядели одинаково)
+LINE_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728")
+
+
+class MatplotlibPlot:
+    def __init__(self, renderer, rows=1, figsize=(5, 3), sharex=False):
+        """
+        График matplotlib (FigureCanvasQTAgg) с одной или несколькими осями друг под другом.
+        Перерисовка выполняется планировщиком render.RenderScheduler (blitting).
+
+        :param renderer: Планировщик отрисовки окна.
+        :param rows: Количество осей.
+        :param figsize: Размер фигуры, дюймы.
+        :param sharex: Общая ось X для всех осей.
+        """
+        self.renderer = renderer
+        self.canvas = FigureCanvas(Figure(figsize=figsize))
+        self.widget = self.canvas
+        self.axes = list(np.atleast_1d(self.canvas.figure.subplots(rows, 1, sharex=sharex)))
+        self.artists = []
+
+    def plot(self, index, x, y, label=None, decimate=False):
+        """
+        Добавление линии.
+        :param index: Номер оси.
+        :param decimate: Прореживать ряд до разрешения графика (для длинных рядов).
+        :return: Объект линии с методом set_data(x, y).
+        """
+        line, = self.axes[index].plot(x, y, label=label)
+        self.artists.append(line)
+        return DecimatedLine(line) if decimate else line
+
+    def finish(self, **margins):
+        """Завершение настройки: поля вокруг осей и регистрация в планировщике отрисовки."""
+        self.canvas.figure.tight_layout()
+        self.canvas.figure.subplots_adjust(**margins)
+        self.renderer.add_canvas(self.canvas, self.artists)
+
+    def refresh(self):
+        """Запрос перерисовки после изменения данных линий."""
+        self.renderer.mark(self.canvas)
+
+
+class PyqtgraphAxes:
+    def __init__(self, item):
+        """Оси pyqtgraph с методами осей matplotlib, которые используются в окне."""
+        self.item = item
+
+    def set_ylim(self, bottom, top):
+        self.item.setYRange(bottom, top, padding=0)
+
+    def set_xlabel(self, text):
+        self.item.setLabel("bottom", text)
+
+    def set_ylabel(self, text):
+        self.item.setLabel("left", text)
+
+    def grid(self, visible=True):
+        self.item.showGrid(x=visible, y=visible)
+
+    def legend(self, **kwargs):
+        # Легенда pyqtgraph заполняется именами линий, добавленных после ее создания
+        if self.item.legend is None:
+            self.item.addLegend(offset=(5, 5))
+
+
+class PyqtgraphLine:
+    def __init__(self, item):
+        """Линия pyqtgraph с методом set_data, как у Line2D."""
+        self.item = item
+
+    def set_data(self, x, y):
+        self.item.setData(x, y)
+
+
+class PyqtgraphPlot:
+    def __init__(self, renderer, rows=1, figsize=None, sharex=False):
+        """
+        График pyqtgraph: рисуется средствами Qt без растеризации всей фигуры,
+        длинные ряды прореживаются самим pyqtgraph (downsampling "peak" и clipToView).
+        Виджет перерисовывает измененные линии сам, поэтому планировщик отрисовки не используется.
+        """
+        self.widget = pg.GraphicsLayoutWidget()
+        self.widget.setBackground("w")
+        self.axes = []
+        for row in range(rows):
+            item = self.widget.addPlot(row=row, col=0)
+            item.setMouseEnabled(x=False, y=False)
+            if sharex and self.axes:
+                item.setXLink(self.axes[0].item)
+            self.axes.append(PyqtgraphAxes(item))
+
+    def plot(self, index, x, y, label=None, decimate=False):
+        item = self.axes[index].item
+        if label is not None:
+            self.axes[index].legend()
+        color = LINE_COLORS[len(item.listDataItems()) % len(LINE_COLORS)]
+        curve = item.plot(x, y, name=label, pen=pg.mkPen(color, width=1))
+        if decimate:
+            curve.setDownsampling(auto=True, method="peak")
+            curve.setClipToView(True)
+        return PyqtgraphLine(curve)
+
+    def finish(self, **margins):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def create_plot(backend, renderer, rows=1, figsize=(5, 3), sharex=False):
+    """
+    Создание графика выбранного варианта ("config_plot" файла config.json).
+    :param backend: "matplotlib" или "pyqtgraph" (если pyqtgraph не установлен, используется matplotlib).
+    """
+    if backend == "pyqtgraph":
+        if pg is not None:
+            return PyqtgraphPlot(renderer, rows, figsize, sharex)
+        print("Ошибка: пакет pyqtgraph не установлен, графики будут построены с помощью matplotlib.")
+    return MatplotlibPlot(renderer, rows, figsize, sharex)
+
+
+def configure(plot_config):
+    """Глобальные параметры pyqtgraph (OpenGL), выполняется до создания графиков."""
+    if pg is not None and plot_config:
+        pg.setConfigOptions(useOpenGL=plot_config.get("opengl", False), antialias=False)
+
+
+def main():
+    """
+    Проверка графиков без экрана (платформа Qt offscreen): время обновления ряда из 10000 отсчетов.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide2.QtWidgets import QApplication
+    from render import RenderScheduler
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    renderer = RenderScheduler()
+    x = np.arange(10000)
+    rng = np.random.default_rng(0)
+    for backend in ("matplotlib", "pyqtgraph"):
+        if backend == "pyqtgraph" and pg is None:
+            print("pyqtgraph: не установлен")
+            continue
+        plot = create_plot(backend, renderer)
+        line = plot.plot(0, x, np.zeros(len(x)), decimate=True)
+        plot.axes[0].set_ylim(-8200, 8200)
+        plot.finish(left=0.1, right=1, top=1, bottom=0.1)
+        plot.widget.resize(800, 300)
+        plot.widget.show()
+        app.processEvents()
+
+        start_time = time.perf_counter()
+        for _ in range(50):
+            line.set_data(x, rng.integers(-8000, 8000, len(x)))
+            plot.refresh()
+            renderer.tick()
+            plot.widget.repaint()
+        print(f"{backend}: {(time.perf_counter() - start_time) / 50 * 1000:.1f} мс на обновление")
+        plot.widget.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import time
+from PySide2.QtCore import QObject, QTimer
+
+# Период отрисовки, мс (10 Гц)
+RENDER_INTERVAL = 100
+# Период вывода статистики отрисовки, с
+STATS_INTERVAL = 10
+
+
+class BlitCanvas:
+    def __init__(self, canvas, artists):
+        """
+        Холст matplotlib, на котором при обновлении перерисовываются только изменяемые объекты (blitting).
+        Статичная часть (оси, сетка, легенды) рисуется один раз и сохраняется как фон;
+        полная перерисовка выполняется только при изменении границ осей или размера холста.
+
+        :param canvas: Холст FigureCanvasQTAgg.
+        :param artists: Изменяемые объекты (линии Line2D, тексты).
+        """
+        self.canvas = canvas
+        self.artists = list(artists)
+        self.axes = list(dict.fromkeys(artist.axes for artist in self.artists))
+        self.background = None
+        self.limits = None
+        for artist in self.artists:
+            # Анимируемые объекты не рисуются при полной перерисовке и не попадают в фон
+            artist.set_animated(True)
+        # Полная перерисовка (в том числе при изменении размера окна) обновляет сохраненный фон
+        canvas.mpl_connect("draw_event", self.on_draw)
+
+    def axes_limits(self):
+        return tuple(ax.get_xlim() + ax.get_ylim() for ax in self.axes)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.limits = self.axes_limits()
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            artist.axes.draw_artist(artist)
+
+    def render(self):
+        """
+        Обновление изображения холста. Перерисовка на экране выполняется Qt при следующей отрисовке окна,
+        поэтому обновления нескольких холстов объединяются в одну.
+        """
+        if self.background is None or self.axes_limits() != self.limits:
+            # Изменились границы осей: перерисовываем фигуру полностью, on_draw сохранит новый фон
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_artists()
+        self.canvas.update()
+
+
+class RenderScheduler(QObject):
+    def __init__(self, interval=RENDER_INTERVAL, parent=None):
+        """
+        Единый планировщик отрисовки графиков окна.
+        Источники данных только отмечают холсты как измененные (mark), а отрисовка всех измененных
+        холстов выполняется одним тактом таймера, поэтому частые обновления данных объединяются.
+
+        :param interval: Период отрисовки, мс.
+        """
+        super().__init__(parent)
+        self.canvases = {}
+        self.dirty = set()
+        self.callbacks = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+        # Статистика времени отрисовки
+        self.last_time = 0
+        self.render_count = 0
+        self.render_time_sum = 0
+        self.render_time_max = 0
+        self.stats_start = time.perf_counter()
+
+    def add_canvas(self, canvas, artists):
+        """Регистрация холста и его изменяемых объектов."""
+        self.canvases[canvas] = BlitCanvas(canvas, artists)
+        self.dirty.add(canvas)
+        return self.canvases[canvas]
+
+    def add_callback(self, callback):
+        """Функция, вызываемая в начале каждого такта (например, опрос новых данных по таймеру)."""
+        self.callbacks.append(callback)
+
+    def mark(self, canvas):
+        """Отметка холста для перерисовки на ближайшем такте."""
+        self.dirty.add(canvas)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        start_time = time.perf_counter()
+        for callback in self.callbacks:
+            callback()
+        if not self.dirty:
+            return
+        for canvas in self.dirty:
+            self.canvases[canvas].render()
+        self.dirty.clear()
+
+        self.last_time = time.perf_counter() - start_time
+        self.render_count += 1
+        self.render_time_sum += self.last_time
+        self.render_time_max = max(self.render_time_max, self.last_time)
+        elapsed = time.perf_counter() - self.stats_start
+        if elapsed >= STATS_INTERVAL:
+            print(f"Отрисовка: {self.render_count / elapsed:.1f} обновлений/с, "
+                  f"время: среднее {self.render_time_sum / self.render_count * 1000:.1f} мс, "
+                  f"макс. {self.render_time_max * 1000:.1f} мс")
+            self.render_count = 0
+            self.render_time_sum = 0
+            self.render_time_max = 0
+            self.stats_start = time.perf_counter()
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, channels, capacity, dtype=np.float64):
+        """
+        Многоканальный кольцевой буфер фиксированной емкости.
+
+        Данные хранятся дважды подряд, поэтому любое окно последних отсчетов
+        является непрерывным срезом и возвращается без копирования.
+
+        :param channels: Количество каналов.
+        :param capacity: Емкость буфера в отсчетах на канал.
+        :param dtype: Тип данных буфера.
+        """
+        self.channels = channels
+        self.capacity = capacity
+        self.buffer = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self.index = 0  # Позиция следующей записи
+        self.written = 0  # Общее количество записанных отсчетов
+
+    def write(self, block):
+        """
+        Добавление новых отсчетов. Стоимость пропорциональна размеру блока.
+
+        :param block: Массив формы (channels, k) или (k,) для одноканального буфера.
+        """
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(1, -1)
+        count = block.shape[1]
+        if count == 0:
+            return
+        if count > self.capacity:
+            # Сохраняются только последние capacity отсчетов
+            block = block[:, -self.capacity:]
+            self.index = (self.index + count - self.capacity) % self.capacity
+            self.written += count - self.capacity
+            count = self.capacity
+
+        first = min(count, self.capacity - self.index)
+        rest = count - first
+        for offset in (0, self.capacity):
+            start = self.index + offset
+            self.buffer[:, start:start + first] = block[:, :first]
+            if rest:
+                self.buffer[:, offset:offset + rest] = block[:, first:]
+
+        self.index = (self.index + count) % self.capacity
+        self.written += count
+
+    def latest(self, count=None):
+        """
+        Последние отсчеты всех каналов в хронологическом порядке (без копирования).
+
+        :param count: Количество отсчетов (по умолчанию вся емкость буфера).
+        :return: Представление формы (channels, count).
+        """
+        if count is None or count > self.capacity:
+            count = self.capacity
+        end = self.index + self.capacity
+        return self.buffer[:, end - count:end]
@@ -0,0 +1,83 @@
+import numpy as np
+
+# Количество каналов АЦП в кадре
+CHANNELS = 4
+# Статистики, вычисляемые для каждого канала
+STATISTICS = ("min", "max", "mean", "rms")
+# Столбцы статистик в таблицах сводок: min1..min4, max1..max4, mean1..mean4, rms1..rms4
+COLUMNS = [f"{statistic}{channel}" for statistic in STATISTICS for channel in range(1, CHANNELS + 1)]
+
+
+def frame_statistics(frames):
+    """
+    Статистики каждого канала каждого кадра.
+    :param frames: Массив формы (k, 4, N).
+    :return: Словарь {"min", "max", "mean", "rms"} с массивами формы (k, 4).
+    """
+    frames = np.asarray(frames)
+    values = frames.astype(np.float64)
+    count = frames.shape[2]
+    return {
+        "min": frames.min(axis=2),
+        "max": frames.max(axis=2),
+        "mean": values.sum(axis=2) / count,
+        "rms": np.sqrt(np.einsum("ijk,ijk->ij", values, values) / count),
+    }
+
+
+def merge_statistics(groups, statistics, samples):
+    """
+    Объединение статистик кадров по группам (например, по секундам).
+    Среднее и СКЗ объединяются с весом количества отсчетов, поэтому результат
+    совпадает со статистиками, вычисленными по всем отсчетам группы.
+    :param groups: Номер группы для каждого кадра, массив формы (k,).
+    :param statistics: Статистики кадров (результат frame_statistics).
+    :param samples: Количество отсчетов в канале кадра.
+    :return: Кортеж (количество отсчетов в канале для каждой группы (m,), словарь статистик формы (m, 4)).
+    """
+    count = int(groups.max()) + 1 if len(groups) else 0
+    frames_count = np.bincount(groups, minlength=count)
+    merged = {
+        "min": np.full((count, CHANNELS), np.iinfo(np.int64).max, dtype=np.int64),
+        "max": np.full((count, CHANNELS), np.iinfo(np.int64).min, dtype=np.int64),
+    }
+    np.minimum.at(merged["min"], groups, statistics["min"])
+    np.maximum.at(merged["max"], groups, statistics["max"])
+    sums = np.zeros((count, CHANNELS))
+    squares = np.zeros((count, CHANNELS))
+    np.add.at(sums, groups, statistics["mean"])
+    np.add.at(squares, groups, statistics["rms"] ** 2)
+    merged["mean"] = sums / frames_count[:, None]
+    merged["rms"] = np.sqrt(squares / frames_count[:, None])
+    return frames_count * samples, merged
+
+
+def statistics_row(statistics, index):
+    """Значения статистик одной строки в порядке COLUMNS."""
+    return tuple(statistics[statistic][index, channel].item()
+                 for statistic in STATISTICS for channel in range(CHANNELS))
+
+
+def rollup_rows(rows):
+    """
+    Вычисление сводок для пакета кадров.
+    :param rows: Список кортежей (record_date, record_number, record_time, array_1, array_2, array_3, array_4).
+    :return: Кортеж (frame_rows, second_rows):
+             frame_rows - кортежи (record_date, record_number, record_time, *статистики),
+             second_rows - кортежи (record_date, record_second, samples, *статистики).
+    """
+    if not rows:
+        return [], []
+    frames = np.array([row[3:7] for row in rows])
+    statistics = frame_statistics(frames)
+    frame_rows = [row[:3] + statistics_row(statistics, index) for index, row in enumerate(rows)]
+
+    # Секунда кадра: дата и время без долей секунды
+    seconds = [(row[0], str(row[2]).split(".")[0]) for row in rows]
+    keys = list(dict.fromkeys(seconds))
+    key_index = {key: index for index, key in enumerate(keys)}
+    groups = np.array([key_index[second] for second in seconds])
+    samples, merged = merge_statistics(groups, statistics, frames.shape[2])
+    second_rows = [key + (int(samples[index]),) + statistics_row(merged, index)
+                   for index, key in enumerate(keys)]
+    return frame_rows, second_rows
@@ -0,0 +1,125 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# Количество каналов АЦП в кадре
+CHANNELS = 4
+# Заголовок: количество ячеек, отсчетов в канале, номер последнего записанного кадра
+HEADER_SIZE = 4
+
+
+class SharedFrameRing:
+    def __init__(self, name=None, slots=256, samples=2048, create=False):
+        """
+        Кольцо кадров в разделяемой памяти для передачи данных из процесса записи в GUI без копирования через базу.
+
+        Каждая ячейка кольца имеет номер последовательности: перед записью он делается отрицательным,
+        после записи - равным номеру кадра. Читатель проверяет номер до и после копирования
+        и отбрасывает кадр, если писатель успел его перезаписать.
+
+        :param name: Имя сегмента разделяемой памяти (для подключения к существующему кольцу).
+        :param slots: Количество кадров в кольце (при создании).
+        :param samples: Количество отсчетов в канале (при создании).
+        :param create: True - создать новый сегмент, False - подключиться к существующему.
+        """
+        if create:
+            size = 8 * (HEADER_SIZE + 2 * slots) + 4 * slots * CHANNELS * samples
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+            header[:] = (slots, samples, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+            slots, samples = int(header[0]), int(header[1])
+
+        self.name = self.shm.name
+        self.slots = slots
+        self.samples = samples
+        self.owner = create
+
+        offset = 8 * HEADER_SIZE
+        self.header = header
+        self.slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=offset)
+        offset += 8 * slots
+        self.counters = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=offset)
+        offset += 8 * slots
+        self.frames = np.ndarray((slots, CHANNELS, samples), dtype=np.int32, buffer=self.shm.buf, offset=offset)
+
+        # Номер последнего прочитанного кадра (по ключу читателя)
+        self.last_seqs = {}
+        # Количество кадров, потерянных читателями из-за переполнения кольца
+        self.lost = 0
+        # Количество кадров, не записанных в кольцо из-за несовпадения длины с samples
+        self.rejected = 0
+
+    def write(self, counter, channels):
+        """
+        Запись кадра в кольцо (вызывается одним писателем).
+        Кадры другой длины не записываются: дополнение нулями читатель не отличил бы от данных.
+        :param counter: Номер кадра программы сбора данных.
+        :param channels: Массив формы (4, samples).
+        :return: True, если кадр записан.
+        """
+        if channels.shape[1] != self.samples:
+            if not self.rejected:
+                print(f"Ошибка: кадр {counter} содержит {channels.shape[1]} отсчетов вместо {self.samples}, "
+                      f"такие кадры не передаются в GUI.")
+            self.rejected += 1
+            return False
+        seq = int(self.header[2]) + 1
+        slot = (seq - 1) % self.slots
+        self.slot_seq[slot] = -seq  # Ячейка занята записью
+        self.frames[slot] = channels
+        self.counters[slot] = counter
+        self.slot_seq[slot] = seq
+        self.header[2] = seq
+        return True
+
+    def read_new(self, count, key="default"):
+        """
+        Чтение новых кадров для читателя key: не больше count последних кадров.
+        Более старые новые кадры пропускаются и учитываются в lost.
+        :return: Массив int32 формы (k, 4, samples) в хронологическом порядке.
+        """
+        last_seq = int(self.header[2])
+        first_seq = self.last_seqs.get(key, last_seq - count) + 1
+        oldest_seq = max(1, last_seq - self.slots + 1)
+        lost = 0
+        if first_seq < oldest_seq:
+            # Читатель отстал больше чем на размер кольца
+            lost += oldest_seq - first_seq
+            first_seq = oldest_seq
+        first_seq = max(first_seq, 1)
+        if last_seq - first_seq + 1 > count:
+            # Читатель отстал больше чем на count кадров
+            lost += last_seq - count + 1 - first_seq
+            first_seq = last_seq - count + 1
+
+        frames = np.empty((max(last_seq - first_seq + 1, 0), CHANNELS, self.samples), dtype=np.int32)
+        valid = 0
+        for seq in range(first_seq, last_seq + 1):
+            slot = (seq - 1) % self.slots
+            if self.slot_seq[slot] != seq:
+                lost += 1
+                continue
+            frames[valid] = self.frames[slot]
+            # Кадр мог быть перезаписан во время копирования
+            if self.slot_seq[slot] != seq:
+                lost += 1
+                continue
+            valid += 1
+
+        self.last_seqs[key] = last_seq
+        if lost:
+            self.lost += lost
+            print(f"Кольцо кадров: читатель '{key}' пропустил {lost} кадров (всего потеряно {self.lost}).")
+        return frames[:valid]
+
+    def close(self):
+        """Отключение от сегмента; создатель кольца также удаляет сегмент."""
+        if self.lost or self.rejected:
+            print(f"Кольцо кадров: потеряно читателями {self.lost}, не записано из-за длины {self.rejected}.")
+        # Представления NumPy должны быть освобождены до закрытия сегмента
+        self.header = self.slot_seq = self.counters = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,57 @@
+import sys
+import time
+import argparse
+import numpy as np
+import frame_parser
+
+
+def generate_channels(counter, samples, fs):
+    """
+    Генерация тестового кадра: усилие (синус с шумом), ход штока (синус),
+    температура (медленный дрейф) и импульсы датчика оборотов.
+    """
+    t = (np.arange(samples) + (counter - 1) * samples) / fs
+    rng = np.random.default_rng(counter)
+    force = 1500 * np.sin(2 * np.pi * 5 * t) + rng.normal(0, 50, samples)
+    move = 2000 * np.sin(2 * np.pi * 5 * t - np.pi / 2)
+    temperature = np.full(samples, 2000 + counter % 100)
+    rpm = np.where((t * 5) % 1 < 0.05, 6000, 0)
+    return np.array([force, move, temperature, rpm]).astype(np.int32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Имитатор программы сбора данных")
+    parser.add_argument("--format", choices=["text", "binary"], default="text", help="Формат вывода кадров")
+    parser.add_argument("--frames", type=int, default=0, help="Количество кадров (0 - без ограничения)")
+    parser.add_argument("--samples", type=int, default=2048, help="Количество отсчетов в канале")
+    parser.add_argument("--rate", type=float, default=5, help="Частота выдачи кадров, кадров/с")
+    parser.add_argument("--width", type=int, choices=[2, 4], default=2, help="Размер отсчета в двоичном формате")
+    args = parser.parse_args()
+
+    fs = args.samples * args.rate  # Частота дискретизации
+    counter = 1
+    start_time = time.perf_counter()
+    try:
+        while args.frames == 0 or counter <= args.frames:
+            channels = generate_channels(counter, args.samples, fs)
+            now = time.localtime()
+            milliseconds = int((time.time() % 1) * 1000)
+            if args.format == "binary":
+                sys.stdout.buffer.write(frame_parser.pack_frame_binary(
+                    counter, now.tm_hour, now.tm_min, now.tm_sec, milliseconds, channels, width=args.width))
+                sys.stdout.buffer.flush()
+            else:
+                sys.stdout.write(frame_parser.format_frame_line(
+                    counter, now.tm_hour, now.tm_min, now.tm_sec, f"{milliseconds:03d}", channels) + "\n")
+                sys.stdout.flush()
+            # Выдерживаем заданную частоту кадров
+            delay = start_time + counter / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            counter += 1
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import psycopg2
+import pytest
+
+# Модули программы лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def session_pool(monkeypatch):
+    """
+    Фабрика bd_pool.SessionPool, соединения которого (FakeConnection) работают с таблицами FakePool.
+    Созданные соединения собираются в список connections фабрики.
+    """
+    import bd_pool
+    from fakes import FakeConnection, FakePool
+
+    database = FakePool()
+    connections = []
+
+    def connect(*args, **kwargs):
+        connection = FakeConnection(database)
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(psycopg2, "connect", connect)
+
+    def create(minconn=1, maxconn=2):
+        return bd_pool.SessionPool(minconn, maxconn, dbname="test")
+
+    create.database = database
+    create.connections = connections
+    return create
@@ -0,0 +1,154 @@
+import contextlib
+import itertools
+import re
+import types
+from psycopg2 import extensions
+import pg_binary
+
+# Столбцы строки таблицы кадров для каждого способа хранения (после id)
+ROW_COLUMNS = {
+    "array": ("record_date", "record_number", "record_time", "array_1", "array_2", "array_3", "array_4"),
+    "blob": ("record_date", "record_number", "record_time", "frame"),
+}
+
+
+def array_send(values):
+    """Двоичное представление массива, как результат array_send в PostgreSQL."""
+    return pg_binary.encode_int4_array(values)[4:]
+
+
+class FakeTable:
+    # OID таблиц: новая таблица (в том числе пересозданная под тем же именем) получает новый OID
+    oids = itertools.count(16384)
+
+    def __init__(self, storage="array"):
+        """Таблица кадров в памяти: строки (id, record_date, record_number, record_time, ...)."""
+        self.storage = storage
+        self.rows = []
+        self.oid = next(self.oids)
+
+    def append(self, *values):
+        self.rows.append((len(self.rows) + 1,) + values)
+
+
+class FakeCursor:
+    def __init__(self, pool, name=None):
+        """Курсор, выполняющий запросы DataRead к таблицам FakePool (поддерживается только нужный набор)."""
+        self.pool = pool
+        self.name = name
+        self.result = []
+        self.closed = False
+        self.connection = None
+
+    def execute(self, query, params=()):
+        self.pool.queries.append((self.name, query, tuple(params)))
+        if self.connection is not None:
+            self.connection.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        if query.startswith(("PREPARE", "EXECUTE", "DEALLOCATE")):
+            return
+        if "information_schema.columns" in query:
+            table = self.pool.tables.get(params[0])
+            self.result = [] if table is None else [(column,) for column in ROW_COLUMNS[table.storage]]
+            return
+        match = re.search(r"SELECT (.+?) FROM (\w+)", query, re.S)
+        columns, table = match.group(1), self.pool.tables[match.group(2)]
+        rows = table.rows
+        params = list(params)
+        for field, operator in re.findall(r"(id|record_date) ([<>]=)", query):
+            index = 0 if field == "id" else 1
+            value = params.pop(0)
+            rows = [row for row in rows if (row[index] >= value if operator == ">=" else row[index] <= value)]
+        self.result = [self.project(table, columns, row) for row in rows]
+
+    def project(self, table, columns, row):
+        if columns.strip() == "*":
+            return row
+        values = []
+        for column in (column.strip() for column in columns.split(",")):
+            name = re.sub(r"array_send\((\w+)\)", r"\1", column)
+            index = ("id",) + ROW_COLUMNS[table.storage]
+            value = row[index.index(name)]
+            values.append(array_send(value) if column.startswith("array_send") else value)
+        return tuple(values)
+
+    def execute_statement(self, statement, table_name, params):
+        """Выполнение запроса реестра bd_pool.STATEMENTS по его имени."""
+        table = self.pool.tables.get(table_name)
+        if statement == "table_oid":
+            self.result = [(table.oid if table else None,)]
+            return
+        if statement.startswith("last_"):
+            rows = table.rows[::-1][:params[0]]
+        else:
+            rows = [row for row in table.rows if row[0] > params[0]][:params[1]]
+        if statement.startswith(("last_frames", "new_frames")):
+            columns = "id, frame" if table.storage == "blob" else \
+                "id, array_send(array_1), array_send(array_2), array_send(array_3), array_send(array_4)"
+            rows = [self.project(table, columns, row) for row in rows]
+        self.result = rows
+
+    def fetchall(self):
+        result, self.result = self.result, []
+        return result
+
+    def fetchone(self):
+        return self.result.pop(0) if self.result else None
+
+    def fetchmany(self, size):
+        result, self.result = self.result[:size], self.result[size:]
+        return result
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    def __init__(self):
+        """Пул с интерфейсом bd_pool.SessionPool поверх таблиц в памяти."""
+        self.tables = {}
+        self.queries = []
+        self.in_use = 0
+
+    @contextlib.contextmanager
+    def cursor(self, name=None, itersize=100):
+        self.in_use += 1
+        cursor = FakeCursor(self, name)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            self.in_use -= 1
+
+    def execute_statement(self, cursor, statement, table_name, params):
+        self.queries.append((cursor.name, statement, tuple(params)))
+        cursor.execute_statement(statement, table_name, params)
+
+
+class FakeConnection:
+    def __init__(self, database):
+        """
+        Соединение psycopg2 поверх таблиц FakePool (для проверки bd_pool.SessionPool
+        с настоящим ThreadedConnectionPool).
+        """
+        self.database = database
+        self.closed = 0
+        self.autocommit = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.info = types.SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(self.database, name)
+        cursor.connection = self
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
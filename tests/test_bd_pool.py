@@ -0,0 +1,136 @@
+import pytest
+from psycopg2.pool import PoolError
+import bd_pool
+
+
+@pytest.fixture(autouse=True)
+def statements(monkeypatch):
+    monkeypatch.setattr(bd_pool, "STATEMENTS", {"max_id": "SELECT max(id) FROM {table}"})
+
+
+def prepares(database):
+    return [query for _, query, _ in database.queries if query.startswith("PREPARE")]
+
+
+def test_acquire_and_release_update_stats(session_pool):
+    pool = session_pool(minconn=1, maxconn=2)
+    first, second = pool.getconn(), pool.getconn()
+    assert first is not second
+    assert pool.stats()["in_use"] == 2
+    pool.putconn(first)
+    pool.putconn(second)
+    stats = pool.stats()
+    assert (stats["in_use"], stats["peak"], stats["acquisitions"]) == (0, 2, 2)
+
+
+def test_acquire_waits_then_times_out(session_pool, monkeypatch):
+    monkeypatch.setattr(bd_pool, "POOL_TIMEOUT", 0.01)
+    pool = session_pool(minconn=1, maxconn=1)
+    connection = pool.getconn()
+    with pytest.raises(PoolError):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+    pool.putconn(connection)
+    pool.putconn(pool.getconn())
+
+
+def test_connection_commits_or_rolls_back(session_pool):
+    pool = session_pool(minconn=1, maxconn=1)
+    with pool.connection() as connection:
+        pass
+    assert connection.commits == 1
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            raise RuntimeError("ошибка запроса")
+    assert connection.rollbacks >= 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_reset_deallocates_prepared_statements(session_pool):
+    pool = session_pool(minconn=1, maxconn=1)
+    connection = pool.getconn()
+    pool.execute_statement(connection.cursor(), "max_id", "frames", ())
+    assert pool.is_prepared(connection, "max_id", "frames")
+    pool.reset(connection)
+    assert not pool.is_prepared(connection, "max_id", "frames")
+    assert session_pool.database.queries[-1][1] == "DEALLOCATE ALL;"
+    pool.putconn(connection)
+
+
+def test_closed_stream_keeps_prepared_statements(session_pool):
+    pool = session_pool(minconn=1, maxconn=1)
+
+    def stream():
+        with pool.connection() as connection:
+            pool.execute_statement(connection.cursor(), "max_id", "frames", ())
+            yield connection
+
+    rows = stream()
+    connection = next(rows)
+    rows.close()
+    assert pool.is_prepared(connection, "max_id", "frames")
+    assert "DEALLOCATE ALL;" not in [query for _, query, _ in session_pool.database.queries]
+    assert pool.stats()["in_use"] == 0
+
+
+def test_prepared_cache_follows_connections_closed_by_pool(session_pool):
+    pool = session_pool(minconn=1, maxconn=2)
+    first, second = pool.getconn(), pool.getconn()
+    for connection in (first, second):
+        pool.execute_statement(connection.cursor(), "max_id", "frames", ())
+    assert len(prepares(session_pool.database)) == 2
+    pool.putconn(first)
+    # Второе соединение сверх minconn пул закрывает, вместе с ним забываются его операторы
+    pool.putconn(second)
+    assert second.closed
+    assert not pool.is_prepared(second, "max_id", "frames")
+
+    kept, new = pool.getconn(), pool.getconn()
+    assert kept is first and new not in (first, second)
+    for connection in (kept, new):
+        pool.execute_statement(connection.cursor(), "max_id", "frames", ())
+    # Повторно подготавливается только новое соединение
+    assert len(prepares(session_pool.database)) == 3
+    pool.putconn(kept)
+    pool.putconn(new)
+
+
+def test_long_table_names_get_short_statement_names(session_pool):
+    pool = session_pool(minconn=1, maxconn=1)
+    table_name = "frames_" + "x" * 56
+    name = bd_pool.statement_name("max_id", table_name)
+    assert len(name) < 64 and name != bd_pool.statement_name("max_id", "frames")
+    with pool.connection() as connection:
+        pool.execute_statement(connection.cursor(), "max_id", table_name, ())
+        assert pool.is_prepared(connection, "max_id", table_name)
+    assert prepares(session_pool.database) == [f"PREPARE {name} AS SELECT max(id) FROM {table_name}"]
+
+
+def test_db_config_is_read_from_config_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"config_bd": {"password": "secret", "port": "5433"}}')
+    db_config = bd_pool.load_db_config(str(path))
+    assert (db_config["password"], db_config["port"], db_config["dbname"]) == ("secret", "5433", "postgres")
+    assert "password" not in bd_pool.DB_CONFIG
+    assert bd_pool.load_db_config(str(tmp_path / "missing.json")) == bd_pool.DB_CONFIG
+
+
+def test_configure_sets_process_pool_size(monkeypatch):
+    created = {}
+
+    class Pool:
+        def __init__(self, minconn, maxconn, **db_config):
+            created.update(minconn=minconn, **db_config)
+
+    monkeypatch.setattr(bd_pool, "SessionPool", Pool)
+    monkeypatch.setattr(bd_pool, "_pool", None)
+    monkeypatch.setattr(bd_pool, "_minconn", bd_pool.MIN_CONNECTIONS)
+    monkeypatch.setattr(bd_pool, "_db_config", None)
+    bd_pool.configure(minconn=4, db_config={"dbname": "test"})
+    bd_pool.get_pool()
+    assert created == {"minconn": 4, "dbname": "test"}
+
+
+def test_statement_names_are_checked():
+    with pytest.raises(ValueError):
+        bd_pool.check_identifier("frames; DROP TABLE frames")
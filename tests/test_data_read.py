@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+from psycopg2 import extensions
+import data_read
+from fakes import FakePool, FakeTable
+
+SAMPLES = 16
+
+
+@pytest.fixture
+def pool():
+    pool = FakePool()
+    pool.tables["frames"] = FakeTable("array")
+    return pool
+
+
+def add_frames(table, count):
+    for _ in range(count):
+        number = len(table.rows) + 1
+        table.append("2025-02-07", number, "12:00:00", *(np.full(SAMPLES, number * 10 + channel)
+                                                         for channel in range(4)))
+
+
+def test_read_new_frames_incremental(pool):
+    add_frames(pool.tables["frames"], 5)
+    reader = data_read.DataRead(pool)
+    first = reader.bd_read_new_frames("frames", 3, samples=SAMPLES)
+    np.testing.assert_array_equal(first[:, 0, 0], [30, 40, 50])
+    np.testing.assert_array_equal(first[0, :, 0], [30, 31, 32, 33])
+    assert len(reader.bd_read_new_frames("frames", 3, samples=SAMPLES)) == 0
+    add_frames(pool.tables["frames"], 2)
+    np.testing.assert_array_equal(reader.bd_read_new_frames("frames", 3, samples=SAMPLES)[:, 0, 0], [60, 70])
+
+
+def test_read_new_frames_in_chunks(pool):
+    add_frames(pool.tables["frames"], 1)
+    reader = data_read.DataRead(pool)
+    reader.bd_read_new_frames("frames", 10, samples=SAMPLES)
+    add_frames(pool.tables["frames"], 7)
+    frames = reader.bd_read_new_frames("frames", 10, chunk_size=3, samples=SAMPLES)
+    np.testing.assert_array_equal(frames[:, 0, 0], np.arange(2, 9) * 10)
+
+
+def test_lagging_reader_pages_without_gaps(pool):
+    table = pool.tables["frames"]
+    add_frames(table, 1)
+    reader = data_read.DataRead(pool)
+    reader.bd_read_new_frames("frames", 4, samples=SAMPLES)
+    add_frames(table, 20)
+    # Дыра в последовательности id (откаченный пакет) не приводит к пропуску строк
+    table.rows = [row for row in table.rows if row[0] not in (5, 6)]
+    frames = reader.bd_read_new_frames("frames", 4, chunk_size=6, samples=SAMPLES)
+    np.testing.assert_array_equal(frames[:, 0, 0], [number * 10 for number in range(2, 22) if number not in (5, 6)])
+    assert len(reader.bd_read_new_frames("frames", 4, chunk_size=6, samples=SAMPLES)) == 0
+
+
+def test_reset_reader_jumps_to_latest_rows(pool):
+    add_frames(pool.tables["frames"], 2)
+    reader = data_read.DataRead(pool)
+    reader.bd_read_new_frames("frames", 4, samples=SAMPLES)
+    add_frames(pool.tables["frames"], 20)
+    reader.bd_reset_reader("frames")
+    np.testing.assert_array_equal(reader.bd_read_new_frames("frames", 4, samples=SAMPLES)[:, 0, 0],
+                                  [190, 200, 210, 220])
+
+
+def test_recreated_table_resets_reader(pool, capsys):
+    add_frames(pool.tables["frames"], 30)
+    reader = data_read.DataRead(pool)
+    reader.bd_read_new_frames("frames", 4, samples=SAMPLES)
+    # Таблица пересоздана: id снова начинаются с 1 и меньше последнего считанного
+    pool.tables["frames"] = FakeTable("array")
+    add_frames(pool.tables["frames"], 3)
+    np.testing.assert_array_equal(reader.bd_read_new_frames("frames", 4, samples=SAMPLES)[:, 0, 0], [10, 20, 30])
+    assert "пересоздана" in capsys.readouterr().out
+    add_frames(pool.tables["frames"], 1)
+    np.testing.assert_array_equal(reader.bd_read_new_frames("frames", 4, samples=SAMPLES)[:, 0, 0], [40])
+
+
+def test_read_new_rows_newest_first(pool):
+    add_frames(pool.tables["frames"], 3)
+    reader = data_read.DataRead(pool)
+    assert [row[0] for row in reader.bd_read_new("frames", 2)] == [3, 2]
+    add_frames(pool.tables["frames"], 10)
+    assert [row[0] for row in reader.bd_read_new("frames", 2)] == list(range(13, 3, -1))
+
+
+def test_blob_rows_are_expanded(pool):
+    import filter_data
+    import frame_codec
+    table = pool.tables["blob_frames"] = FakeTable("blob")
+    for number in range(1, 4):
+        table.append("2025-02-07", number, "12:00:00",
+                     frame_codec.encode_frame(np.arange(4 * SAMPLES).reshape(4, SAMPLES) + number, "zlib"))
+    reader = data_read.DataRead(pool)
+    rows = reader.bd_read_last("blob_frames", 2)
+    assert [row[2] for row in rows] == [3, 2]
+    assert len(rows[0]) == 8
+    np.testing.assert_array_equal(rows[0][5], np.arange(SAMPLES, 2 * SAMPLES) + 3)
+    # Построчный экспорт канала работает одинаково для обоих способов хранения
+    np.testing.assert_array_equal(filter_data.data_export(rows, 1)[:SAMPLES], np.arange(SAMPLES) + 2)
+    assert [row[0] for row in reader.bd_read_new("blob_frames", 5)] == [3, 2, 1]
+    table.append("2025-02-07", 4, "12:00:00", frame_codec.encode_frame(np.zeros((4, SAMPLES)), "none"))
+    new_rows = reader.bd_read_new("blob_frames", 5)
+    assert [row[0] for row in new_rows] == [4]
+    np.testing.assert_array_equal(new_rows[0][4], 0)
+
+
+def test_stream_frames_projection_and_ranges(pool):
+    add_frames(pool.tables["frames"], 10)
+    reader = data_read.DataRead(pool)
+    blocks = list(reader.bd_stream_frames("frames", columns=("array_3", "array_1"), id_range=(3, 8),
+                                          chunk_size=4, samples=SAMPLES))
+    assert [len(ids) for ids, _ in blocks] == [4, 2]
+    ids = np.concatenate([ids for ids, _ in blocks])
+    channels = np.concatenate([channels for _, channels in blocks], axis=1)
+    np.testing.assert_array_equal(ids, np.arange(3, 9))
+    assert channels.shape == (2, 6, SAMPLES)
+    np.testing.assert_array_equal(channels[:, :, 0], [np.arange(3, 9) * 10 + 2, np.arange(3, 9) * 10])
+    query = next(query for name, query, _ in pool.queries if name == "stream_frames")
+    assert "array_send(array_2)" not in query
+    assert pool.in_use == 0
+
+
+def test_stream_frames_open_range_and_unknown_column(pool):
+    add_frames(pool.tables["frames"], 5)
+    reader = data_read.DataRead(pool)
+    ids = [ids for ids, _ in reader.bd_stream_frames("frames", id_range=(None, 2), samples=SAMPLES)]
+    np.testing.assert_array_equal(np.concatenate(ids), [1, 2])
+    with pytest.raises(ValueError):
+        next(reader.bd_stream_frames("frames", columns=("frame",), samples=SAMPLES))
+
+
+def test_closing_stream_early_returns_connection(session_pool):
+    session = session_pool(minconn=1, maxconn=1)
+    session_pool.database.tables["frames"] = FakeTable("array")
+    add_frames(session_pool.database.tables["frames"], 10)
+    reader = data_read.DataRead(session)
+    stream = reader.bd_stream_frames("frames", chunk_size=2, samples=SAMPLES)
+    next(stream)
+    assert session.stats()["in_use"] == 1
+    stream.close()
+    assert session.stats()["in_use"] == 0
+    connection = session_pool.connections[0]
+    assert connection.rollbacks >= 1 and connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+    # Слот семафора освобожден: единственное соединение снова выдается
+    for _ in reader.bd_stream_frames("frames", chunk_size=20, samples=SAMPLES):
+        break
+    assert session.stats()["in_use"] == 0
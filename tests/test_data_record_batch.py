@@ -0,0 +1,64 @@
+import numpy as np
+import data_record
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rolled_back = False
+        self.committed = False
+
+    def cursor(self):
+        return FakeCursor()
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def commit(self):
+        self.committed = True
+
+
+class FakeCursor:
+    def close(self):
+        pass
+
+
+def test_out_of_range_blob_frame_rejects_batch_without_raising():
+    rows = [("2025-02-07", 1, "12:00:00", *np.full((4, 8), 40000, dtype=np.int32))]
+    connection = FakeConnection()
+    for write_batch in (data_record.bd_write_batch, data_record.bd_copy_batch):
+        assert not write_batch(connection, "frames", rows, storage="blob")
+    assert connection.rolled_back
+    assert not connection.committed
+
+
+class RecordingCursor(FakeCursor):
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(" ".join(query.split()))
+
+
+def test_rollup_failure_keeps_frames_of_batch(monkeypatch):
+    def execute_values(cursor, query, values, page_size=None):
+        if "_rollups" in query:
+            raise RuntimeError('relation "frames_frame_rollups" does not exist')
+        cursor.statements.append("INSERT frames")
+
+    cursor = RecordingCursor()
+    connection = FakeConnection()
+    connection.cursor = lambda: cursor
+    monkeypatch.setattr(data_record, "execute_values", execute_values)
+    rows = [("2025-02-07", 1, "12:00:00", *np.zeros((4, 8), dtype=np.int32))]
+    assert data_record.bd_write_batch(connection, "frames", rows, write_rollups=True)
+    assert connection.committed
+    assert not connection.rolled_back
+    assert cursor.statements[:3] == ["INSERT frames", "SAVEPOINT rollups;", "ROLLBACK TO SAVEPOINT rollups;"]
+
+
+def test_rollups_are_released_after_write(monkeypatch):
+    monkeypatch.setattr(data_record, "execute_values", lambda cursor, query, values, page_size=None: None)
+    cursor = RecordingCursor()
+    rows = [("2025-02-07", 1, "12:00:00", *np.zeros((4, 8), dtype=np.int32))]
+    assert data_record.bd_write_rollups(cursor, "frames", rows)
+    assert cursor.statements == ["SAVEPOINT rollups;", "RELEASE SAVEPOINT rollups;"]
@@ -0,0 +1,73 @@
+import queue
+import threading
+import time
+import pytest
+import data_record
+
+
+@pytest.fixture(autouse=True)
+def restore_globals(monkeypatch):
+    # main и тесты меняют глобальные параметры модуля; monkeypatch восстанавливает их после теста
+    for name in ("stop_flag", "data_queue", "write_queue", "BATCH_SIZE", "BATCH_TIMEOUT", "WRITE_MODE",
+                 "PROTOCOL", "STORAGE", "COMPRESSION", "PARTITIONING", "RETENTION_DAYS", "WRITE_ROLLUPS"):
+        monkeypatch.setattr(data_record, name, getattr(data_record, name))
+
+
+def test_queue_close_after_stop_flag():
+    # Сигнал завершения помещается в очередь и после установки флага завершения
+    data_record.stop_flag = threading.Event()
+    data_record.stop_flag.set()
+    out_queue = queue.Queue(maxsize=3)
+    out_queue.put(1)
+    data_record.queue_close(out_queue)
+    assert out_queue.get_nowait() == 1
+    assert out_queue.get_nowait() is None
+
+
+def test_queue_close_full_queue_without_consumer(monkeypatch, capsys):
+    monkeypatch.setattr(data_record, "SHUTDOWN_TIMEOUT", 0.01)
+    consumer = threading.Thread(target=lambda: None)
+    consumer.start()
+    consumer.join()
+    out_queue = queue.Queue(maxsize=2)
+    out_queue.put(1)
+    out_queue.put(2)
+    data_record.queue_close(out_queue, consumer)
+    assert [out_queue.get_nowait(), out_queue.get_nowait()] == [2, None]
+    assert "отброшено 1 кадров" in capsys.readouterr().out
+
+
+def test_queue_close_waits_for_live_consumer(monkeypatch):
+    # Потребитель обрабатывает очередь медленнее SHUTDOWN_TIMEOUT: кадры не отбрасываются
+    monkeypatch.setattr(data_record, "SHUTDOWN_TIMEOUT", 0.01)
+    out_queue = queue.Queue(maxsize=2)
+    out_queue.put(1)
+    out_queue.put(2)
+    received = []
+
+    def consume():
+        while True:
+            time.sleep(0.03)
+            item = out_queue.get()
+            if item is None:
+                break
+            received.append(item)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    data_record.queue_close(out_queue, consumer)
+    consumer.join(timeout=5)
+    assert received == [1, 2]
+
+
+def test_main_sizes_queues_from_config(monkeypatch):
+    # Запуск внешнего процесса прерывается сразу после настройки очередей
+    def popen(*args, **kwargs):
+        raise RuntimeError
+    monkeypatch.setattr(data_record, "bd_init", lambda: (None, None))
+    monkeypatch.setattr(data_record.subprocess, "Popen", popen)
+    with pytest.raises(RuntimeError):
+        data_record.main("", show_plot=False, handle_esc=False, in_stop_flag=threading.Event(),
+                         record_config={"batch_size": 7})
+    assert data_record.data_queue.maxsize == 7 * data_record.QUEUE_BATCHES
+    assert data_record.write_queue.maxsize == 7 * data_record.QUEUE_BATCHES
@@ -0,0 +1,57 @@
+import gc
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backend_bases import ResizeEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+from decimate import DecimatedLine, lttb, minmax_envelope
+
+
+def test_minmax_envelope_keeps_peaks_in_order():
+    x = np.arange(10000)
+    y = np.zeros(10000)
+    y[1234] = 5.0
+    y[8765] = -7.0
+    x_out, y_out = minmax_envelope(x, y, 100)
+    assert len(y_out) == 200
+    assert y_out.max() == 5.0 and y_out.min() == -7.0
+    assert np.all(np.diff(x_out) >= 0)
+
+
+def test_minmax_envelope_returns_short_series_unchanged():
+    x = np.arange(50)
+    y = np.arange(50)
+    x_out, y_out = minmax_envelope(x, y, 100)
+    assert x_out is x and y_out is y
+
+
+def test_lttb_keeps_endpoints_and_count():
+    x = np.linspace(0, 1, 5000)
+    y = np.sin(40 * x)
+    x_out, y_out = lttb(x, y, 300)
+    assert len(x_out) == 300
+    assert x_out[0] == x[0] and x_out[-1] == x[-1]
+    assert np.all(np.diff(x_out) > 0)
+
+
+def test_decimated_line_redecimates_on_resize():
+    figure = Figure(figsize=(4, 3), dpi=100)
+    FigureCanvasAgg(figure)
+    axes = figure.subplots()
+    x = np.linspace(0, 20, 100000)
+    y = np.sin(x)
+    line, = axes.plot(x, y)
+    axes.set_xlim(0, 20)
+    decimated = DecimatedLine(line)
+    decimated.set_data(x, y)
+    points = len(line.get_xdata())
+    assert points <= 2 * decimated.pixels()
+
+    gc.collect()
+    figure.set_size_inches(8, 3)
+    # Обработчик хранится по слабой ссылке: линия жива, пока жив объект decimated
+    figure.canvas.callbacks.process("resize_event", ResizeEvent("resize_event", figure.canvas))
+    assert len(line.get_xdata()) > points
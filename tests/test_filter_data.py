@@ -0,0 +1,213 @@
+import numpy as np
+from scipy.signal import sosfilt
+import filter_data
+
+FS = 51200
+FREQUENCY = 250
+
+
+def synthetic_frames(frames=50, samples=2048, seed=0):
+    """Кадры (k, 4, N): синусоида усилия и перемещения с шумом, температура и импульсы оборотов."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames * samples) / FS
+    signal = 4000 * np.sin(2 * np.pi * FREQUENCY * t)
+    channels = np.empty((4, frames * samples), dtype=np.int32)
+    channels[0] = signal + rng.normal(0, 200, len(t))
+    channels[1] = 0.5 * signal + rng.normal(0, 100, len(t))
+    channels[2] = 300
+    # Импульс датчика оборотов в начале каждого периода основного сигнала
+    channels[3] = np.where((t * FREQUENCY) % 1 < 0.1, 8000, 0)
+    return channels.reshape(4, frames, samples).transpose(1, 0, 2)
+
+
+def test_streaming_lowpass_matches_single_pass():
+    data = np.random.default_rng(1).normal(0, 1000, (2, 10000))
+    stream = filter_data.StreamingLowpass(FREQUENCY * 2, FS, freq=FREQUENCY)
+    chunks = [stream.process(data[:, start:start + 1234]) for start in range(0, data.shape[1], 1234)]
+    stream.reset()
+    single = stream.process(data)
+    np.testing.assert_allclose(np.hstack(chunks), single)
+    # Начальное состояние по первому отсчету: постоянный сигнал проходит без переходного процесса
+    stream.reset()
+    np.testing.assert_allclose(stream.process(np.full(100, 5.0)), 5.0)
+    assert stream.delay > 0
+
+
+def test_streaming_lowpass_is_sosfilt():
+    data = np.random.default_rng(2).normal(0, 1000, 5000)
+    stream = filter_data.StreamingLowpass(FREQUENCY * 2, FS)
+    stream.zi = np.zeros((stream.sos.shape[0], 2))
+    np.testing.assert_allclose(stream.process(data), sosfilt(stream.sos, data))
+
+
+def test_design_lowpass_is_cached():
+    filter_data.design_lowpass.cache_clear()
+    for _ in range(3):
+        filter_data.lowpass_filter(np.zeros((2, 1000)), FREQUENCY * 2, FS, sos=True)
+    filter_data.lowpass_filter(np.zeros(1000), FREQUENCY * 2, FS)
+    info = filter_data.filter_cache_info()
+    # Коэффициенты рассчитываются один раз для каждого набора параметров (sos и ba)
+    assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+
+
+def test_sos_lowpass_matches_ba_lowpass():
+    # Хорошо обусловленный фильтр: ba и sos дают один результат с точностью до округления к int
+    data = np.random.default_rng(3).normal(0, 1000, (2, 20000))
+    sos = filter_data.lowpass_filter(data, 2000, FS, sos=True)
+    ba = filter_data.lowpass_filter(data, 2000, FS)
+    assert np.abs(sos - ba).max() <= 1
+
+
+def test_process_frames_matches_per_channel_zero_phase():
+    data = synthetic_frames()
+    result = filter_data.process_frames(data, channels=(1, 2), negative_data=(True, False),
+                                        freq=FREQUENCY, fs=FS, min_count=6, sos=True)
+    assert result.count_impulse > 0
+    assert result.temperature == 300
+    for i, channel in enumerate((1, 2)):
+        values = filter_data.filter_data(data, channel=channel, freq=FREQUENCY, fs=FS, only_filter=False,
+                                         negative_data=i == 0, index_null=result.index_null, sos=True)
+        main_amplitude, noise_amplitude, noise_percentage = values[3:6]
+        assert result.amplitude[i] == main_amplitude
+        assert result.noise_amplitude[i] == noise_amplitude
+        assert result.noise_percentage[i] == noise_percentage
+
+
+
+def legacy_find_intervals(above_threshold, min_count):
+    """Поиск интервалов циклом по отсчетам, как в find_intervals до векторизации."""
+    start_index = None
+    n = 0
+    for i, value in enumerate(above_threshold):
+        if value:
+            if start_index is None:
+                start_index = i
+        else:
+            if start_index is not None:
+                yield [start_index, i]
+                n += 1
+                start_index = None
+        if n >= min_count:
+            break
+    if start_index is not None and n < min_count:
+        yield [start_index, len(above_threshold)]
+
+
+def legacy_count_turn(noisy_data, threshold=5000, sampling_rate=10_000, min_count=5):
+    """Подсчет оборотов, как в count_turn до векторизации (для массива отсчетов канала)."""
+    min_count = max(min_count, 2)
+    index_threshold = list(legacy_find_intervals(noisy_data > threshold, min_count))
+    if len(index_threshold) < 2:
+        return 0, [], 0, 0
+    end_indices = np.array([index[1] for index in index_threshold])
+    pulse_durations = np.mean(np.diff(end_indices))
+    pulse_durations_seconds = pulse_durations / sampling_rate if sampling_rate > 0 else 0
+    rpm_values = 60 / pulse_durations_seconds if pulse_durations_seconds > 0 else 0
+    return len(index_threshold), end_indices.tolist(), pulse_durations, rpm_values
+
+
+def reference_pulses(data, threshold, low_threshold, min_width):
+    """Триггер Шмитта циклом по отсчетам: импульс начинается при data > threshold, заканчивается при data <= low."""
+    pulses = []
+    start = None
+    for i, value in enumerate(data):
+        if start is None and value > threshold:
+            start = i
+        elif start is not None and value <= low_threshold:
+            pulses.append((start, i))
+            start = None
+    if start is not None:
+        pulses.append((start, len(data)))
+    return [(start, end) for start, end in pulses if end - start >= min_width]
+
+
+def test_find_intervals_matches_legacy_loop():
+    rng = np.random.default_rng(3)
+    for density in (0.02, 0.5, 0.98):
+        for _ in range(20):
+            above = rng.random(rng.integers(0, 300)) < density
+            for min_count in (0, 1, 2, 5, 1000):
+                assert list(filter_data.find_intervals(above, min_count)) == \
+                    list(legacy_find_intervals(above, min_count))
+
+
+def test_count_turn_matches_legacy_loop():
+    rng = np.random.default_rng(4)
+    signals = [filter_data.data_export(synthetic_frames(10), 4)]
+    # Шумовые выбросы около порога, импульс в начале окна и импульс, не закончившийся к концу окна
+    noisy = signals[0] + rng.normal(0, 1500, len(signals[0])).astype(np.int32)
+    signals += [noisy, noisy[37:], noisy[:-13], signals[0][:-190], np.where(np.arange(1000) > 990, 8000, 0),
+                np.full(500, 8000), np.zeros(500)]
+    for signal in signals:
+        channels = np.zeros((4, len(signal)), dtype=np.int32)
+        channels[3] = signal
+        for min_count in (2, 5, 6, 50, 200):
+            result = filter_data.count_turn(channels, channel=4, threshold=5000, sampling_rate=FS, min_count=min_count)
+            assert result == legacy_count_turn(signal, threshold=5000, sampling_rate=FS, min_count=min_count)
+
+
+def test_detect_pulses_hysteresis_and_min_width_match_reference_loop():
+    rng = np.random.default_rng(5)
+    t = np.arange(20000)
+    base = np.where((t // 250) % 2 == 0, 8000, 0)
+    for noise in (0, 800, 3000):
+        data = base + rng.normal(0, noise, len(t)) if noise else base.astype(float)
+        for low_threshold, min_width in ((None, 0), (2000, 0), (2000, 20), (4999, 5), (6000, 0)):
+            starts, ends = filter_data.detect_pulses(data, 5000, low_threshold, min_width)
+            low = 5000 if low_threshold is None or low_threshold >= 5000 else low_threshold
+            assert list(zip(starts.tolist(), ends.tolist())) == reference_pulses(data, 5000, low, min_width)
+    # Импульс, открытый на краю окна, заканчивается последним отсчетом
+    starts, ends = filter_data.detect_pulses([0, 9000, 3000, 9000], 5000, low_threshold=1000)
+    assert (starts.tolist(), ends.tolist()) == ([1], [4])
+
+
+def legacy_cycle_amplitudes(filtered_data, noise, index_null, negative_data=True):
+    """Размахи по оборотам циклом, как в filter_data до векторизации."""
+    main_cycles = []
+    for i in range(len(index_null) - 1):
+        wave = filtered_data[index_null[i]:index_null[i + 1]]
+        if negative_data:
+            main_cycles.append(np.max(wave[wave > 0], initial=1) - abs(np.min(wave[wave < 0], initial=0)))
+        else:
+            main_cycles.append(np.max(wave, initial=1) - np.min(wave))
+    noise_cycles = []
+    for i in range(len(index_null) - 1):
+        wave = noise[index_null[i]:index_null[i + 1]]
+        noise_cycles.append(np.max(wave[wave > 0], initial=1) + abs(np.min(wave, initial=0)))
+    return np.array(main_cycles), np.array(noise_cycles)
+
+
+def test_cycle_amplitudes_match_legacy_loop():
+    rng = np.random.default_rng(6)
+    filtered = (4000 * np.sin(np.arange(3000) / 30)).astype(int)
+    noise = rng.integers(-300, 300, len(filtered))
+    index_sets = [
+        [0, 205, 410, 615, 820],
+        [3, 4, 5, 700, 701, 2999],  # Соседние индексы: обороты из одного отсчета
+        [0, 100, 100, 250, 250, 250, 3000],  # Повторяющиеся индексы: пустые обороты
+        [100, 100],
+        [2990, 3000],
+        [0, 3000],
+    ]
+    for index_null in index_sets:
+        for negative_data in (True, False):
+            main_cycles, noise_cycles = filter_data.cycle_amplitudes(filtered, noise, index_null, negative_data)
+            legacy_noise = legacy_cycle_amplitudes(filtered, noise, index_null, True)[1]
+            np.testing.assert_array_equal(noise_cycles, legacy_noise)
+            if negative_data:
+                legacy_main = legacy_cycle_amplitudes(filtered, noise, index_null, True)[0]
+                np.testing.assert_array_equal(main_cycles, legacy_main)
+            else:
+                # Исходный цикл без negative_data не допускал пустых оборотов (np.min пустого массива)
+                empty = np.diff(index_null) == 0
+                legacy_main = [legacy_cycle_amplitudes(filtered, noise, index_null[i:i + 2], False)[0][0]
+                               for i in np.flatnonzero(~empty)]
+                np.testing.assert_array_equal(main_cycles[~empty], legacy_main)
+                assert np.all(main_cycles[empty] == 1)
+
+
+def test_cycle_amplitudes_without_full_cycle():
+    data = np.arange(10)
+    for index_null in ([], [5], [20, 30]):
+        main_cycles, noise_cycles = filter_data.cycle_amplitudes(data, data, index_null)
+        assert len(main_cycles) == 0 and len(noise_cycles) == 0
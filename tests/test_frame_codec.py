@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import frame_codec
+
+COMPRESSIONS = ["none", "zlib"] + (["lz4"] if frame_codec.lz4 is not None else [])
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip(compression):
+    channels = np.random.default_rng(0).integers(-32768, 32768, (4, 2048), dtype=np.int32)
+    blob = frame_codec.encode_frame(channels, compression)
+    assert frame_codec.frame_samples(blob) == 2048
+    out = np.empty((4, 2048), dtype=np.int32)
+    assert frame_codec.decode_frame(blob, out) == 2048
+    np.testing.assert_array_equal(out, channels)
+
+
+def test_uncompressed_size():
+    blob = frame_codec.encode_frame(np.zeros((4, 2048), dtype=np.int32))
+    assert len(blob) == frame_codec.BLOB_HEADER.size + 4 * 2048 * 2
+
+
+def test_decode_pads_and_truncates():
+    blob = frame_codec.encode_frame(np.arange(12).reshape(4, 3))
+    out = np.full((4, 5), -1, dtype=np.int32)
+    assert frame_codec.decode_frame(blob, out) == 3
+    np.testing.assert_array_equal(out[:, :3], np.arange(12).reshape(4, 3))
+    np.testing.assert_array_equal(out[:, 3:], 0)
+    out = np.empty((4, 2), dtype=np.int32)
+    frame_codec.decode_frame(blob, out)
+    np.testing.assert_array_equal(out, np.arange(12).reshape(4, 3)[:, :2])
+
+
+def test_null_frame():
+    out = np.ones((4, 3), dtype=np.int32)
+    assert frame_codec.decode_frame(None, out) == 0
+    assert frame_codec.frame_samples(None) == 0
+    np.testing.assert_array_equal(out, 0)
+
+
+@pytest.mark.parametrize("value", [32768, -32769])
+def test_out_of_range_samples(value):
+    channels = np.zeros((4, 8), dtype=np.int32)
+    channels[2, 5] = value
+    with pytest.raises(ValueError):
+        frame_codec.encode_frame(channels)
+
+
+def test_unknown_compression_and_bad_header():
+    with pytest.raises(ValueError):
+        frame_codec.encode_frame(np.zeros((4, 2)), "gzip")
+    with pytest.raises(ValueError):
+        frame_codec.decode_frame(frame_codec.BLOB_HEADER.pack(9, 4, 0), np.empty((4, 0)))
+    with pytest.raises(ValueError):
+        frame_codec.decode_frame(frame_codec.BLOB_HEADER.pack(0, 3, 0), np.empty((4, 0)))
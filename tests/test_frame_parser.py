@@ -0,0 +1,38 @@
+import io
+import numpy as np
+import pytest
+import frame_parser
+
+
+def test_parse_frame_line_deinterleaves_channels():
+    channels = np.arange(-8, 8).reshape(4, 4)
+    line = frame_parser.format_frame_line(7, 12, 0, 5, 250, channels)
+    counter, time, parsed = frame_parser.parse_frame_line(line)
+    assert (counter, time) == (7, "12:0:5.250")
+    assert parsed.dtype == np.int32
+    np.testing.assert_array_equal(parsed, channels)
+
+
+def test_trailing_incomplete_group_and_line_end_are_dropped():
+    np.testing.assert_array_equal(frame_parser.parse_payload("1;2;3;4;5;6;\r"), [[1], [2], [3], [4]])
+
+
+@pytest.mark.parametrize("payload", ["1;2;x;4;", "1;2;;4;", "99999999999;1;2;3;", "1.5;2;3;4;", "1;2;#3;4;"])
+def test_malformed_payload_is_skipped(payload):
+    assert frame_parser.parse_payload(payload) is None
+    assert frame_parser.parse_frame_line(f"DATA 0 1 0 12 0 0 0 {payload}") is None
+
+
+@pytest.mark.parametrize("payload", ["", ";", "1;2;3;"])
+def test_short_payload_is_skipped(payload):
+    assert frame_parser.parse_payload(payload) is None
+    assert frame_parser.parse_frame_line(f"DATA 0 1 0 12 0 0 0 {payload}") is None
+
+
+def test_binary_frame_round_trip():
+    channels = np.arange(-6, 6).reshape(4, 3)
+    stream = io.BytesIO(frame_parser.pack_frame_binary(3, 1, 2, 3, 4, channels))
+    counter, time, parsed = frame_parser.read_frame_binary(stream, bytearray(frame_parser.MAX_FRAME_SIZE))
+    assert (counter, time) == (3, "1:2:3.004")
+    np.testing.assert_array_equal(parsed, channels)
+    assert frame_parser.read_frame_binary(stream, bytearray(frame_parser.MAX_FRAME_SIZE)) is None
@@ -0,0 +1,54 @@
+import datetime
+import struct
+import numpy as np
+import pytest
+import pg_binary
+
+
+def array_send(values):
+    """Двоичное представление массива без префикса длины поля (как результат array_send)."""
+    return pg_binary.encode_int4_array(values)[4:]
+
+
+def test_int4_array_round_trip():
+    values = np.array([0, 1, -1, 2 ** 31 - 1, -2 ** 31, 8191, -8192], dtype=np.int32)
+    field = pg_binary.encode_int4_array(values)
+    assert struct.unpack(">i", field[:4])[0] == len(field) - 4
+    out = np.empty(len(values), dtype=np.int32)
+    assert pg_binary.decode_int4_array(array_send(values), out) == len(values)
+    np.testing.assert_array_equal(out, values)
+
+
+def test_decode_int4_array_pads_and_truncates():
+    out = np.full(5, 7, dtype=np.int32)
+    assert pg_binary.decode_int4_array(array_send([1, 2, 3]), out) == 3
+    np.testing.assert_array_equal(out, [1, 2, 3, 0, 0])
+    out = np.empty(2, dtype=np.int32)
+    assert pg_binary.decode_int4_array(array_send([1, 2, 3]), out) == 2
+    np.testing.assert_array_equal(out, [1, 2])
+
+
+def test_decode_int4_array_null_and_errors():
+    out = np.ones(3, dtype=np.int32)
+    assert pg_binary.decode_int4_array(None, out) == 0
+    np.testing.assert_array_equal(out, 0)
+    with pytest.raises(ValueError):
+        pg_binary.decode_int4_array(pg_binary.ARRAY_HEADER.pack(1, 1, pg_binary.INT4_OID, 0, 1), out)
+    with pytest.raises(ValueError):
+        pg_binary.decode_int4_array(pg_binary.ARRAY_HEADER.pack(1, 0, 20, 0, 1), out)
+
+
+def test_encode_date_and_time():
+    assert pg_binary.encode_date("2000-01-02") == struct.pack(">ii", 4, 1)
+    assert pg_binary.encode_date(datetime.date(1999, 12, 31)) == struct.pack(">ii", 4, -1)
+    assert pg_binary.encode_time("00:00:01.5") == struct.pack(">iq", 8, 1_500_000)
+    assert pg_binary.encode_time(datetime.time(1, 0, 0, 250)) == struct.pack(">iq", 8, 3_600_000_250)
+
+
+def test_build_copy_data():
+    row = ("2025-02-07", 1, "12:00:00.5", *np.zeros((4, 3), dtype=np.int32))
+    data = pg_binary.build_copy_data([row, row]).getvalue()
+    assert data.startswith(pg_binary.PGCOPY_HEADER)
+    assert data.endswith(pg_binary.PGCOPY_TRAILER)
+    row_size = len(pg_binary.encode_frame_row(*row))
+    assert len(data) == len(pg_binary.PGCOPY_HEADER) + 2 * row_size + len(pg_binary.PGCOPY_TRAILER)
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide2")
+
+from PySide2.QtWidgets import QApplication
+
+import plot_backend
+from render import RenderScheduler
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def renderer(app):
+    return RenderScheduler()
+
+
+def test_matplotlib_backend(renderer):
+    plot = plot_backend.create_plot("matplotlib", renderer, rows=2, sharex=True)
+    assert isinstance(plot, plot_backend.MatplotlibPlot)
+    assert len(plot.axes) == 2
+    x = np.arange(10000)
+    line = plot.plot(0, x, np.zeros(len(x)), decimate=True)
+    plot.finish(left=0.1, right=1, top=1, bottom=0.1)
+    line.set_data(x, np.ones(len(x)))
+    plot.refresh()
+    renderer.tick()
+
+
+def test_pyqtgraph_backend(renderer):
+    pytest.importorskip("pyqtgraph")
+    plot = plot_backend.create_plot("pyqtgraph", renderer, rows=2, sharex=True)
+    assert isinstance(plot, plot_backend.PyqtgraphPlot)
+    x = np.arange(10000)
+    first = plot.plot(0, x, np.zeros(len(x)), label="1", decimate=True)
+    second = plot.plot(0, x, np.zeros(len(x)), label="2")
+    first.set_data(x, np.ones(len(x)))
+    pens = [item.opts["pen"].color().name() for item in plot.axes[0].item.listDataItems()]
+    assert pens == list(plot_backend.LINE_COLORS[:2])
+    assert second.item is not first.item
+
+
+def test_pyqtgraph_falls_back_to_matplotlib(renderer, monkeypatch, capsys):
+    monkeypatch.setattr(plot_backend, "pg", None)
+    plot = plot_backend.create_plot("pyqtgraph", renderer)
+    assert isinstance(plot, plot_backend.MatplotlibPlot)
+    assert "pyqtgraph не установлен" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import numpy as np
+from ring_buffer import RingBuffer
+
+
+def test_latest_in_chronological_order_after_wrap():
+    ring = RingBuffer(2, 5, dtype=np.int32)
+    for start in range(0, 12, 3):
+        block = np.arange(start, start + 3)
+        ring.write(np.vstack([block, -block]))
+    np.testing.assert_array_equal(ring.latest(), [[7, 8, 9, 10, 11], [-7, -8, -9, -10, -11]])
+    np.testing.assert_array_equal(ring.latest(2), [[10, 11], [-10, -11]])
+    assert ring.written == 12
+
+
+def test_latest_is_view():
+    ring = RingBuffer(1, 4)
+    ring.write(np.arange(6))
+    assert np.shares_memory(ring.latest(), ring.buffer)
+
+
+def test_block_larger_than_capacity():
+    ring = RingBuffer(1, 4)
+    ring.write([1])
+    ring.write(np.arange(10))
+    np.testing.assert_array_equal(ring.latest()[0], [6, 7, 8, 9])
+    assert ring.written == 11
+
+
+def test_empty_block_and_oversized_count():
+    ring = RingBuffer(1, 3)
+    ring.write(np.empty((1, 0)))
+    ring.write([1, 2])
+    assert ring.written == 2
+    np.testing.assert_array_equal(ring.latest(10)[0], [0, 1, 2])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from shared_frames import SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(slots=4, samples=8, create=True)
+    yield ring
+    ring.close()
+
+
+def frame(value, samples=8):
+    return np.full((4, samples), value, dtype=np.int32)
+
+
+def test_read_new_returns_only_new_frames(ring):
+    for counter in range(1, 4):
+        assert ring.write(counter, frame(counter))
+    first = ring.read_new(2)
+    np.testing.assert_array_equal(first[:, 0, 0], [2, 3])
+    ring.write(4, frame(4))
+    np.testing.assert_array_equal(ring.read_new(2)[:, 0, 0], [4])
+    assert len(ring.read_new(2)) == 0
+    assert ring.lost == 0
+
+
+def test_lost_frames_are_counted_per_call(ring, capsys):
+    ring.write(1, frame(1))
+    ring.read_new(1)
+    for counter in range(2, 9):
+        ring.write(counter, frame(counter))
+    np.testing.assert_array_equal(ring.read_new(4)[:, 0, 0], [5, 6, 7, 8])
+    assert ring.lost == 3
+    assert "пропустил 3" in capsys.readouterr().out
+
+
+def test_read_new_returns_at_most_count_frames(ring):
+    ring.write(1, frame(1))
+    ring.read_new(1)
+    for counter in range(2, 5):
+        ring.write(counter, frame(counter))
+    np.testing.assert_array_equal(ring.read_new(2)[:, 0, 0], [3, 4])
+    assert ring.lost == 1
+    ring.write(5, frame(5))
+    np.testing.assert_array_equal(ring.read_new(2)[:, 0, 0], [5])
+    assert ring.lost == 1
+
+
+def test_frames_of_other_length_are_rejected(ring):
+    assert not ring.write(1, frame(1, samples=5))
+    assert not ring.write(2, frame(2, samples=9))
+    assert ring.rejected == 2
+    assert len(ring.read_new(4)) == 0
+
+
+def test_reader_attaches_by_name(ring):
+    ring.write(1, frame(7))
+    reader = SharedFrameRing(name=ring.name)
+    try:
+        assert (reader.slots, reader.samples) == (4, 8)
+        np.testing.assert_array_equal(reader.read_new(1), frame(7)[None])
+    finally:
+        reader.close()